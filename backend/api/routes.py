@@ -10,12 +10,35 @@ from models.metrica import MetricaCategoria
 from models.ticket import Ticket
 from models.analisis import Analisis
 from utils.database import get_db_session
+from utils.progreso import leer_run
+from utils.particiones import join_ticket_analisis, filtrar_tickets_periodo, filtrar_analisis_periodo
+from services.iar_simulador import SimuladorIAR
 from models.metrica import MetricaCategoria  
 from datetime import datetime, timedelta
 import json
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
+def _periodo_request():
+    """
+    Período opcional ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD (hasta excluido)
+
+    Filtra por fecha_creacion del ticket; con tablas particionadas solo se
+    leen las particiones de esos meses.
+
+    Returns:
+        tuple: (desde, hasta) como datetime o None
+
+    Raises:
+        ValueError: Si alguna fecha no es ISO 8601
+    """
+    desde = request.args.get('desde')
+    hasta = request.args.get('hasta')
+    return (
+        datetime.fromisoformat(desde) if desde else None,
+        datetime.fromisoformat(hasta) if hasta else None
+    )
+
 # ========== RECOMENDACIONES ==========
 
 @api.route('/recomendaciones', methods=['GET'])
@@ -279,33 +302,43 @@ def get_dashboard_resumen():
 
 @api.route('/dashboard/estadisticas', methods=['GET'])
 def get_estadisticas():
-    """Estadísticas generales del sistema"""
+    """Estadísticas generales del sistema (opcional: ?desde=&hasta=)"""
+    try:
+        desde, hasta = _periodo_request()
+    except ValueError:
+        return jsonify({'error': 'desde/hasta deben ser fechas ISO (YYYY-MM-DD)'}), 400
+    
     session = get_db_session()
     try:
         # Tickets procesados
-        tickets_procesados = session.query(func.count(Ticket.id))\
-            .filter(Ticket.procesado == True)\
-            .scalar()
+        tickets_procesados = filtrar_tickets_periodo(
+            session.query(func.count(Ticket.id)).filter(Ticket.procesado == True),
+            desde, hasta
+        ).scalar()
         
         # Análisis completados
-        total_analisis = session.query(func.count(Analisis.id)).scalar()
+        total_analisis = filtrar_analisis_periodo(
+            session.query(func.count(Analisis.id)), desde, hasta
+        ).scalar()
         
         # Complejidad promedio
-        avg_complejidad = session.query(func.avg(Analisis.complejidad_score)).scalar()
+        avg_complejidad = filtrar_analisis_periodo(
+            session.query(func.avg(Analisis.complejidad_score)), desde, hasta
+        ).scalar()
         
         # Distribución de sentimiento
-        sentimiento_stats = session.query(
+        sentimiento_stats = filtrar_analisis_periodo(session.query(
             Analisis.sentimiento,
             func.count(Analisis.id)
-        ).group_by(Analisis.sentimiento).all()
+        ), desde, hasta).group_by(Analisis.sentimiento).all()
         
         sentimiento_dist = {s[0]: s[1] for s in sentimiento_stats}
         
         # Distribución de urgencia
-        urgencia_stats = session.query(
+        urgencia_stats = filtrar_analisis_periodo(session.query(
             Analisis.urgencia,
             func.count(Analisis.id)
-        ).group_by(Analisis.urgencia).all()
+        ), desde, hasta).group_by(Analisis.urgencia).all()
         
         urgencia_dist = {u[0]: u[1] for u in urgencia_stats}
         
@@ -351,13 +384,18 @@ def get_categorias_list():
 
 @api.route('/analisis/distribucion', methods=['GET'])
 def get_distribucion_analisis():
-    """Distribución de análisis por categoría"""
+    """Distribución de análisis por categoría (opcional: ?desde=&hasta=)"""
+    try:
+        desde, hasta = _periodo_request()
+    except ValueError:
+        return jsonify({'error': 'desde/hasta deben ser fechas ISO (YYYY-MM-DD)'}), 400
+    
     session = get_db_session()
     try:
-        distribucion = session.query(
+        distribucion = filtrar_tickets_periodo(session.query(
             Ticket.categoria,
             func.count(Analisis.id).label('total')
-        ).join(Analisis, Ticket.id == Analisis.ticket_id)\
+        ).join(Analisis, join_ticket_analisis()), desde, hasta, con_analisis=True)\
          .group_by(Ticket.categoria)\
          .all()
         
@@ -375,14 +413,20 @@ def get_distribucion_analisis():
 
 @api.route('/analisis/sentimiento', methods=['GET'])
 def get_analisis_sentimiento():
-    """Análisis de sentimiento por categoría"""
+    """Análisis de sentimiento por categoría (opcional: ?desde=&hasta=)"""
+    try:
+        desde, hasta = _periodo_request()
+    except ValueError:
+        return jsonify({'error': 'desde/hasta deben ser fechas ISO (YYYY-MM-DD)'}), 400
+    
     session = get_db_session()
     try:
         sentimiento = session.query(
             Ticket.categoria,
             Analisis.sentimiento,
             func.count(Analisis.id).label('total')
-        ).join(Analisis, Ticket.id == Analisis.ticket_id)\
+        ).join(Analisis, join_ticket_analisis())
+        sentimiento = filtrar_tickets_periodo(sentimiento, desde, hasta, con_analisis=True)\
          .group_by(Ticket.categoria, Analisis.sentimiento)\
          .all()
         
@@ -402,14 +446,20 @@ def get_analisis_sentimiento():
 
 @api.route('/analisis/urgencia', methods=['GET'])
 def get_distribucion_urgencia():
-    """Distribución de urgencia por categoría"""
+    """Distribución de urgencia por categoría (opcional: ?desde=&hasta=)"""
+    try:
+        desde, hasta = _periodo_request()
+    except ValueError:
+        return jsonify({'error': 'desde/hasta deben ser fechas ISO (YYYY-MM-DD)'}), 400
+    
     session = get_db_session()
     try:
         urgencia = session.query(
             Ticket.categoria,
             Analisis.urgencia,
             func.count(Analisis.id).label('total')
-        ).join(Analisis, Ticket.id == Analisis.ticket_id)\
+        ).join(Analisis, join_ticket_analisis())
+        urgencia = filtrar_tickets_periodo(urgencia, desde, hasta, con_analisis=True)\
          .group_by(Ticket.categoria, Analisis.urgencia)\
          .all()
         
@@ -543,6 +593,81 @@ def get_ticket_analisis(ticket_id):
         session.close()
 
 
+# ========== JOBS ==========
+
+@api.route('/jobs/<string:run_id>', methods=['GET'])
+def get_job(run_id):
+    """Progreso de una corrida batch de Celery (contadores en Redis)"""
+    try:
+        estado = leer_run(run_id)
+        
+        if estado is None:
+            return jsonify({'error': 'Corrida no encontrada'}), 404
+        
+        return jsonify(estado), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ========== SIMULACIÓN IAR ==========
+
+@api.route('/iar/simulate', methods=['POST'])
+def simular_iar():
+    """
+    Sensibilidad del IAR a ponderaciones y costos (what-if)
+
+    Body JSON (todo opcional):
+        modo: 'muestreo' (default) | 'grilla'
+        escenarios: Cantidad de escenarios aleatorios (default 10000)
+        semilla: Semilla del muestreo
+        variacion_pesos: Variación relativa de cada peso en muestreo (default 0.25)
+        pesos: {componente: [valores]} para grilla
+        costo_hora_soporte: [min, max] en muestreo, lista de valores en grilla
+        costo_implementacion: [min, max] en muestreo, lista de valores en grilla
+        top: Tamaño del top para la estabilidad del conjunto (default 5)
+    """
+    params = request.get_json(silent=True) or {}
+    session = get_db_session()
+    try:
+        inicio = datetime.now()
+        simulador = SimuladorIAR.desde_bd(session)
+        
+        if not simulador.categorias:
+            return jsonify({'error': 'No hay métricas del IAR; ejecutar scripts/calcular_iar.py'}), 404
+        
+        try:
+            modo = params.get('modo', 'muestreo')
+            top = int(params.get('top', 5))
+            if modo == 'muestreo':
+                escenarios = simulador.muestreo(
+                    params.get('escenarios', 10000),
+                    semilla=params.get('semilla'),
+                    variacion_pesos=float(params.get('variacion_pesos', 0.25)),
+                    costo_hora_soporte=params.get('costo_hora_soporte'),
+                    costo_implementacion=params.get('costo_implementacion')
+                )
+            elif modo == 'grilla':
+                escenarios = simulador.grilla(
+                    pesos=params.get('pesos'),
+                    costo_hora_soporte=params.get('costo_hora_soporte'),
+                    costo_implementacion=params.get('costo_implementacion')
+                )
+            else:
+                raise ValueError("modo debe ser 'muestreo' o 'grilla'")
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        resultado = simulador.simular(escenarios, top_n=top)
+        resultado['modo'] = modo
+        resultado['tiempo_ms'] = round((datetime.now() - inicio).total_seconds() * 1000, 1)
+        
+        return jsonify(resultado), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
+
+
 # Health check
 @api.route('/health', methods=['GET'])
 def health_check():
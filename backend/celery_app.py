@@ -2,6 +2,7 @@
 Configuración de Celery para procesamiento asíncrono
 """
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from config import get_config
 import logging
 
@@ -58,6 +59,28 @@ celery.conf.update(
     task_max_retries=3,
 )
 
+@worker_init.connect
+def precargar_modelo_padre(**kwargs):
+    """Precarga spaCy en el proceso padre prefork (opcional)"""
+    if not config.NLP_PRELOAD_PADRE:
+        return
+    
+    import gc
+    from services.nlp_processor import precargar_nlp_processor
+    
+    logger.info("🧠 Precargando modelo NLP en el proceso padre...")
+    precargar_nlp_processor()
+    
+    # Sacar los objetos del modelo del GC para que los hijos no toquen
+    # sus páginas y se mantengan compartidas copy-on-write
+    gc.freeze()
+
+@worker_process_init.connect
+def precargar_modelo_hijo(**kwargs):
+    """Deja listo el NLPProcessor de cada proceso worker"""
+    from services.nlp_processor import precargar_nlp_processor
+    precargar_nlp_processor()
+
 # Auto-discover tasks en el módulo backend.tasks
 celery.autodiscover_tasks(['backend.tasks'])
 
@@ -19,6 +19,62 @@ class Config:
         'pool_recycle': 3600
     }
     
+    # Almacenamiento de análisis
+    ANALISIS_ALMACENAMIENTO = os.getenv('ANALISIS_ALMACENAMIENTO', 'clasico')  # clasico | compacto (JSONB + etiquetas smallint)
+    ANALISIS_TEXTO_LIMPIO = os.getenv('ANALISIS_TEXTO_LIMPIO', 'completo')  # completo | omitir | comprimido
+    
+    # Particionado mensual de tickets/analisis por fecha_creacion (solo PostgreSQL, tablas nuevas)
+    PARTICIONADO_MENSUAL = os.getenv('PARTICIONADO_MENSUAL', 'false').lower() == 'true'
+    PARTICIONES_MESES_ATRAS = int(os.getenv('PARTICIONES_MESES_ATRAS', 24))
+    PARTICIONES_MESES_ADELANTE = int(os.getenv('PARTICIONES_MESES_ADELANTE', 3))
+    
+    # NLP
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'es_core_news_sm')
+    NLP_MODO = os.getenv('NLP_MODO', 'spacy')  # spacy | lite (tokenizador regex + tabla de lemas)
+    NLP_LITE_TABLA = os.getenv('NLP_LITE_TABLA', os.path.join(os.path.dirname(__file__), 'data', 'lemas_es.json.gz'))
+    NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', 256))  # Docs por lote de nlp.pipe
+    NLP_N_PROCESS = int(os.getenv('NLP_N_PROCESS', 1))  # Procesos de nlp.pipe
+    NLP_CHUNK_SIZE = int(os.getenv('NLP_CHUNK_SIZE', 2000))  # Tickets por bloque en procesar_stream
+    NLP_TIEMPOS_ETAPAS = os.getenv('NLP_TIEMPOS_ETAPAS', 'false').lower() == 'true'  # Tiempo por etapa en cada análisis
+    LEXICONES_PATH = os.getenv('LEXICONES_PATH', os.path.join(os.path.dirname(__file__), 'data', 'lexicones.json'))
+    NLP_CACHE_ACTIVO = os.getenv('NLP_CACHE_ACTIVO', 'true').lower() == 'true'
+    NLP_CACHE_MAX_MB = int(os.getenv('NLP_CACHE_MAX_MB', 64))  # Tamaño del LRU en memoria
+    NLP_CACHE_SQLITE = os.getenv('NLP_CACHE_SQLITE', '')  # Archivo SQLite persistente (vacío = desactivado)
+    
+    # Palabras clave TF-IDF
+    TFIDF_MODELO_DIR = os.getenv('TFIDF_MODELO_DIR', os.path.join(os.path.dirname(__file__), 'data', 'tfidf'))
+    TFIDF_TOP_N = int(os.getenv('TFIDF_TOP_N', 10))
+    TFIDF_AMBITO = os.getenv('TFIDF_AMBITO', 'corpus')  # corpus | categoria
+    
+    # Celery
+    CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://:seira_redis_2024@localhost:6379/0')
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://:seira_redis_2024@localhost:6379/0')
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))
+    NLP_PRELOAD_PADRE = os.getenv('NLP_PRELOAD_PADRE', 'false').lower() == 'true'  # Cargar spaCy antes del fork
+    JOBS_REDIS_URL = os.getenv('JOBS_REDIS_URL', CELERY_BROKER_URL)  # Contadores de progreso por corrida
+    JOBS_TTL_HORAS = int(os.getenv('JOBS_TTL_HORAS', 72))
+    
+    # Cola de reclamo sobre PostgreSQL (scripts/drenar_backlog.py)
+    RECLAMO_BATCH_SIZE = int(os.getenv('RECLAMO_BATCH_SIZE', 500))
+    RECLAMO_LEASE_SEGUNDOS = int(os.getenv('RECLAMO_LEASE_SEGUNDOS', 600))  # Vencido, otro worker retoma el lote
+    
+    # IAR (services/iar_calculator.py); las ponderaciones deben sumar 1.0
+    IAR_WEIGHTS = {
+        'frecuencia': float(os.getenv('IAR_PESO_FRECUENCIA', 0.30)),
+        'complejidad': float(os.getenv('IAR_PESO_COMPLEJIDAD', 0.25)),
+        'impacto_productividad': float(os.getenv('IAR_PESO_IMPACTO', 0.25)),
+        'viabilidad_tecnica': float(os.getenv('IAR_PESO_VIABILIDAD', 0.20))
+    }
+    COSTO_IMPLEMENTACION_BASE = float(os.getenv('COSTO_IMPLEMENTACION_BASE', 15000))  # USD
+    COSTO_HORA_SOPORTE = float(os.getenv('COSTO_HORA_SOPORTE', 25))  # USD por hora
+    COSTO_MANTENIMIENTO_ANUAL_PORCENTAJE = float(os.getenv('COSTO_MANTENIMIENTO_ANUAL_PORCENTAJE', 0.15))
+    AGREGADOS_CATEGORIA = os.getenv('AGREGADOS_CATEGORIA', 'true').lower() == 'true'  # Agregados incrementales que lee el IAR
+    ANALISIS_KEYWORDS_TABLA = os.getenv('ANALISIS_KEYWORDS_TABLA', 'false').lower() == 'true'  # Tabla analisis_keywords (una fila por palabra)
+    IAR_SIMULACION_MAX_ESCENARIOS = int(os.getenv('IAR_SIMULACION_MAX_ESCENARIOS', 100000))  # Tope de /api/iar/simulate
+    IAR_BOOTSTRAP = os.getenv('IAR_BOOTSTRAP', 'false').lower() == 'true'  # Percentiles 5/50/95 del IAR en datos_adicionales
+    IAR_BOOTSTRAP_MUESTRAS = int(os.getenv('IAR_BOOTSTRAP_MUESTRAS', 1000))
+    IAR_BOOTSTRAP_PASO_COMPLEJIDAD = float(os.getenv('IAR_BOOTSTRAP_PASO_COMPLEJIDAD', 2))  # Redondeo de complejidad en las celdas (0 = exacto)
+    
     # Frontend
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 
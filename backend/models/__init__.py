@@ -8,8 +8,10 @@ from .base import Base
 # Importar todos los modelos
 from .ticket import Ticket
 from .analisis import Analisis
+from .analisis_keyword import AnalisisKeyword
 from .recomendacion import Recomendacion
 from .metrica import MetricaCategoria
+from .agregado import AgregadoCategoria, AgregadoPalabra
 from .user import User, RolUsuario
 
 # Exportar todo
@@ -22,8 +24,11 @@ __all__ = [
     'Base',
     'Ticket',
     'Analisis', 
+    'AnalisisKeyword',
     'Recomendacion',
     'MetricaCategoria',
+    'AgregadoCategoria',
+    'AgregadoPalabra',
     'User',              # ← NUEVO
     'RolUsuario'         # ← NUEVO
 ]
\ No newline at end of file
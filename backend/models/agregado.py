@@ -0,0 +1,55 @@
+"""
+Modelos AgregadoCategoria y AgregadoPalabra - Agregados incrementales por categoría
+
+El escritor de análisis (DatabaseManager.guardar_analisis_batch) los
+actualiza en la misma transacción que el lote, de modo que el IAR se
+recalcula leyendo una fila por categoría en lugar de toda la tabla analisis.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from .base import Base
+
+class AgregadoCategoria(Base):
+    __tablename__ = 'agregados_categoria'
+
+    # Primary key (Ticket.categoria)
+    categoria = Column(String(100), primary_key=True)
+
+    # Tickets con análisis
+    tickets_procesados = Column(Integer, nullable=False, default=0)
+
+    # Complejidad (solo valores distintos de 0): media y desviación salen de n, suma y suma de cuadrados
+    n_complejidad = Column(Integer, nullable=False, default=0)
+    suma_complejidad = Column(Float, nullable=False, default=0.0)
+    suma_cuadrados_complejidad = Column(Float, nullable=False, default=0.0)
+    complejidad_min = Column(Float)  # Envolvente: no baja al reprocesar, sí al reconstruir
+    complejidad_max = Column(Float)
+
+    # Distribución de urgencia
+    urgencia_critica = Column(Integer, nullable=False, default=0)
+    urgencia_alta = Column(Integer, nullable=False, default=0)
+    urgencia_media = Column(Integer, nullable=False, default=0)
+    urgencia_baja = Column(Integer, nullable=False, default=0)
+
+    # Distribución de sentimiento
+    sentimiento_positivo = Column(Integer, nullable=False, default=0)
+    sentimiento_neutral = Column(Integer, nullable=False, default=0)
+    sentimiento_negativo = Column(Integer, nullable=False, default=0)
+
+    # Palabras clave (el detalle está en agregados_palabras)
+    total_palabras = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AgregadoCategoria(categoria='{self.categoria}', tickets_procesados={self.tickets_procesados})>"
+
+class AgregadoPalabra(Base):
+    __tablename__ = 'agregados_palabras'
+
+    categoria = Column(String(100), primary_key=True)
+    palabra = Column(String(100), primary_key=True)
+    conteo = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AgregadoPalabra(categoria='{self.categoria}', palabra='{self.palabra}', conteo={self.conteo})>"
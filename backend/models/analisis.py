@@ -2,29 +2,84 @@
 Modelo Analisis - Resultados del procesamiento NLP
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, Index
+from sqlalchemy import (
+    Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON, Index,
+    ForeignKeyConstraint, UniqueConstraint
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
+from config import get_config
 from .base import Base
+from .tipos import EtiquetaCodificada, TextoComprimido, TiemposEtapas, SENTIMIENTOS, URGENCIAS
+
+# Modo de almacenamiento (ver ANALISIS_ALMACENAMIENTO / ANALISIS_TEXTO_LIMPIO)
+_config = get_config()
+COMPACTO = _config.ANALISIS_ALMACENAMIENTO == 'compacto'
+MODO_TEXTO_LIMPIO = _config.ANALISIS_TEXTO_LIMPIO
+
+if COMPACTO:
+    _TipoJSON = JSON().with_variant(JSONB(), 'postgresql')
+    _TipoTokens = Integer
+    _TipoSentimiento = EtiquetaCodificada(SENTIMIENTOS)
+    _TipoUrgencia = EtiquetaCodificada(URGENCIAS)
+else:
+    _TipoJSON = JSON
+    _TipoTokens = JSON
+    _TipoSentimiento = String(50)
+    _TipoUrgencia = String(50)
+
+_TipoTexto = TextoComprimido() if MODO_TEXTO_LIMPIO == 'comprimido' else Text
+
+# Particionado mensual: analisis se parte por la fecha_creacion de su ticket
+# (copiada en fecha_ticket) y la FK a tickets pasa a ser compuesta
+PARTICIONADO = _config.PARTICIONADO_MENSUAL
+
+if PARTICIONADO:
+    _fk_ticket = ()
+    _args_particion = (
+        ForeignKeyConstraint(['ticket_id', 'fecha_ticket'], ['tickets.id', 'tickets.fecha_creacion'],
+                             ondelete='CASCADE', name='fk_analisis_ticket'),
+        UniqueConstraint('ticket_id', 'fecha_ticket', name='uq_analisis_ticket_fecha'),
+        {'postgresql_partition_by': 'RANGE (fecha_ticket)'},
+    )
+    CLAVE_CONFLICTO = ('ticket_id', 'fecha_ticket')
+else:
+    _fk_ticket = (ForeignKey('tickets.id', ondelete='CASCADE'),)
+    _args_particion = ()
+    CLAVE_CONFLICTO = ('ticket_id',)
+
+def _fecha_analisis(valor):
+    """
+    fecha_analisis de un resultado: la marca de inicio del análisis
+
+    Acepta datetime o ISO 8601 (resultados serializados a JSON); sin marca
+    (resultados anteriores a este campo) usa la hora actual.
+    """
+    if isinstance(valor, str):
+        return datetime.fromisoformat(valor)
+    return valor or datetime.utcnow()
 
 class Analisis(Base):
     __tablename__ = 'analisis'
     
     # Primary key
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     
     # Foreign key
-    ticket_id = Column(Integer, ForeignKey('tickets.id', ondelete='CASCADE'), unique=True, nullable=False)
+    ticket_id = Column(Integer, *_fk_ticket, unique=not PARTICIONADO, nullable=False, index=PARTICIONADO)
+    if PARTICIONADO:
+        fecha_ticket = Column(DateTime, primary_key=True)  # Ticket.fecha_creacion, clave de partición
     
     # Análisis NLP
-    texto_limpio = Column(Text)
-    palabras_clave = Column(JSON)  # Lista de palabras clave extraídas
-    entidades = Column(JSON)  # Entidades nombradas (NER)
-    tokens = Column(JSON)  # Tokens procesados
+    texto_limpio = Column(_TipoTexto)  # NULL si ANALISIS_TEXTO_LIMPIO=omitir
+    palabras_clave = Column(_TipoJSON)  # Lista de palabras clave extraídas
+    entidades = Column(_TipoJSON)  # Entidades nombradas (NER)
+    tokens = Column(_TipoTokens)  # Cantidad de tokens procesados
     
     # Métricas de complejidad
     complejidad_score = Column(Float, default=0.0)
-    sentimiento = Column(String(50))  # positivo, negativo, neutral
-    urgencia = Column(String(50))  # baja, media, alta, critica
+    sentimiento = Column(_TipoSentimiento)  # positivo, negativo, neutral
+    urgencia = Column(_TipoUrgencia)  # baja, media, alta, critica
     
     # Clasificación
     categoria_detectada = Column(String(100))
@@ -38,6 +93,11 @@ class Analisis(Base):
     # Timestamps
     fecha_analisis = Column(DateTime, default=datetime.utcnow, nullable=False)
     tiempo_procesamiento_ms = Column(Float)  # Tiempo en milisegundos
+    tiempos_etapas = Column(TiemposEtapas())  # {etapa: ms} si NLP_TIEMPOS_ETAPAS (37 bytes)
+    
+    # Versión del analizador que produjo el resultado (reproceso incremental)
+    version_analizador = Column(String(20))
+    huella_analizador = Column(String(120))  # versión:léxicos:modelo[:tfidf-hash]
     
     # Relaciones
     ticket = relationship("Ticket", back_populates="analisis")
@@ -47,8 +107,47 @@ class Analisis(Base):
         Index('idx_categoria_detectada', 'categoria_detectada'),
         Index('idx_urgencia', 'urgencia'),
         Index('idx_sentimiento', 'sentimiento'),
-    )
+        Index('idx_analisis_huella', 'huella_analizador'),
+    ) + _args_particion
     
+    @staticmethod
+    def valores_desde_resultado(resultado, categoria=None, tiempo_procesamiento_ms=None):
+        """
+        Columnas de una fila de análisis a partir de un resultado de NLPProcessor
+
+        Args:
+            resultado (dict): Resultado de procesar_ticket/procesar_batch; su
+                fecha_analisis es el inicio del análisis y decide qué
+                resultado gana al guardar
+            categoria (str): Categoría original del ticket (respaldo)
+            tiempo_procesamiento_ms (float): Tiempo de procesamiento del ticket
+
+        Returns:
+            dict: {columna: valor}, apto para bulk_insert_mappings
+        """
+        texto_limpio = resultado.get('texto_limpio', '')
+        entidades = resultado.get('entidades_ner', {})
+        return {
+            'ticket_id': resultado['ticket_id'],
+            'texto_limpio': texto_limpio if MODO_TEXTO_LIMPIO != 'omitir' else None,
+            'palabras_clave': resultado.get('palabras_clave', []),
+            'entidades': entidades,
+            'tokens': resultado.get('num_tokens', 0),
+            'complejidad_score': resultado.get('complejidad', 0.0),
+            'sentimiento': resultado.get('sentimiento', {}).get('tipo', 'neutral'),
+            'urgencia': resultado.get('urgencia', {}).get('nivel', 'baja'),
+            'categoria_detectada': resultado.get('categoria', categoria),
+            'confianza_clasificacion': 0.8,  # Placeholder
+            'longitud_texto': len(texto_limpio),
+            'num_palabras': resultado.get('estadisticas', {}).get('num_palabras', 0),
+            'num_entidades': len(entidades.get('personas', [])),
+            'fecha_analisis': _fecha_analisis(resultado.get('fecha_analisis')),
+            'tiempo_procesamiento_ms': tiempo_procesamiento_ms,
+            'tiempos_etapas': resultado.get('tiempos_etapas'),
+            'version_analizador': resultado.get('version_analizador'),
+            'huella_analizador': resultado.get('huella_analizador')
+        }
+
     def __repr__(self):
         return f"<Analisis(id={self.id}, ticket_id={self.ticket_id}, categoria='{self.categoria_detectada}')>"
     
@@ -69,5 +168,8 @@ class Analisis(Base):
             'num_palabras': self.num_palabras,
             'num_entidades': self.num_entidades,
             'fecha_analisis': self.fecha_analisis.isoformat() if self.fecha_analisis else None,
-            'tiempo_procesamiento_ms': self.tiempo_procesamiento_ms
+            'tiempo_procesamiento_ms': self.tiempo_procesamiento_ms,
+            'tiempos_etapas': self.tiempos_etapas,
+            'version_analizador': self.version_analizador,
+            'huella_analizador': self.huella_analizador
         }
\ No newline at end of file
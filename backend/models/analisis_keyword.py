@@ -0,0 +1,28 @@
+"""
+Modelo AnalisisKeyword - Palabras clave de cada análisis, una fila por palabra
+
+Tabla derivada de analisis.palabras_clave (ANALISIS_KEYWORDS_TABLA=true)
+para agregar palabras con GROUP BY sobre un índice en lugar de expandir
+el JSON de cada análisis. La mantiene utils/palabras_clave.py.
+"""
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Index
+from .base import Base
+
+class AnalisisKeyword(Base):
+    __tablename__ = 'analisis_keywords'
+
+    ticket_id = Column(Integer, primary_key=True)
+    palabra = Column(String(100), primary_key=True)
+    veces = Column(SmallInteger, nullable=False, default=1)  # Repeticiones dentro del análisis
+
+    # Copias del ticket para filtrar y agrupar sin join
+    categoria = Column(String(100), nullable=False)
+    fecha_ticket = Column(DateTime, nullable=False)  # Ticket.fecha_creacion
+
+    __table_args__ = (
+        Index('idx_analisis_keywords_categoria_palabra', 'categoria', 'palabra'),
+        Index('idx_analisis_keywords_fecha', 'fecha_ticket'),
+    )
+
+    def __repr__(self):
+        return f"<AnalisisKeyword(ticket_id={self.ticket_id}, palabra='{self.palabra}')>"
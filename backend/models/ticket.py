@@ -2,22 +2,35 @@
 Modelo Ticket - Tabla principal de tickets de soporte
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
+from config import get_config
 from .base import Base
 
+# Con particionado mensual la PK y los UNIQUE deben incluir fecha_creacion
+PARTICIONADO = get_config().PARTICIONADO_MENSUAL
+
+if PARTICIONADO:
+    _args_particion = (
+        UniqueConstraint('ticket_id', 'fecha_creacion', name='uq_ticket_ticket_id_fecha'),
+        {'postgresql_partition_by': 'RANGE (fecha_creacion)'},
+    )
+else:
+    _args_particion = ()
+
 class Ticket(Base):
     __tablename__ = 'tickets'
     
     # Campos principales
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    ticket_id = Column(String(50), unique=not PARTICIONADO, nullable=False, index=True)
     titulo = Column(String(255), nullable=False)
     descripcion = Column(Text, nullable=False)
     categoria = Column(String(100), nullable=False, index=True)
     
     # Metadatos
-    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow, index=True,
+                            primary_key=PARTICIONADO)  # Clave de partición
     estado = Column(String(50), default='abierto')
     prioridad = Column(String(50), default='media')
     
@@ -29,6 +42,8 @@ class Ticket(Base):
     # Control de procesamiento
     procesado = Column(Boolean, default=False, index=True)
     fecha_procesamiento = Column(DateTime, nullable=True)
+    reclamado_en = Column(DateTime, nullable=True)  # Lease del worker que lo está procesando
+    reclamado_por = Column(String(100), nullable=True)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -43,7 +58,7 @@ class Ticket(Base):
         Index('idx_ticket_categoria_fecha', 'categoria', 'fecha_creacion'), 
         Index('idx_ticket_procesado_fecha', 'procesado', 'fecha_creacion'),  
         Index('idx_ticket_estado_prioridad', 'estado', 'prioridad'),          
-    )
+    ) + _args_particion
     
     def __repr__(self):
         return f"<Ticket(id={self.id}, ticket_id='{self.ticket_id}', categoria='{self.categoria}')>"
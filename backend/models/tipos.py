@@ -0,0 +1,110 @@
+"""
+Tipos de columna para el almacenamiento compacto de análisis
+
+En Python las columnas siguen viendo los mismos valores ('alta', 'negativo',
+texto plano, {etapa: ms}); la conversión a la representación compacta ocurre al
+escribir y leer.
+"""
+import sys
+import zlib
+from array import array
+
+from sqlalchemy.types import TypeDecorator, SmallInteger, LargeBinary
+
+# Códigos de etiquetas (no reordenar: son los valores guardados)
+SENTIMIENTOS = {'neutral': 0, 'positivo': 1, 'negativo': 2}
+URGENCIAS = {'baja': 0, 'media': 1, 'alta': 2, 'critica': 3}
+
+class EtiquetaCodificada(TypeDecorator):
+    """Etiqueta de texto guardada como smallint según un mapeo fijo"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, mapeo, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mapeo = tuple(sorted(mapeo.items()))
+        self._codigos = dict(mapeo)
+        self._etiquetas = {codigo: etiqueta for etiqueta, codigo in mapeo.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value not in self._codigos:
+            raise ValueError(f"Etiqueta desconocida: {value!r}")
+        return self._codigos[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._etiquetas.get(value)
+
+# Prefijo de los valores comprimidos; el texto plano nunca contiene NUL
+_PREFIJO_ZLIB = b'\x00'
+
+class TextoComprimido(TypeDecorator):
+    """
+    Texto guardado como bytes comprimidos con zlib
+
+    Solo se comprime si el resultado es más corto; los valores sin prefijo
+    son UTF-8 plano (filas migradas desde una columna de texto).
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        plano = value.encode('utf-8')
+        comprimido = _PREFIJO_ZLIB + zlib.compress(plano, 9)
+        return comprimido if len(comprimido) < len(plano) else plano
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = bytes(value)
+        if value.startswith(_PREFIJO_ZLIB):
+            return zlib.decompress(value[1:]).decode('utf-8')
+        return value.decode('utf-8')
+
+# Etapas de NLPProcessor con tiempo propio (no reordenar: es el formato guardado)
+ETAPAS_NLP = (
+    'limpieza', 'validacion', 'parse', 'lexicones', 'palabras_clave',
+    'entidades', 'sentimiento', 'urgencia', 'complejidad'
+)
+
+# Versión del formato binario y marca de etapa no ejecutada (p. ej. cache)
+_VERSION_TIEMPOS = 1
+_SIN_TIEMPO = 0xFFFFFFFF
+
+class TiemposEtapas(TypeDecorator):
+    """
+    Tiempos por etapa {etapa: ms} guardados como bytes: un byte de versión y
+    un uint32 de microsegundos por etapa en el orden de ETAPAS_NLP (37 bytes)
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if not value:
+            return None
+        microsegundos = array('I', (
+            min(int(round(value[etapa] * 1000)), _SIN_TIEMPO - 1) if etapa in value else _SIN_TIEMPO
+            for etapa in ETAPAS_NLP
+        ))
+        if sys.byteorder != 'little':
+            microsegundos.byteswap()
+        return bytes([_VERSION_TIEMPOS]) + microsegundos.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = bytes(value)
+        microsegundos = array('I')
+        microsegundos.frombytes(value[1:])
+        if sys.byteorder != 'little':
+            microsegundos.byteswap()
+        return {
+            etapa: us / 1000
+            for etapa, us in zip(ETAPAS_NLP, microsegundos)
+            if us != _SIN_TIEMPO
+        }
@@ -0,0 +1,161 @@
+"""
+Ajusta los modelos TF-IDF de palabras clave sobre el corpus analizado
+
+Lee texto_limpio (o la descripción limpia si no se guardó) y categoría de
+los análisis existentes, ajusta el motor TF-IDF (global o por categoría),
+guarda vocabulario e IDF en TFIDF_MODELO_DIR y opcionalmente reescribe
+Analisis.palabras_clave. Un modelo nuevo cambia la huella del analizador:
+sin --reescribir, los análisis existentes quedan obsoletos para
+process_batch_150k.py --modo reprocesar.
+
+Uso:
+    python backend/scripts/ajustar_tfidf.py
+    python backend/scripts/ajustar_tfidf.py --ambito categoria --reescribir
+    python backend/scripts/ajustar_tfidf.py --limite 200000 --batch-size 5000
+"""
+import sys
+import argparse
+import logging
+import time
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.database import db_manager
+from utils import agregados, palabras_clave
+from models.ticket import Ticket
+from models.analisis import Analisis
+from services.keyword_engine import TfidfKeywordEngine, huella_analizador
+from services.text_cleaner import limpiar_texto
+from config import get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def leer_corpus(session, limite=None, batch_size=5000):
+    """
+    Lee (id, ticket_id, texto_limpio, categoria, huella_analizador) de los análisis en streaming
+
+    Si texto_limpio no se guardó (ANALISIS_TEXTO_LIMPIO=omitir) se
+    recalcula desde la descripción del ticket.
+    """
+    query = session.query(Analisis.id, Analisis.ticket_id, Analisis.texto_limpio, Ticket.descripcion,
+                          Ticket.categoria, Analisis.huella_analizador)\
+        .join(Ticket, Ticket.id == Analisis.ticket_id)\
+        .order_by(Analisis.id)
+
+    if limite:
+        query = query.limit(limite)
+
+    for analisis_id, ticket_id, texto_limpio, descripcion, categoria, huella in query.yield_per(batch_size):
+        if texto_limpio is None:
+            texto_limpio = limpiar_texto(descripcion or '')
+        yield analisis_id, ticket_id, texto_limpio, categoria, huella
+
+def _huella_reescrita(huella, motor):
+    """Huella del análisis con la parte TF-IDF del motor nuevo"""
+    if not huella:
+        return huella  # Sin huella: sigue obsoleto para el reproceso
+    return huella_analizador(huella.split(':tfidf-')[0], motor)
+
+def reescribir_palabras_clave(session, motor, batch_size=5000):
+    """
+    Recalcula palabras_clave (y la huella TF-IDF) de todos los análisis con el motor ajustado
+
+    Con AGREGADOS_CATEGORIA=true cada lote bloquea sus tickets y aplica la
+    diferencia de palabras a los agregados en la misma transacción, y con
+    ANALISIS_KEYWORDS_TABLA=true reemplaza sus filas de analisis_keywords.
+    """
+    total = 0
+    lote = []
+
+    # Sesión aparte para escribir: el commit cerraría el cursor de lectura
+    session_escritura = db_manager.get_session()
+
+    def volcar():
+        palabras = motor.extraer([t for _, _, t, _, _ in lote], [c for _, _, _, c, _ in lote])
+        ticket_ids = [ticket_id for _, ticket_id, _, _, _ in lote]
+
+        # Palabras vigentes antes de que bulk_update_mappings las reemplace
+        previos = None
+        if agregados.AGREGADOS_ACTIVOS:
+            previos = agregados.leer_estado_previo(session_escritura, ticket_ids)
+
+        session_escritura.bulk_update_mappings(Analisis, [
+            {'id': analisis_id, 'huella_analizador': _huella_reescrita(huella, motor),
+             **({'palabras_clave': p} if p is not None else {})}
+            for (analisis_id, _, _, _, huella), p in zip(lote, palabras)
+        ])
+
+        if previos is not None:
+            agregados.aplicar_palabras_clave(session_escritura, previos, {
+                ticket_id: p for (_, ticket_id, _, _, _), p in zip(lote, palabras) if p is not None
+            })
+        palabras_clave.sincronizar_lote(session_escritura, ticket_ids)
+        session_escritura.commit()
+
+    try:
+        for fila in leer_corpus(session, batch_size=batch_size):
+            lote.append(fila)
+            if len(lote) >= batch_size:
+                volcar()
+                total += len(lote)
+                logger.info(f"✏️  {total:,} análisis actualizados")
+                lote = []
+
+        if lote:
+            volcar()
+            total += len(lote)
+    finally:
+        session_escritura.close()
+
+    return total
+
+def main():
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Ajuste de modelos TF-IDF de palabras clave')
+    parser.add_argument('--ambito', choices=['corpus', 'categoria'], default=config.TFIDF_AMBITO)
+    parser.add_argument('--top-n', type=int, default=config.TFIDF_TOP_N)
+    parser.add_argument('--limite', type=int, default=None, help='Máximo de análisis usados para ajustar')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--directorio', default=config.TFIDF_MODELO_DIR)
+    parser.add_argument('--reescribir', action='store_true', help='Reescribir Analisis.palabras_clave')
+    args = parser.parse_args()
+
+    db_manager.init_engine()
+    session = db_manager.get_session()
+
+    try:
+        inicio = time.time()
+
+        textos, categorias = [], []
+        for _, _, texto, categoria, _ in leer_corpus(session, args.limite, args.batch_size):
+            textos.append(texto)
+            categorias.append(categoria)
+
+        logger.info(f"📊 Corpus: {len(textos):,} textos")
+        if not textos:
+            logger.info("✅ No hay análisis para ajustar")
+            return
+
+        motor = TfidfKeywordEngine(top_n=args.top_n, ambito=args.ambito)
+        motor.ajustar(textos, categorias)
+        motor.guardar(args.directorio)
+        del textos, categorias
+
+        if args.reescribir:
+            total = reescribir_palabras_clave(session, motor, args.batch_size)
+            logger.info(f"✅ palabras_clave reescritas en {total:,} análisis")
+
+        logger.info(f"⏱️  Tiempo total: {time.time() - inicio:.1f}s")
+
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
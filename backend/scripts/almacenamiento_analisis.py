@@ -0,0 +1,149 @@
+"""
+Almacenamiento compacto de la tabla analisis
+
+Subcomandos:
+    reporte   Tamaño en disco por tabla (total, heap, índices, TOAST, bytes/fila)
+              y, con PARTICIONADO_MENSUAL, por partición
+    migrar    Aplica las migraciones del modo configurado en
+              ANALISIS_ALMACENAMIENTO / ANALISIS_TEXTO_LIMPIO y muestra el
+              reporte antes y después
+
+Con ANALISIS_TEXTO_LIMPIO=omitir, --vaciar-texto-limpio pone en NULL el
+texto de las filas existentes por lotes; --vacuum corre VACUUM FULL sobre
+analisis para devolver el espacio liberado (bloquea la tabla).
+
+Uso:
+    python backend/scripts/almacenamiento_analisis.py reporte --output-json tamanos.json
+    ANALISIS_ALMACENAMIENTO=compacto python backend/scripts/almacenamiento_analisis.py migrar --vacuum
+    ANALISIS_TEXTO_LIMPIO=omitir python backend/scripts/almacenamiento_analisis.py migrar --vaciar-texto-limpio
+"""
+import sys
+import argparse
+import json
+import logging
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from utils.database import db_manager
+from utils.particiones import listar_particiones
+from config import get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def _mb(valor):
+    return f"{valor / 1024 / 1024:,.1f} MB"
+
+def imprimir_reporte(tamanos, titulo):
+    """Tabla legible de get_tamanos_tablas"""
+    print()
+    print(f"📦 {titulo}")
+    print(f"   {'Tabla':<20}{'Filas':>12}{'Total':>14}{'Heap':>14}{'Índices':>14}{'TOAST':>14}{'B/fila':>10}")
+    for tabla, t in tamanos.items():
+        print(f"   {tabla:<20}{t['filas']:>12,}{_mb(t['total_bytes']):>14}{_mb(t['tabla_bytes']):>14}"
+              f"{_mb(t['indices_bytes']):>14}{_mb(t['toast_bytes']):>14}{t['bytes_por_fila'] or '-':>10}")
+
+def imprimir_particiones(particiones):
+    """Filas y tamaño de cada partición mensual"""
+    print()
+    print("🗂️  Particiones")
+    for p in particiones:
+        print(f"   {p['particion']:<24}{p['filas']:>12,}{_mb(p['total_bytes']):>14}  {p['rango']}")
+
+def vaciar_texto_limpio(batch_size=10000):
+    """
+    Pone texto_limpio en NULL por rangos de id, una transacción por lote
+
+    Returns:
+        int: Filas actualizadas
+    """
+    with db_manager.engine.connect() as conn:
+        maximo = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM analisis")).scalar()
+
+    total = 0
+    for desde in range(0, maximo, batch_size):
+        with db_manager.engine.begin() as conn:
+            resultado = conn.execute(text(
+                "UPDATE analisis SET texto_limpio = NULL "
+                "WHERE id > :desde AND id <= :hasta AND texto_limpio IS NOT NULL"
+            ), {'desde': desde, 'hasta': desde + batch_size})
+            total += resultado.rowcount
+        logger.info(f"🧹 Hasta id {min(desde + batch_size, maximo):,}: {total:,} textos vaciados")
+    return total
+
+def vacuum_analisis():
+    """VACUUM FULL ANALYZE analisis (fuera de transacción)"""
+    logger.info("🧽 VACUUM FULL analisis (la tabla queda bloqueada mientras corre)")
+    with db_manager.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text("VACUUM FULL ANALYZE analisis"))
+
+def migrar(args):
+    """Aplica el modo configurado y reporta tamaños antes/después"""
+    config = get_config()
+    logger.info(f"⚙️  Almacenamiento: {config.ANALISIS_ALMACENAMIENTO}, texto_limpio: {config.ANALISIS_TEXTO_LIMPIO}")
+
+    antes = db_manager.get_tamanos_tablas()
+    imprimir_reporte(antes, 'Antes')
+
+    db_manager.create_all_tables()
+
+    if args.vaciar_texto_limpio:
+        if config.ANALISIS_TEXTO_LIMPIO != 'omitir':
+            logger.warning("⚠️  --vaciar-texto-limpio requiere ANALISIS_TEXTO_LIMPIO=omitir; se ignora")
+        else:
+            vaciar_texto_limpio(args.batch_size)
+
+    if args.vacuum:
+        vacuum_analisis()
+
+    despues = db_manager.get_tamanos_tablas()
+    imprimir_reporte(despues, 'Después')
+
+    if 'analisis' in antes and 'analisis' in despues:
+        ahorro = antes['analisis']['total_bytes'] - despues['analisis']['total_bytes']
+        logger.info(f"📉 analisis: {_mb(ahorro)} liberados")
+
+    return {'antes': antes, 'despues': despues}
+
+def main():
+    parser = argparse.ArgumentParser(description='Almacenamiento compacto de análisis')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_reporte = subparsers.add_parser('reporte', help='Tamaño en disco por tabla')
+    p_reporte.add_argument('--output-json', default=None)
+
+    p_migrar = subparsers.add_parser('migrar', help='Aplicar el modo de almacenamiento configurado')
+    p_migrar.add_argument('--vaciar-texto-limpio', action='store_true',
+                          help='Poner en NULL texto_limpio existente (ANALISIS_TEXTO_LIMPIO=omitir)')
+    p_migrar.add_argument('--vacuum', action='store_true', help='VACUUM FULL analisis al terminar')
+    p_migrar.add_argument('--batch-size', type=int, default=10000)
+    p_migrar.add_argument('--output-json', default=None)
+
+    args = parser.parse_args()
+
+    db_manager.init_engine()
+
+    if args.comando == 'reporte':
+        reporte = db_manager.get_tamanos_tablas()
+        imprimir_reporte(reporte, 'Tamaño por tabla')
+        particiones = listar_particiones(db_manager.engine)
+        if particiones:
+            imprimir_particiones(particiones)
+            reporte = {'tablas': reporte, 'particiones': particiones}
+    else:
+        reporte = migrar(args)
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Reporte guardado en {args.output_json}")
+
+if __name__ == "__main__":
+    main()
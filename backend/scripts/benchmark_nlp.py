@@ -0,0 +1,222 @@
+"""
+Benchmark de throughput de NLPProcessor con tickets sintéticos
+
+Construye corpus de semilla fija con las funciones generadoras de
+generate_tickets_nexo_gamer.py (sin base de datos) y mide, por motor:
+
+- tickets/s de extremo a extremo con procesar_stream (ruta por lotes)
+- latencia p50/p99 por etapa: limpieza, parse, léxicos, palabras clave,
+  urgencia, sentimiento y complejidad
+
+Motores: 'spacy' (modelo configurado), 'lite' (tabla de lemas) y
+'sin-spacy' (ruta de respaldo sin doc). El cache NLP se desactiva para
+medir el motor y no el cache. La salida JSON permite comparar corridas.
+
+Uso:
+    python backend/scripts/benchmark_nlp.py
+    python backend/scripts/benchmark_nlp.py --tamanos 1000 10000 --motores lite sin-spacy
+    python backend/scripts/benchmark_nlp.py --output-json bench_$(date +%F).json
+"""
+import sys
+import argparse
+import json
+import logging
+import platform
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from faker import Faker
+
+from scripts.generate_tickets_nexo_gamer import GeneradorNexoGamer
+from services.nlp_processor import NLPProcessor, VERSION_ANALIZADOR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ETAPAS = ['limpieza', 'parse', 'lexicones', 'palabras_clave', 'urgencia', 'sentimiento', 'complejidad']
+
+def generar_corpus(cantidad, semilla=42):
+    """
+    Genera tickets sintéticos reproducibles con las funciones _gen_*
+
+    Args:
+        cantidad (int): Número de tickets
+        semilla (int): Semilla de random y Faker
+
+    Returns:
+        list: [{id, descripcion, categoria}]
+    """
+    random.seed(semilla)
+    Faker.seed(semilla)
+
+    generador = GeneradorNexoGamer(total_tickets=cantidad)
+    corpus = []
+    for i in range(cantidad):
+        categoria = generador._seleccionar_categoria()
+        contenido = generador._generar_contenido(categoria)
+        corpus.append({'id': i + 1, 'descripcion': contenido['descripcion'], 'categoria': categoria})
+    return corpus
+
+def crear_processor(motor):
+    """NLPProcessor sin cache para el motor pedido"""
+    processor = NLPProcessor(modo='spacy' if motor == 'spacy' else 'lite')
+    if motor == 'sin-spacy':
+        processor.nlp = None
+    processor.cache = None
+    return processor
+
+def medir_etapas(processor, corpus):
+    """
+    Recorre el corpus ticket por ticket cronometrando cada etapa
+
+    Replica los pasos de procesar_ticket/_analizar_texto con los mismos
+    métodos del procesador.
+
+    Returns:
+        tuple: ({etapa: np.array de µs}, tickets válidos)
+    """
+    tiempos = {etapa: [] for etapa in ETAPAS}
+    reloj = time.perf_counter
+    validos = 0
+
+    for ticket in corpus:
+        t0 = reloj()
+        preparado = processor._preparar_ticket(ticket['id'], ticket['descripcion'], ticket['categoria'])
+        t1 = reloj()
+        tiempos['limpieza'].append(t1 - t0)
+        if not preparado.get('valido'):
+            continue
+        validos += 1
+
+        texto = preparado['texto_limpio']
+        estadisticas = preparado['estadisticas']
+
+        t0 = reloj()
+        doc = processor.nlp(texto) if processor.nlp is not None else None
+        t1 = reloj()
+        hits = processor.matcher.buscar(texto)
+        t2 = reloj()
+        if doc is not None:
+            tokens = [
+                token.lemma_
+                for token in doc
+                if not token.is_stop and not token.is_punct and len(token.text) > 2
+            ]
+        else:
+            tokens = [palabra.lower() for palabra in texto.split() if len(palabra) > 2]
+        processor._extraer_palabras_clave(tokens, top_n=10)
+        t3 = reloj()
+        processor._clasificar_urgencia(texto, tokens, hits)
+        t4 = reloj()
+        processor._analizar_sentimiento_basico(doc, texto, hits)
+        t5 = reloj()
+        if doc is not None:
+            processor._calcular_complejidad(doc, estadisticas)
+        else:
+            processor._calcular_complejidad_basica(estadisticas)
+        t6 = reloj()
+
+        tiempos['parse'].append(t1 - t0)
+        tiempos['lexicones'].append(t2 - t1)
+        tiempos['palabras_clave'].append(t3 - t2)
+        tiempos['urgencia'].append(t4 - t3)
+        tiempos['sentimiento'].append(t5 - t4)
+        tiempos['complejidad'].append(t6 - t5)
+
+    return {etapa: np.array(valores) * 1e6 for etapa, valores in tiempos.items()}, validos
+
+def resumir_etapa(microsegundos):
+    """p50/p99/media en µs y throughput aislado de la etapa"""
+    if not len(microsegundos):
+        return {'muestras': 0}
+    p50, p99 = np.percentile(microsegundos, [50, 99])
+    media = float(microsegundos.mean())
+    return {
+        'muestras': int(len(microsegundos)),
+        'p50_us': round(float(p50), 2),
+        'p99_us': round(float(p99), 2),
+        'media_us': round(media, 2),
+        'tickets_por_segundo': round(1e6 / media, 1) if media else None
+    }
+
+def correr(motor, corpus):
+    """Benchmark completo de un motor sobre un corpus"""
+    processor = crear_processor(motor)
+
+    inicio = time.perf_counter()
+    for _ in processor.procesar_stream(corpus):
+        pass
+    segundos_stream = time.perf_counter() - inicio
+
+    tiempos, validos = medir_etapas(processor, corpus)
+
+    return {
+        'motor': motor,
+        'modo_efectivo': 'sin-spacy' if processor.nlp is None else processor.modo,
+        'tickets': len(corpus),
+        'validos': validos,
+        'segundos_stream': round(segundos_stream, 3),
+        'tickets_por_segundo': round(len(corpus) / segundos_stream, 1) if segundos_stream else None,
+        'etapas': {etapa: resumir_etapa(valores) for etapa, valores in tiempos.items()}
+    }
+
+def imprimir_corrida(corrida):
+    """Tabla legible de una corrida"""
+    print()
+    print(f"🧪 {corrida['motor']} ({corrida['modo_efectivo']}) - {corrida['tickets']:,} tickets, "
+          f"{corrida['validos']:,} válidos")
+    print(f"   Stream: {corrida['tickets_por_segundo']:,} tickets/s ({corrida['segundos_stream']}s)")
+    print(f"   {'Etapa':<16}{'p50 µs':>10}{'p99 µs':>10}{'tickets/s':>14}")
+    for etapa, stats in corrida['etapas'].items():
+        if not stats['muestras']:
+            continue
+        print(f"   {etapa:<16}{stats['p50_us']:>10}{stats['p99_us']:>10}{stats['tickets_por_segundo']:>14,}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de throughput NLP con tickets sintéticos')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Tamaños de corpus')
+    parser.add_argument('--motores', nargs='+', choices=['spacy', 'lite', 'sin-spacy'],
+                        default=['spacy', 'lite', 'sin-spacy'])
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--output-json', default=None)
+    args = parser.parse_args()
+
+    # Los logs por ticket del procesador distorsionan la medición
+    logging.getLogger('services').setLevel(logging.ERROR)
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'version_analizador': VERSION_ANALIZADOR,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semilla': args.semilla,
+        'corridas': []
+    }
+
+    for tamano in args.tamanos:
+        logger.info(f"🎲 Generando corpus de {tamano:,} tickets (semilla {args.semilla})")
+        corpus = generar_corpus(tamano, args.semilla)
+        for motor in args.motores:
+            logger.info(f"⏱️  Midiendo motor '{motor}' con {tamano:,} tickets")
+            corrida = correr(motor, corpus)
+            reporte['corridas'].append(corrida)
+            imprimir_corrida(corrida)
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Reporte guardado en {args.output_json}")
+
+if __name__ == "__main__":
+    main()
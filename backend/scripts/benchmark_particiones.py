@@ -0,0 +1,264 @@
+"""
+Benchmark de tickets/analisis particionados por mes vs. tabla única
+
+Crea dos esquemas de prueba en PostgreSQL con las columnas que usan el
+dashboard y el IAR (bench_plano y bench_particionado), los carga con el
+mismo volumen sintético vía generate_series (10M tickets por defecto),
+y mide las consultas típicas en ambos:
+
+- pendientes_mes       tickets sin procesar del último mes
+- reclamo_lote         siguiente lote pendiente por fecha (como reclamar_tickets)
+- dashboard_trimestre  distribución por categoría del último trimestre (join)
+- iar_categoria_mes    complejidad y urgencia de una categoría en un mes (join)
+- conteo_total         conteo completo (peor caso para particiones)
+
+Reporta mediana en ms, particiones leídas según EXPLAIN y tamaño en disco
+de cada esquema. Las tablas reales no se tocan.
+
+Uso:
+    python backend/scripts/benchmark_particiones.py
+    python backend/scripts/benchmark_particiones.py --filas 1000000 --meses 12 --conservar
+    python backend/scripts/benchmark_particiones.py --output-json particiones.json
+"""
+import sys
+import argparse
+import json
+import logging
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from utils.database import db_manager
+from utils.particiones import meses_entre, nombre_particion, sumar_meses
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ESQUEMAS = ['bench_plano', 'bench_particionado']
+
+CATEGORIAS = [
+    'problemas_pago', 'cuenta_bloqueada', 'descarga_lenta', 'reembolso', 'codigo_invalido',
+    'envio_retrasado', 'producto_defectuoso', 'error_instalacion', 'soporte_tecnico', 'otro'
+]
+
+CONSULTAS = {
+    'pendientes_mes': (
+        "SELECT COUNT(*) FROM tickets "
+        "WHERE procesado = FALSE AND fecha_creacion >= :mes AND fecha_creacion < :fin"
+    ),
+    'reclamo_lote': (
+        "SELECT id FROM tickets WHERE procesado = FALSE "
+        "AND fecha_creacion >= :mes ORDER BY fecha_creacion LIMIT 500"
+    ),
+    'dashboard_trimestre': (
+        "SELECT t.categoria, COUNT(a.id) FROM tickets t "
+        "JOIN analisis a ON a.ticket_id = t.id AND a.fecha_ticket = t.fecha_creacion "
+        "WHERE t.fecha_creacion >= :trimestre AND t.fecha_creacion < :fin "
+        "AND a.fecha_ticket >= :trimestre AND a.fecha_ticket < :fin "
+        "GROUP BY t.categoria"
+    ),
+    'iar_categoria_mes': (
+        "SELECT AVG(a.complejidad_score), STDDEV_POP(a.complejidad_score), "
+        "COUNT(*) FILTER (WHERE a.urgencia = 'critica') FROM tickets t "
+        "JOIN analisis a ON a.ticket_id = t.id AND a.fecha_ticket = t.fecha_creacion "
+        "WHERE t.categoria = :categoria AND t.fecha_creacion >= :mes AND t.fecha_creacion < :fin "
+        "AND a.fecha_ticket >= :mes AND a.fecha_ticket < :fin"
+    ),
+    'conteo_total': "SELECT COUNT(*) FROM tickets",
+}
+
+def crear_esquema(conn, esquema, particionado, desde, hasta):
+    """Tablas mínimas con los mismos índices que los modelos"""
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {esquema} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {esquema}"))
+    conn.execute(text(f"SET LOCAL search_path TO {esquema}"))
+
+    pk_tickets = "PRIMARY KEY (id, fecha_creacion)" if particionado else "PRIMARY KEY (id)"
+    pk_analisis = "PRIMARY KEY (id, fecha_ticket)" if particionado else "PRIMARY KEY (id)"
+    particion_tickets = "PARTITION BY RANGE (fecha_creacion)" if particionado else ""
+    particion_analisis = "PARTITION BY RANGE (fecha_ticket)" if particionado else ""
+
+    conn.execute(text(
+        "CREATE TABLE tickets (id BIGINT NOT NULL, categoria VARCHAR(100) NOT NULL, "
+        "descripcion TEXT NOT NULL, fecha_creacion TIMESTAMP NOT NULL, "
+        f"procesado BOOLEAN NOT NULL DEFAULT FALSE, {pk_tickets}) {particion_tickets}"
+    ))
+    conn.execute(text(
+        "CREATE TABLE analisis (id BIGINT NOT NULL, ticket_id BIGINT NOT NULL, "
+        "fecha_ticket TIMESTAMP NOT NULL, complejidad_score FLOAT, urgencia VARCHAR(50), "
+        f"sentimiento VARCHAR(50), {pk_analisis}) {particion_analisis}"
+    ))
+
+    if particionado:
+        for tabla in ('tickets', 'analisis'):
+            for mes in meses_entre(desde, hasta):
+                conn.execute(text(
+                    f"CREATE TABLE {nombre_particion(tabla, mes)} PARTITION OF {tabla} "
+                    f"FOR VALUES FROM ('{mes:%Y-%m-%d}') TO ('{sumar_meses(mes, 1):%Y-%m-%d}')"
+                ))
+            conn.execute(text(f"CREATE TABLE {tabla}_default PARTITION OF {tabla} DEFAULT"))
+
+    conn.execute(text("CREATE INDEX ON tickets (fecha_creacion)"))
+    conn.execute(text("CREATE INDEX ON tickets (categoria, fecha_creacion)"))
+    conn.execute(text("CREATE INDEX ON tickets (procesado, fecha_creacion)"))
+    conn.execute(text("CREATE INDEX ON analisis (ticket_id)"))
+
+def cargar_datos(conn, filas, desde, segundos_rango, tasa_procesados, lote=1000000):
+    """Carga tickets por tramos de generate_series y sus análisis"""
+    categorias = "ARRAY[" + ", ".join(f"'{c}'" for c in CATEGORIAS) + "]"
+    for inicio in range(1, filas + 1, lote):
+        fin = min(inicio + lote - 1, filas)
+        conn.execute(text(
+            "INSERT INTO tickets (id, categoria, descripcion, fecha_creacion, procesado) "
+            f"SELECT g, ({categorias})[1 + (g % {len(CATEGORIAS)})], "
+            "'ticket sintético ' || g, "
+            ":desde + (random() * :rango) * INTERVAL '1 second', "
+            "random() < :tasa "
+            "FROM generate_series(:inicio, :fin) g"
+        ), {'desde': desde, 'rango': segundos_rango, 'tasa': tasa_procesados, 'inicio': inicio, 'fin': fin})
+        logger.info(f"   {fin:,}/{filas:,} tickets")
+
+    conn.execute(text(
+        "INSERT INTO analisis (id, ticket_id, fecha_ticket, complejidad_score, urgencia, sentimiento) "
+        "SELECT id, id, fecha_creacion, random() * 100, "
+        "(ARRAY['baja', 'media', 'alta', 'critica'])[1 + (id % 4)], "
+        "(ARRAY['neutral', 'positivo', 'negativo'])[1 + (id % 3)] "
+        "FROM tickets WHERE procesado"
+    ))
+    conn.execute(text("ANALYZE tickets"))
+    conn.execute(text("ANALYZE analisis"))
+
+def _relaciones_leidas(plan):
+    """Tablas/particiones distintas que aparecen en un plan EXPLAIN (FORMAT JSON)"""
+    relaciones = set()
+    pendientes = [plan]
+    while pendientes:
+        nodo = pendientes.pop()
+        if 'Relation Name' in nodo:
+            relaciones.add(nodo['Relation Name'])
+        pendientes.extend(nodo.get('Plans', []))
+    return relaciones
+
+def medir(conn, sql, parametros, repeticiones):
+    """Mediana de tiempo en ms y relaciones leídas"""
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), parametros).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    relaciones = _relaciones_leidas(plan[0]['Plan'])
+
+    conn.execute(text(sql), parametros).all()  # Calentar cache
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(text(sql), parametros).all()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        'mediana_ms': round(statistics.median(tiempos), 2),
+        'min_ms': round(min(tiempos), 2),
+        'relaciones_leidas': len(relaciones)
+    }
+
+def tamano_esquema(conn, esquema):
+    """Bytes totales (tablas + índices + TOAST) de un esquema"""
+    return conn.execute(text(
+        "SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0)::bigint FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = :esquema AND c.relkind = 'r'"
+    ), {'esquema': esquema}).scalar()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de particionado mensual')
+    parser.add_argument('--filas', type=int, default=10000000, help='Tickets sintéticos por esquema')
+    parser.add_argument('--meses', type=int, default=24, help='Meses de historia')
+    parser.add_argument('--tasa-procesados', type=float, default=0.7, help='Fracción con análisis')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--conservar', action='store_true', help='No borrar los esquemas al terminar')
+    parser.add_argument('--output-json', default=None)
+    args = parser.parse_args()
+
+    engine = db_manager.init_engine()
+    if engine.dialect.name != 'postgresql':
+        logger.error("❌ El benchmark de particiones requiere PostgreSQL")
+        return
+
+    hoy = datetime.utcnow()
+    desde = sumar_meses(hoy, -args.meses + 1)
+    hasta = sumar_meses(hoy, 0)
+    fin = sumar_meses(hoy, 1)
+    segundos_rango = (fin - desde).total_seconds()
+
+    parametros = {
+        'mes': hasta,
+        'trimestre': sumar_meses(hoy, -2),
+        'fin': fin,
+        'categoria': CATEGORIAS[0]
+    }
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'filas': args.filas,
+        'meses': args.meses,
+        'esquemas': {}
+    }
+
+    try:
+        for esquema in ESQUEMAS:
+            particionado = esquema == 'bench_particionado'
+            logger.info(f"🏗️  {esquema}: creando y cargando {args.filas:,} tickets")
+
+            inicio = time.perf_counter()
+            with engine.begin() as conn:
+                crear_esquema(conn, esquema, particionado, desde, hasta)
+                cargar_datos(conn, args.filas, desde, segundos_rango, args.tasa_procesados)
+            segundos_carga = time.perf_counter() - inicio
+
+            with engine.connect() as conn:
+                conn.execute(text(f"SET LOCAL search_path TO {esquema}"))
+                consultas = {}
+                for nombre, sql in CONSULTAS.items():
+                    consultas[nombre] = medir(conn, sql, parametros, args.repeticiones)
+                    logger.info(f"   ⏱️  {nombre}: {consultas[nombre]['mediana_ms']} ms "
+                                f"({consultas[nombre]['relaciones_leidas']} relaciones)")
+                conn.rollback()
+                total_bytes = tamano_esquema(conn, esquema)
+
+            reporte['esquemas'][esquema] = {
+                'segundos_carga': round(segundos_carga, 1),
+                'total_bytes': total_bytes,
+                'consultas': consultas
+            }
+    finally:
+        if not args.conservar:
+            with engine.begin() as conn:
+                for esquema in ESQUEMAS:
+                    conn.execute(text(f"DROP SCHEMA IF EXISTS {esquema} CASCADE"))
+
+    print()
+    print(f"📊 {args.filas:,} tickets, {args.meses} meses")
+    print(f"   {'Consulta':<22}{'plano ms':>12}{'particionado ms':>18}{'particiones':>14}")
+    plano = reporte['esquemas'].get('bench_plano', {}).get('consultas', {})
+    particionado = reporte['esquemas'].get('bench_particionado', {}).get('consultas', {})
+    for nombre in CONSULTAS:
+        if nombre in plano and nombre in particionado:
+            print(f"   {nombre:<22}{plano[nombre]['mediana_ms']:>12}{particionado[nombre]['mediana_ms']:>18}"
+                  f"{particionado[nombre]['relaciones_leidas']:>14}")
+    for esquema, datos in reporte['esquemas'].items():
+        print(f"   💾 {esquema}: {datos['total_bytes'] / 1024 / 1024:,.1f} MB, carga {datos['segundos_carga']}s")
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Reporte guardado en {args.output_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark de normalización de texto: ruta anterior vs normalizar_ticket
+
+Compara el costo por ticket de la secuencia que usaba procesar_ticket
+(es_texto_valido + extraer_entidades_basicas + limpiar_texto +
+calcular_estadisticas_texto) contra normalizar_ticket, y verifica que
+ambas rutas produzcan exactamente la misma salida.
+
+Uso:
+    python backend/scripts/benchmark_text_cleaner.py
+    python backend/scripts/benchmark_text_cleaner.py --tickets 20000 --repeticiones 5
+"""
+import sys
+import argparse
+import random
+import time
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.text_cleaner import (
+    limpiar_texto,
+    extraer_entidades_basicas,
+    calcular_estadisticas_texto,
+    es_texto_valido,
+    normalizar_ticket
+)
+
+PLANTILLAS = [
+    "Hola, mi pedido ORD-{num} no ha llegado y ya pasaron {dias} días. Es URGENTE!!",
+    "El juego no funciona después de la actualización, me sale error {num}. Escríbanme a {email}",
+    "Quiero hacer trade-in de mi consola, ¿cuánto me dan? Mi teléfono es +502 5{num}",
+    "Compré el DLC hace {dias} días y no aparece en mi biblioteca. Ver {url}",
+    "ok",
+    "La reparación de mi PC tarda demasiado, orden #{num}. @soporte #ayuda",
+    "Excelente servicio, gracias por la rapidez con el envío de mi pedido {num}.",
+]
+
+def generar_corpus(cantidad, semilla=42):
+    """Genera descripciones sintéticas con entidades variadas"""
+    rnd = random.Random(semilla)
+    return [
+        rnd.choice(PLANTILLAS).format(
+            num=rnd.randint(1000, 9999999),
+            dias=rnd.randint(1, 30),
+            email=f"cliente{rnd.randint(1, 999)}@correo.com",
+            url=f"https://nexogamer.com/ayuda/{rnd.randint(1, 500)}"
+        )
+        for _ in range(cantidad)
+    ]
+
+def ruta_anterior(texto):
+    """Secuencia de llamadas que hacía procesar_ticket antes del normalizador"""
+    if not es_texto_valido(texto):
+        return None
+    entidades = extraer_entidades_basicas(texto)
+    texto_limpio = limpiar_texto(texto)
+    estadisticas = calcular_estadisticas_texto(texto_limpio)
+    return texto_limpio, entidades, estadisticas
+
+def ruta_fusionada(texto):
+    """Misma salida usando normalizar_ticket"""
+    resultado = normalizar_ticket(texto)
+    if not resultado['valido']:
+        return None
+    return resultado['texto_limpio'], resultado['entidades'], resultado['estadisticas']
+
+def medir(funcion, corpus, repeticiones):
+    """Mejor tiempo por ticket (µs) entre varias repeticiones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for texto in corpus:
+            funcion(texto)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(corpus) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de normalización de texto')
+    parser.add_argument('--tickets', type=int, default=10000, help='Tickets del corpus')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por ruta')
+    args = parser.parse_args()
+
+    corpus = generar_corpus(args.tickets)
+
+    # Verificar salida idéntica antes de medir
+    for texto in corpus:
+        if ruta_anterior(texto) != ruta_fusionada(texto):
+            print(f"❌ Salida distinta para: {texto!r}")
+            sys.exit(1)
+
+    antes = medir(ruta_anterior, corpus, args.repeticiones)
+    despues = medir(ruta_fusionada, corpus, args.repeticiones)
+
+    print("=" * 60)
+    print("🧹 Benchmark de normalización de texto")
+    print("=" * 60)
+    print(f"Tickets: {len(corpus):,}  Repeticiones: {args.repeticiones}")
+    print(f"Ruta anterior:      {antes:8.2f} µs/ticket")
+    print(f"normalizar_ticket:  {despues:8.2f} µs/ticket")
+    print(f"Aceleración:        {antes / despues:8.2f}x")
+    print("✅ Salidas idénticas")
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,21 @@ from models.ticket import Ticket
 from models.analisis import Analisis
 from models.recomendacion import Recomendacion
 from models.metrica import MetricaCategoria  # Cambio: metrica en lugar de metrica_categoria
+from models.tipos import SENTIMIENTOS, URGENCIAS
 from services.iar_calculator import IARCalculator
-from sqlalchemy import func
+from services.iar_bootstrap import celdas_por_categoria, intervalos_iar
+from config import get_config
+from utils.particiones import PARTICIONADO, join_ticket_analisis, filtrar_tickets_periodo
+from utils.agregados import (
+    AGREGADOS_ACTIVOS, desviacion_poblacional, inicializar_si_vacio, leer_agregados, reconstruir
+)
+from utils.palabras_clave import top_palabras_por_categoria
+from sqlalchemy import func, and_
 from collections import Counter
+import argparse
 import logging
 import json
+import time
 from datetime import datetime, date
 
 # Configurar logging
@@ -26,87 +36,114 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def calcular_metricas_categoria(session, categoria):
+# Tiempo estimado de resolución según urgencia (horas)
+TIEMPO_POR_URGENCIA = {
+    'critica': 0.5,   # 30 minutos
+    'alta': 1.0,      # 1 hora
+    'media': 2.0,     # 2 horas
+    'baja': 3.0       # 3 horas
+}
+
+def _agregados_por_categoria(session, desde=None, hasta=None, categoria=None):
     """
-    Calcula todas las métricas para una categoría específica
-    
+    Conteos y estadísticas de complejidad de todas las categorías en una query
+
+    Un solo GROUP BY categoria sobre tickets LEFT JOIN analisis con avg,
+    min, max, stddev_pop y count(*) FILTER por urgencia y sentimiento. Las
+    comparaciones de etiquetas pasan por el tipo de la columna, así que
+    funcionan igual con el almacenamiento compacto (smallint).
+
+    Returns:
+        list: Un dict de agregados por categoría
+    """
+    # Igual que antes, las complejidades 0 o NULL no cuentan en las estadísticas
+    complejidad = func.nullif(Analisis.complejidad_score, 0)
+
+    postgresql = session.get_bind().dialect.name == 'postgresql'
+    if postgresql:
+        desviacion = func.stddev_pop(complejidad)
+    else:
+        # Sin stddev_pop (SQLite): Σx², la desviación se completa en Python
+        desviacion = func.sum(complejidad * complejidad)
+
+    columnas = [
+        Ticket.categoria.label('categoria'),
+        func.count(Ticket.id).label('total_tickets'),
+        func.count(Analisis.id).label('tickets_procesados'),
+        func.count(complejidad).label('n_complejidad'),
+        func.avg(complejidad).label('complejidad_promedio'),
+        func.min(complejidad).label('complejidad_min'),
+        func.max(complejidad).label('complejidad_max'),
+        desviacion.label('complejidad_dispersion'),
+    ]
+    columnas += [
+        func.count().filter(Analisis.urgencia == urgencia).label(f'urgencia_{urgencia}')
+        for urgencia in URGENCIAS
+    ]
+    columnas += [
+        func.count().filter(Analisis.sentimiento == sentimiento).label(f'sentimiento_{sentimiento}')
+        for sentimiento in SENTIMIENTOS
+    ]
+
+    # Con particionado el período de analisis va en el ON para no perder el LEFT JOIN
+    condicion = join_ticket_analisis()
+    if PARTICIONADO and desde is not None:
+        condicion = and_(condicion, Analisis.fecha_ticket >= desde)
+    if PARTICIONADO and hasta is not None:
+        condicion = and_(condicion, Analisis.fecha_ticket < hasta)
+
+    query = session.query(*columnas).select_from(Ticket).outerjoin(Analisis, condicion)
+    query = filtrar_tickets_periodo(query, desde, hasta)
+    if categoria is not None:
+        query = query.filter(Ticket.categoria == categoria)
+
+    agregados = []
+    for fila in query.group_by(Ticket.categoria).all():
+        valores = dict(fila._mapping)
+        n = valores.pop('n_complejidad')
+        dispersion = valores.pop('complejidad_dispersion')
+        valores['complejidad_promedio'] = float(valores['complejidad_promedio'] or 0)
+        valores['complejidad_min'] = float(valores['complejidad_min'] or 0)
+        valores['complejidad_max'] = float(valores['complejidad_max'] or 0)
+
+        # Desviación estándar poblacional
+        if n <= 1:
+            valores['complejidad_std'] = 0
+        elif postgresql:
+            valores['complejidad_std'] = float(dispersion)
+        else:
+            valores['complejidad_std'] = desviacion_poblacional(n, valores['complejidad_promedio'] * n, float(dispersion))
+        agregados.append(valores)
+    return agregados
+
+def _metricas_desde_agregados(fila, top_palabras, total_palabras):
+    """
+    Métricas derivadas de los agregados de una categoría
+
     Args:
-        session: Sesión de SQLAlchemy
-        categoria: Nombre de la categoría
-        
+        fila (dict): Conteos y estadísticas de complejidad de la categoría
+        top_palabras (list): [(palabra, conteo)] más frecuentes
+        total_palabras (int): Total de palabras clave de la categoría
+
     Returns:
         dict: Métricas calculadas
     """
-    logger.info(f"📊 Calculando métricas para: {categoria}")
-    
-    # Obtener todos los tickets y análisis de esta categoría
-    tickets = session.query(Ticket).filter_by(categoria=categoria).all()
-    total_tickets = len(tickets)
-    
-    if total_tickets == 0:
-        logger.warning(f"⚠️  No hay tickets para la categoría: {categoria}")
-        return None
-    
-    # Obtener análisis
-    analisis_list = session.query(Analisis).join(Ticket).filter(
-        Ticket.categoria == categoria
-    ).all()
-    
-    if not analisis_list:
-        logger.warning(f"⚠️  No hay análisis para la categoría: {categoria}")
-        return None
-    
-    # Métricas de complejidad
-    complejidades = [a.complejidad_score for a in analisis_list if a.complejidad_score]
-    complejidad_promedio = sum(complejidades) / len(complejidades) if complejidades else 0
-    complejidad_min = min(complejidades) if complejidades else 0
-    complejidad_max = max(complejidades) if complejidades else 0
-    
-    # Desviación estándar
-    if len(complejidades) > 1:
-        media = complejidad_promedio
-        varianza = sum((x - media) ** 2 for x in complejidades) / len(complejidades)
-        complejidad_std = varianza ** 0.5
-    else:
-        complejidad_std = 0
-    
-    # Métricas de urgencia
-    urgencia_counts = Counter(a.urgencia for a in analisis_list if a.urgencia)
-    
-    # Métricas de sentimiento
-    sentimiento_counts = Counter(a.sentimiento for a in analisis_list if a.sentimiento)
+    complejidad_std = fila['complejidad_std']
     
     # Métricas de tiempo (estimadas)
-    # Asumimos tiempo promedio según urgencia
-    tiempo_map = {
-        'critica': 0.5,   # 30 minutos
-        'alta': 1.0,      # 1 hora
-        'media': 2.0,     # 2 horas
-        'baja': 3.0       # 3 horas
-    }
-    
     tiempo_total_horas = sum(
-        urgencia_counts.get(urgencia, 0) * horas 
-        for urgencia, horas in tiempo_map.items()
+        fila[f'urgencia_{urgencia}'] * horas 
+        for urgencia, horas in TIEMPO_POR_URGENCIA.items()
     )
-    tiempo_promedio = tiempo_total_horas / total_tickets if total_tickets > 0 else 0
-    
-    # Extraer top palabras clave
-    todas_palabras = []
-    for analisis in analisis_list:
-        if analisis.palabras_clave and isinstance(analisis.palabras_clave, list):
-            for item in analisis.palabras_clave:
-                if isinstance(item, dict) and 'palabra' in item:
-                    todas_palabras.append(item['palabra'])
+    tiempo_promedio = tiempo_total_horas / fila['total_tickets'] if fila['total_tickets'] > 0 else 0
     
-    top_palabras = Counter(todas_palabras).most_common(10)
     top_palabras_json = json.dumps([{'palabra': p, 'count': c} for p, c in top_palabras])
     
     # Calcular métricas de viabilidad
     # Repetitividad: basada en uniformidad de palabras clave
-    if len(todas_palabras) > 0:
+    if total_palabras > 0:
         top_10_freq = sum(c for _, c in top_palabras)
-        repetitividad = min((top_10_freq / len(todas_palabras)) * 100, 100)
+        repetitividad = min((top_10_freq / total_palabras) * 100, 100)
     else:
         repetitividad = 0
     
@@ -119,21 +156,21 @@ def calcular_metricas_categoria(session, categoria):
     # Tasa de resolución (asumimos 85% como baseline)
     tasa_resolucion = 0.85
     
-    metricas = {
-        'categoria': categoria,
-        'total_tickets': total_tickets,
-        'tickets_procesados': len(analisis_list),
-        'complejidad_promedio': complejidad_promedio,
-        'complejidad_min': complejidad_min,
-        'complejidad_max': complejidad_max,
+    return {
+        'categoria': fila['categoria'],
+        'total_tickets': fila['total_tickets'],
+        'tickets_procesados': fila['tickets_procesados'],
+        'complejidad_promedio': fila['complejidad_promedio'],
+        'complejidad_min': fila['complejidad_min'],
+        'complejidad_max': fila['complejidad_max'],
         'complejidad_std': complejidad_std,
-        'urgencia_critica': urgencia_counts.get('critica', 0),
-        'urgencia_alta': urgencia_counts.get('alta', 0),
-        'urgencia_media': urgencia_counts.get('media', 0),
-        'urgencia_baja': urgencia_counts.get('baja', 0),
-        'sentimiento_positivo': sentimiento_counts.get('positivo', 0),
-        'sentimiento_neutral': sentimiento_counts.get('neutral', 0),
-        'sentimiento_negativo': sentimiento_counts.get('negativo', 0),
+        'urgencia_critica': fila['urgencia_critica'],
+        'urgencia_alta': fila['urgencia_alta'],
+        'urgencia_media': fila['urgencia_media'],
+        'urgencia_baja': fila['urgencia_baja'],
+        'sentimiento_positivo': fila['sentimiento_positivo'],
+        'sentimiento_neutral': fila['sentimiento_neutral'],
+        'sentimiento_negativo': fila['sentimiento_negativo'],
         'tiempo_promedio_resolucion_horas': tiempo_promedio,
         'tiempo_total_anual_horas': tiempo_total_horas,
         'repetitividad_score': repetitividad,
@@ -141,11 +178,94 @@ def calcular_metricas_categoria(session, categoria):
         'tasa_resolucion': tasa_resolucion,
         'top_palabras_clave': top_palabras_json
     }
+
+def calcular_metricas_categorias(session, desde=None, hasta=None, categoria=None):
+    """
+    Calcula las métricas de todas las categorías (o de una) de una sola vez
+    
+    Args:
+        session: Sesión de SQLAlchemy
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        categoria: Limitar a una categoría (opcional)
+        
+    Returns:
+        dict: {categoria: métricas}; las categorías sin análisis se omiten
+    """
+    filas = _agregados_por_categoria(session, desde, hasta, categoria)
+    # Solo el top 10 de cada categoría vuelve de la base de datos
+    palabras = top_palabras_por_categoria(session, desde, hasta, categoria, top_n=10)
+    
+    metricas = {}
+    for fila in filas:
+        if not fila['tickets_procesados']:
+            logger.warning(f"⚠️  No hay análisis para la categoría: {fila['categoria']}")
+            continue
+        top = palabras.get(fila['categoria'], {'top': [], 'total': 0})
+        metricas[fila['categoria']] = _metricas_desde_agregados(fila, top['top'], top['total'])
     
     return metricas
 
-def calcular_iar_todas_categorias():
-    """Calcula el IAR para todas las categorías"""
+def _tickets_por_categoria(session):
+    """Total de tickets de cada categoría, procesados o no (un GROUP BY sobre tickets)"""
+    return dict(session.query(Ticket.categoria, func.count(Ticket.id)).group_by(Ticket.categoria).all())
+
+def calcular_metricas_incrementales(session):
+    """
+    Métricas de todas las categorías leyendo solo los agregados incrementales
+    
+    No lee analisis: el costo es una fila de agregados por categoría más
+    un conteo de tickets por categoría, que incluye los pendientes igual
+    que calcular_metricas_categorias. Los agregados no tienen período.
+    
+    Args:
+        session: Sesión de SQLAlchemy
+        
+    Returns:
+        dict: {categoria: métricas}
+    """
+    totales = _tickets_por_categoria(session)
+    metricas = {}
+    for categoria, estado in leer_agregados(session).items():
+        if estado['tickets_procesados'] <= 0:
+            continue
+        fila = dict(estado, categoria=categoria, total_tickets=totales.get(categoria, estado['tickets_procesados']))
+        metricas[categoria] = _metricas_desde_agregados(fila, estado['top_palabras'], estado['total_palabras'])
+    return metricas
+
+def calcular_metricas_categoria(session, categoria, desde=None, hasta=None):
+    """
+    Calcula todas las métricas para una categoría específica
+    
+    Args:
+        session: Sesión de SQLAlchemy
+        categoria: Nombre de la categoría
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        
+    Returns:
+        dict: Métricas calculadas, o None si la categoría no tiene análisis
+    """
+    logger.info(f"📊 Calculando métricas para: {categoria}")
+    return calcular_metricas_categorias(session, desde, hasta, categoria).get(categoria)
+
+def calcular_iar_todas_categorias(desde=None, hasta=None, completo=False, reconstruir_agregados=False,
+                                  bootstrap=None, muestras=None):
+    """
+    Calcula el IAR para todas las categorías
+    
+    Sin período, y con AGREGADOS_CATEGORIA=true, lee solo los agregados
+    incrementales; con período (o completo=True) agrega desde analisis.
+    
+    Args:
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        completo: Agregar desde analisis aunque haya agregados incrementales
+        reconstruir_agregados: Recalcular los agregados desde analisis antes
+        bootstrap: Guardar percentiles bootstrap del IAR (default: config IAR_BOOTSTRAP).
+            Siempre agrupa analisis completo, también en modo incremental
+        muestras: Réplicas bootstrap por categoría (default: config IAR_BOOTSTRAP_MUESTRAS)
+    """
     
     print("=" * 60)
     print("🎯 SEIRA 2.0 - Cálculo del IAR")
@@ -160,10 +280,24 @@ def calcular_iar_todas_categorias():
     calculator = IARCalculator()
     
     try:
-        # Obtener todas las categorías únicas
-        categorias = session.query(Ticket.categoria).distinct().all()
-        categorias = [c[0] for c in categorias]
+        if reconstruir_agregados:
+            reconstruir(session)
+            session.commit()
+        
+        incremental = AGREGADOS_ACTIVOS and not completo and desde is None and hasta is None
+        
+        inicio = time.time()
+        if incremental:
+            # Una fila por categoría, sin leer analisis
+            if inicializar_si_vacio(session):
+                session.commit()
+            metricas_por_categoria = calcular_metricas_incrementales(session)
+        else:
+            # Un GROUP BY sobre analisis más las palabras clave
+            metricas_por_categoria = calcular_metricas_categorias(session, desde, hasta)
+        logger.info(f"⚡ Métricas {'incrementales' if incremental else 'agregadas'} en {time.time() - inicio:.3f}s")
         
+        categorias = list(metricas_por_categoria)
         total_categorias = len(categorias)
         logger.info(f"📊 Total de categorías encontradas: {total_categorias}")
         print(f"📊 Categorías a procesar: {total_categorias}\n")
@@ -174,8 +308,28 @@ def calcular_iar_todas_categorias():
         session.commit()
         logger.info("🗑️  Tablas de métricas y recomendaciones limpiadas")
         
-        # Obtener total global de tickets
-        total_global = session.query(Ticket).count()
+        # Obtener total global de tickets (también los pendientes, en ambos modos)
+        total_global = filtrar_tickets_periodo(session.query(func.count(Ticket.id)), desde, hasta).scalar()
+        
+        # Intervalos bootstrap del IAR (opcional)
+        config = get_config()
+        if bootstrap is None:
+            bootstrap = config.IAR_BOOTSTRAP
+        muestras = muestras or config.IAR_BOOTSTRAP_MUESTRAS
+        intervalos = {}
+        if bootstrap:
+            if incremental:
+                logger.info("🎲 El bootstrap agrupa analisis completo: no usa los agregados incrementales")
+            inicio = time.time()
+            intervalos = intervalos_iar(
+                calculator,
+                metricas_por_categoria,
+                celdas_por_categoria(session, desde, hasta),
+                total_global,
+                TIEMPO_POR_URGENCIA,
+                muestras
+            )
+            logger.info(f"🎲 Bootstrap del IAR ({muestras} réplicas) en {time.time() - inicio:.3f}s")
         
         resultados = []
         
@@ -183,11 +337,7 @@ def calcular_iar_todas_categorias():
             print(f"\n[{i}/{total_categorias}] Procesando: {categoria}")
             print("-" * 60)
             
-            # Calcular métricas base
-            metricas = calcular_metricas_categoria(session, categoria)
-            
-            if not metricas:
-                continue
+            metricas = metricas_por_categoria[categoria]
             
             # Calcular scores individuales
             frecuencia_score = calculator.calcular_frecuencia_score(
@@ -249,7 +399,7 @@ def calcular_iar_todas_categorias():
             metrica_cat = MetricaCategoria(
                 categoria=categoria,
                 fecha=date.today(),
-                periodo='global',
+                periodo='global' if desde is None and hasta is None else 'rango',
                 total_tickets=metricas['total_tickets'],
                 tickets_procesados=metricas['tickets_procesados'],
                 tickets_pendientes=0,
@@ -275,6 +425,7 @@ def calcular_iar_todas_categorias():
                     'complejidad_max': metricas['complejidad_max'],
                     'complejidad_std': metricas['complejidad_std'],
                     'tiempo_total_anual_horas': metricas['tiempo_total_anual_horas'],
+                    'iar_bootstrap': intervalos.get(categoria),
                     'top_palabras_clave': json.loads(metricas['top_palabras_clave'])
                 },
                 es_anomalia=0,
@@ -285,14 +436,7 @@ def calcular_iar_todas_categorias():
             
             # Guardar recomendación (usando tu modelo existente)
             # Determinar prioridad (1-10)
-            if nivel == 'ALTAMENTE_RECOMENDADO':
-                prioridad = 9 + min(int((iar - 80) / 2), 1)  # 9-10
-            elif nivel == 'RECOMENDADO':
-                prioridad = 6 + min(int((iar - 60) / 6), 2)  # 6-8
-            elif nivel == 'EVALUAR':
-                prioridad = 3 + min(int((iar - 30) / 10), 2)  # 3-5
-            else:
-                prioridad = 1 + min(int(iar / 15), 1)  # 1-2
+            prioridad = calculator.calcular_prioridad(iar, nivel)
             
             recomendacion = Recomendacion(
                 categoria=categoria,
@@ -328,6 +472,8 @@ def calcular_iar_todas_categorias():
             
             # Imprimir resultado
             print(f"✅ IAR: {iar}/100")
+            if categoria in intervalos:
+                print(f"   Intervalo bootstrap: p5={intervalos[categoria]['p5']} p50={intervalos[categoria]['p50']} p95={intervalos[categoria]['p95']}")
             print(f"📊 Nivel: {nivel}")
             print(f"💡 Tipo IA: {tipo_ia}")
             print(f"💰 ROI: {roi_info['roi_porcentaje']:.1f}%")
@@ -381,4 +527,21 @@ def calcular_iar_todas_categorias():
         session.close()
 
 if __name__ == "__main__":
-    calcular_iar_todas_categorias()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Cálculo del IAR por categoría')
+    parser.add_argument('--desde', type=datetime.fromisoformat, default=None,
+                        help='Solo tickets creados desde esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--hasta', type=datetime.fromisoformat, default=None,
+                        help='Solo tickets creados antes de esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--completo', action='store_true',
+                        help='Agregar desde analisis en lugar de los agregados incrementales')
+    parser.add_argument('--reconstruir-agregados', action='store_true',
+                        help='Recalcular los agregados incrementales desde analisis')
+    parser.add_argument('--bootstrap', action='store_true', default=None,
+                        help='Guardar percentiles bootstrap (p5/p50/p95) del IAR '
+                             '(un GROUP BY sobre analisis, aun con agregados incrementales)')
+    parser.add_argument('--bootstrap-muestras', type=int, default=None,
+                        help='Réplicas bootstrap por categoría')
+    args = parser.parse_args()
+    
+    calcular_iar_todas_categorias(args.desde, args.hasta, args.completo, args.reconstruir_agregados,
+                                  args.bootstrap, args.bootstrap_muestras)
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Drena el backlog de tickets pendientes con una cola sobre PostgreSQL
+
+Cada worker reclama lotes con SELECT ... FOR UPDATE SKIP LOCKED, los
+analiza, los guarda y los marca como procesados. No hay despachador ni
+Redis: se pueden lanzar tantos procesos o nodos como se quiera contra la
+misma base de datos. Si un worker muere, su lease vence y otro worker
+retoma esos tickets.
+
+Uso:
+    python backend/scripts/drenar_backlog.py --procesos 8
+    python backend/scripts/drenar_backlog.py --procesos 4 --batch-size 1000 --lease 900
+    python backend/scripts/drenar_backlog.py --continuo --espera 30   # Worker permanente
+"""
+import sys
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.database import db_manager
+from models.analisis import Analisis
+from services.tiempos_etapas import histograma_resultados, resumir_histograma
+from config import get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def drenar(batch_size, lease_segundos, continuo=False, espera=30):
+    """
+    Bucle de reclamo de un worker: reclamar, analizar, guardar
+
+    Args:
+        batch_size (int): Tickets por reclamo
+        lease_segundos (int): Duración del lease de cada reclamo
+        continuo (bool): Seguir esperando trabajo cuando no queda backlog
+        espera (int): Segundos entre reintentos en modo continuo
+
+    Returns:
+        dict: Resumen del worker
+    """
+    from services.nlp_processor import get_nlp_processor
+    from services.keyword_engine import TfidfKeywordEngine
+
+    # Conexiones heredadas del padre tras el fork: no usarlas ni cerrarlas
+    if db_manager.engine is not None:
+        db_manager.engine.dispose(close=False)
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    processor = get_nlp_processor()
+    motor_tfidf = TfidfKeywordEngine.desde_config()
+
+    resumen = {'worker': worker, 'lotes': 0, 'tickets': 0, 'exitosos': 0, 'errores_escritura': 0, 'histograma': {}}
+    session = db_manager.get_session()
+
+    try:
+        while True:
+            lote = db_manager.reclamar_tickets(batch_size, lease_segundos, worker)
+            if not lote:
+                if not continuo:
+                    break
+                time.sleep(espera)
+                continue
+
+            inicio = time.time()
+            resultados = processor.procesar_batch([
+                {'id': ticket_id, 'descripcion': descripcion, 'categoria': categoria}
+                for ticket_id, descripcion, categoria in lote
+            ])
+            if motor_tfidf is not None:
+                motor_tfidf.aplicar(resultados)
+            tiempo_procesamiento = (time.time() - inicio) * 1000 / len(lote)
+
+            try:
+                db_manager.guardar_analisis_batch(session, [
+                    Analisis.valores_desde_resultado(resultado, categoria, tiempo_procesamiento)
+                    for (_, _, categoria), resultado in zip(lote, resultados)
+                ])
+                session.commit()
+            except Exception as e:
+                # El lease vencerá y otro worker (o este) reintentará el lote
+                session.rollback()
+                resumen['errores_escritura'] += 1
+                logger.error(f"❌ [{worker}] Error guardando lote de {len(lote)} tickets: {str(e)}")
+                continue
+
+            resumen['lotes'] += 1
+            resumen['tickets'] += len(lote)
+            resumen['exitosos'] += sum(1 for r in resultados if r.get('procesado'))
+            for campo, valor in histograma_resultados(resultados).items():
+                resumen['histograma'][campo] = resumen['histograma'].get(campo, 0) + valor
+            logger.info(f"✅ [{worker}] Lote {resumen['lotes']} guardado ({len(lote)} tickets, {resumen['tickets']} en total)")
+    finally:
+        session.close()
+
+    return resumen
+
+def _drenar_desde_args(args):
+    """Punto de entrada de cada proceso del pool"""
+    return drenar(*args)
+
+def main():
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Drenar el backlog con reclamos SKIP LOCKED')
+    parser.add_argument('--procesos', type=int, default=1, help='Workers en este nodo')
+    parser.add_argument('--batch-size', type=int, default=config.RECLAMO_BATCH_SIZE)
+    parser.add_argument('--lease', type=int, default=config.RECLAMO_LEASE_SEGUNDOS, help='Segundos de lease por reclamo')
+    parser.add_argument('--continuo', action='store_true', help='No terminar cuando se vacía el backlog')
+    parser.add_argument('--espera', type=int, default=30, help='Segundos entre reintentos en modo continuo')
+    args = parser.parse_args()
+
+    db_manager.init_engine()
+
+    inicio = time.time()
+    parametros = (args.batch_size, args.lease, args.continuo, args.espera)
+
+    if args.procesos == 1:
+        resumenes = [drenar(*parametros)]
+    else:
+        with multiprocessing.get_context().Pool(args.procesos) as pool:
+            resumenes = pool.map(_drenar_desde_args, [parametros] * args.procesos)
+
+    segundos = time.time() - inicio
+    tickets = sum(r['tickets'] for r in resumenes)
+
+    logger.info("📊 Resumen:")
+    for r in resumenes:
+        logger.info(f"   {r['worker']}: {r['tickets']} tickets en {r['lotes']} lotes, {r['errores_escritura']} errores de escritura")
+    logger.info(f"   ✅ {tickets} tickets en {segundos:.1f}s → {tickets / segundos if segundos else 0:.1f} tickets/s")
+
+    # Los histogramas de los workers se suman campo a campo
+    histograma = {}
+    for r in resumenes:
+        for campo, valor in r['histograma'].items():
+            histograma[campo] = histograma.get(campo, 0) + valor
+    for etapa, r in resumir_histograma(histograma).items():
+        logger.info(f"   ⏱️  {etapa:<16} media {r['media_ms']} ms | p50 {r['p50_ms']} | p95 {r['p95_ms']} | p99 {r['p99_ms']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Herramientas del motor NLP lite (sin spaCy)
+
+Subcomandos:
+    construir      Corre spaCy una sola vez sobre tickets de la base de datos y
+                   guarda la tabla de lemas/stopwords en NLP_LITE_TABLA
+    concordancia   Procesa una muestra con spaCy y con el motor lite y reporta
+                   el acuerdo por campo y la velocidad de cada motor
+
+Uso:
+    python backend/scripts/nlp_lite.py construir --limite 200000
+    python backend/scripts/nlp_lite.py concordancia --muestra 5000 --output-json concordancia.json
+"""
+import sys
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+# Agregar el directorio backend al path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.database import db_manager
+from models.ticket import Ticket
+from services.text_cleaner import limpiar_texto
+from services.nlp_lite import construir_tabla, guardar_tabla, reporte_concordancia
+from services.nlp_processor import NLPProcessor
+from config import get_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def leer_tickets(session, limite, batch_size=5000):
+    """Lee (id, descripcion, categoria) en streaming"""
+    return session.query(Ticket.id, Ticket.descripcion, Ticket.categoria)\
+        .order_by(Ticket.id)\
+        .limit(limite)\
+        .yield_per(batch_size)
+
+def construir(args):
+    """Construye y guarda la tabla de lemas"""
+    import spacy
+
+    config = get_config()
+    nlp = spacy.load(config.SPACY_MODEL, disable=['ner'])
+
+    session = db_manager.get_session()
+    try:
+        textos = (limpiar_texto(descripcion) for _, descripcion, _ in leer_tickets(session, args.limite))
+        tabla = construir_tabla(nlp, textos, batch_size=args.batch_size)
+    finally:
+        session.close()
+
+    guardar_tabla(tabla, args.destino or config.NLP_LITE_TABLA)
+
+def concordancia(args):
+    """Compara el motor spaCy y el lite sobre la misma muestra"""
+    session = db_manager.get_session()
+    try:
+        tickets = [
+            {'id': ticket_id, 'descripcion': descripcion, 'categoria': categoria}
+            for ticket_id, descripcion, categoria in leer_tickets(session, args.muestra)
+        ]
+    finally:
+        session.close()
+
+    logger.info(f"📊 Muestra: {len(tickets):,} tickets")
+
+    resultados = {}
+    velocidad = {}
+    for modo in ('spacy', 'lite'):
+        processor = NLPProcessor(modo=modo)
+        if processor.modo != modo:
+            # Sin spaCy o sin el modelo, NLPProcessor cae al motor lite y el
+            # reporte compararía el motor lite consigo mismo
+            logger.error(f"❌ No se pudo cargar el modelo {get_config().SPACY_MODEL}: la concordancia requiere spaCy")
+            sys.exit(1)
+        processor.cache = None  # Medir el motor, no el cache
+        inicio = time.perf_counter()
+        resultados[modo] = list(processor.procesar_stream(tickets))
+        segundos = time.perf_counter() - inicio
+        velocidad[modo] = round(len(tickets) / segundos, 1) if segundos else 0.0
+
+    reporte = reporte_concordancia(resultados['spacy'], resultados['lite'])
+    reporte['tickets_por_segundo'] = velocidad
+
+    print(json.dumps(reporte, indent=2, ensure_ascii=False))
+
+    if args.output_json:
+        with open(args.output_json, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Reporte guardado en {args.output_json}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Motor NLP lite')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_construir = subparsers.add_parser('construir', help='Construir la tabla de lemas')
+    p_construir.add_argument('--limite', type=int, default=200000, help='Tickets usados como corpus')
+    p_construir.add_argument('--batch-size', type=int, default=256)
+    p_construir.add_argument('--destino', default=None, help='Ruta de salida (default: NLP_LITE_TABLA)')
+
+    p_concordancia = subparsers.add_parser('concordancia', help='Reporte de acuerdo spaCy vs lite')
+    p_concordancia.add_argument('--muestra', type=int, default=5000)
+    p_concordancia.add_argument('--output-json', default=None)
+
+    args = parser.parse_args()
+
+    db_manager.init_engine()
+
+    if args.comando == 'construir':
+        construir(args)
+    else:
+        concordancia(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 """
 Script para procesar los 150K tickets en batch con Celery
+
+Uso interactivo (menú):
+    python backend/scripts/process_batch_150k.py
+
+Uso desatendido:
+    python backend/scripts/process_batch_150k.py --modo pipeline --workers 8 --queue-depth 4 --batch-size 500
+    python backend/scripts/process_batch_150k.py --modo sincrono --batch-size 1000
+    python backend/scripts/process_batch_150k.py --modo celery --batch-size 500 --esperar
+    python backend/scripts/process_batch_150k.py --run-id <run_id>
+    python backend/scripts/process_batch_150k.py --modo reprocesar --categorias soporte_tecnico --desde 2024-01-01
 """
 import sys
 import os
+import argparse
+import multiprocessing
+import queue
+import threading
 from pathlib import Path
 
 # Agregar el directorio raíz al path
@@ -10,8 +24,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.database import db_manager
 from models.ticket import Ticket
-from tasks.process_tickets import procesar_ticket_task
-from celery_app import celery
+from tasks.process_tickets import procesar_batch_tickets_task
+from config import get_config
+from utils.progreso import crear_run, registrar_envio, cerrar_despacho, leer_run
+from services.tiempos_etapas import acumular_histograma, resumir_histograma
 from tqdm import tqdm
 from datetime import datetime
 import logging
@@ -28,25 +44,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def obtener_tickets_pendientes():
-    """Obtiene todos los tickets que no han sido procesados"""
-    logger.info("🔍 Consultando tickets pendientes...")
+def obtener_tickets_pendientes(batch_size=1000):
+    """
+    Cuenta los tickets pendientes y devuelve un lector por lotes
     
-    session = db_manager.get_session()
+    Returns:
+        tuple: (generador de lotes [(id, descripcion, categoria)], total)
+    """
+    logger.info("🔍 Consultando tickets pendientes...")
     
     try:
-        tickets = session.query(Ticket).filter_by(procesado=False).all()
-        total = len(tickets)
-        
+        total = db_manager.contar_tickets_pendientes()
         logger.info(f"📊 Tickets pendientes: {total}")
         
-        return tickets, total
+        return db_manager.iterar_tickets_pendientes(batch_size), total
         
     except Exception as e:
         logger.error(f"❌ Error consultando tickets: {str(e)}")
         raise
-    finally:
-        session.close()
+
+def _log_etapas(etapas):
+    """Resumen de tiempos por etapa (NLP_TIEMPOS_ETAPAS=true)"""
+    if not etapas:
+        return
+    logger.info("⏱️  Tiempos por etapa (ms/ticket):")
+    for etapa, r in etapas.items():
+        logger.info(f"   {etapa:<16} media {r['media_ms']:>8} | p50 {r['p50_ms']:>8} | p95 {r['p95_ms']:>8} | p99 {r['p99_ms']:>8}")
+
+def _acumular_resultados(histograma, resultados):
+    for resultado in resultados:
+        if resultado.get('tiempos_etapas'):
+            acumular_histograma(histograma, resultado['tiempos_etapas'])
 
 def procesar_batch_sincrono(batch_size=1000):
     """
@@ -54,6 +82,7 @@ def procesar_batch_sincrono(batch_size=1000):
     Útil para debug o cuando Celery no está disponible
     """
     from services.nlp_processor import NLPProcessor
+    from services.keyword_engine import TfidfKeywordEngine
     from models.analisis import Analisis
     
     logger.info("🔄 Iniciando procesamiento SÍNCRONO")
@@ -61,9 +90,13 @@ def procesar_batch_sincrono(batch_size=1000):
     session = db_manager.get_session()
     processor = NLPProcessor()
     
+    # Palabras clave TF-IDF si hay modelos ajustados (scripts/ajustar_tfidf.py)
+    motor_tfidf = TfidfKeywordEngine.desde_config()
+    if motor_tfidf is None:
+        logger.info("💡 Sin modelos TF-IDF: se usan palabras clave por frecuencia")
+    
     try:
-        tickets_pendientes = session.query(Ticket).filter_by(procesado=False).all()
-        total = len(tickets_pendientes)
+        lotes, total = obtener_tickets_pendientes(batch_size)
         
         logger.info(f"📊 Total a procesar: {total} tickets")
         
@@ -71,62 +104,40 @@ def procesar_batch_sincrono(batch_size=1000):
             logger.info("✅ No hay tickets pendientes")
             return
         
+        histograma = {}
+        
         # Barra de progreso
         with tqdm(total=total, desc="Procesando tickets", unit="ticket") as pbar:
             
-            for i in range(0, total, batch_size):
-                batch = tickets_pendientes[i:i + batch_size]
+            for numero, batch in enumerate(lotes, start=1):
+                inicio = time.time()
+                
+                # Procesar el batch completo con nlp.pipe
+                resultados = processor.procesar_batch([
+                    {'id': ticket_id, 'descripcion': descripcion, 'categoria': categoria}
+                    for ticket_id, descripcion, categoria in batch
+                ])
+                if motor_tfidf is not None:
+                    motor_tfidf.aplicar(resultados)
+                _acumular_resultados(histograma, resultados)
+                
+                # Tiempo amortizado por ticket dentro del batch
+                tiempo_procesamiento = (time.time() - inicio) * 1000 / len(batch)
                 
-                for ticket in batch:
-                    try:
-                        inicio = time.time()
-                        
-                        # Procesar ticket
-                        resultado = processor.procesar_ticket(
-                            ticket.id,
-                            ticket.descripcion,
-                            ticket.categoria
-                        )
-                        
-                        tiempo_procesamiento = (time.time() - inicio) * 1000
-                        
-                        # Guardar análisis
-                        analisis = Analisis(
-                            ticket_id=ticket.id,
-                            texto_limpio=resultado.get('texto_limpio', ''),
-                            palabras_clave=resultado.get('palabras_clave', []),
-                            entidades=resultado.get('entidades_ner', {}),
-                            tokens=resultado.get('num_tokens', 0),
-                            complejidad_score=resultado.get('complejidad', 0.0),
-                            sentimiento=resultado.get('sentimiento', {}).get('tipo', 'neutral'),
-                            urgencia=resultado.get('urgencia', {}).get('nivel', 'baja'),
-                            categoria_detectada=resultado.get('categoria', ticket.categoria),
-                            confianza_clasificacion=0.8,
-                            longitud_texto=len(resultado.get('texto_limpio', '')),
-                            num_palabras=resultado.get('estadisticas', {}).get('num_palabras', 0),
-                            num_entidades=len(resultado.get('entidades_ner', {}).get('personas', [])),
-                            fecha_analisis=datetime.utcnow(),
-                            tiempo_procesamiento_ms=tiempo_procesamiento
-                        )
-                        
-                        session.add(analisis)
-                        
-                        # Marcar como procesado
-                        ticket.procesado = True
-                        ticket.fecha_procesamiento = datetime.utcnow()
-                        
-                        pbar.update(1)
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Error en ticket #{ticket.id}: {str(e)}")
-                        pbar.update(1)
-                        continue
+                # Un INSERT y un UPDATE por batch
+                db_manager.guardar_analisis_batch(session, [
+                    Analisis.valores_desde_resultado(resultado, categoria, tiempo_procesamiento)
+                    for (_, _, categoria), resultado in zip(batch, resultados)
+                ])
+                pbar.update(len(batch))
                 
                 # Commit cada batch
                 session.commit()
-                logger.info(f"✅ Batch {i//batch_size + 1} guardado ({len(batch)} tickets)")
+                logger.info(f"✅ Batch {numero} guardado ({len(batch)} tickets)")
         
         logger.info("✅ Procesamiento síncrono completado")
+        logger.info(f"♻️  Cache NLP: {processor.stats_cache()}")
+        _log_etapas(resumir_histograma(histograma))
         
     except Exception as e:
         logger.error(f"❌ Error en procesamiento: {str(e)}")
@@ -135,18 +146,99 @@ def procesar_batch_sincrono(batch_size=1000):
     finally:
         session.close()
 
-def procesar_batch_celery(batch_size=100):
+def reprocesar_obsoletos(batch_size=1000, categorias=None, desde=None, hasta=None):
+    """
+    Reanaliza solo los tickets cuyo análisis se hizo con otra versión,
+    otros léxicos, otro modelo u otro ajuste TF-IDF (huella_analizador
+    distinta a la actual)
+    
+    Args:
+        batch_size (int): Tickets por lote
+        categorias (list): Limitar a estas categorías
+        desde (datetime): fecha_creacion mínima (incluida)
+        hasta (datetime): fecha_creacion máxima (excluida)
+        
+    Returns:
+        dict: en_alcance, obsoletos, reprocesados y omitidos (ya vigentes)
+    """
+    from services.nlp_processor import NLPProcessor
+    from services.keyword_engine import TfidfKeywordEngine, huella_analizador
+    from models.analisis import Analisis
+    
+    logger.info("🔄 Iniciando REPROCESO incremental")
+    
+    processor = NLPProcessor()
+    motor_tfidf = TfidfKeywordEngine.desde_config()
+    huella = huella_analizador(processor.huella, motor_tfidf)
+    logger.info(f"🏷️  Huella actual del analizador: {huella}")
+    
+    conteo = db_manager.contar_reproceso(huella, categorias, desde, hasta)
+    logger.info(f"📊 En alcance: {conteo['en_alcance']} | Obsoletos: {conteo['obsoletos']}")
+    
+    session = db_manager.get_session()
+    reprocesados = 0
+    
+    try:
+        with tqdm(total=conteo['obsoletos'], desc="Reprocesando", unit="ticket") as pbar:
+            for batch in db_manager.iterar_analisis_obsoletos(huella, batch_size, categorias, desde, hasta):
+                inicio = time.time()
+                
+                resultados = processor.procesar_batch([
+                    {'id': ticket_id, 'descripcion': descripcion, 'categoria': categoria}
+                    for ticket_id, descripcion, categoria in batch
+                ])
+                if motor_tfidf is not None:
+                    motor_tfidf.aplicar(resultados)
+                
+                tiempo_procesamiento = (time.time() - inicio) * 1000 / len(batch)
+                
+                # El upsert reemplaza el análisis anterior
+                db_manager.guardar_analisis_batch(session, [
+                    Analisis.valores_desde_resultado(resultado, categoria, tiempo_procesamiento)
+                    for (_, _, categoria), resultado in zip(batch, resultados)
+                ])
+                session.commit()
+                
+                reprocesados += len(batch)
+                pbar.update(len(batch))
+    except Exception as e:
+        logger.error(f"❌ Error en reproceso: {str(e)}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    
+    resumen = {
+        'en_alcance': conteo['en_alcance'],
+        'obsoletos': conteo['obsoletos'],
+        'reprocesados': reprocesados,
+        'omitidos': conteo['en_alcance'] - conteo['obsoletos']
+    }
+    logger.info(f"✅ Reprocesados: {resumen['reprocesados']} | ⏭️  Omitidos (ya vigentes): {resumen['omitidos']}")
+    return resumen
+
+def procesar_batch_celery(batch_size=500, esperar=None):
     """
     Procesa tickets usando Celery (asíncrono)
     Más eficiente para grandes volúmenes
+    
+    El progreso se lleva en contadores de Redis por corrida (utils.progreso),
+    no en un resultado por tarea.
+    
+    Args:
+        batch_size (int): Tickets por tarea
+        esperar (bool): Esperar a que terminen las tareas (None: preguntar)
+        
+    Returns:
+        str: run_id de la corrida, o None si no había tickets
     """
     logger.info("🔄 Iniciando procesamiento ASÍNCRONO con Celery")
     
-    tickets, total = obtener_tickets_pendientes()
+    lotes, total = obtener_tickets_pendientes(batch_size)
     
     if total == 0:
         logger.info("✅ No hay tickets pendientes")
-        return
+        return None
     
     logger.info(f"📊 Total a procesar: {total} tickets")
     logger.info(f"📦 Tamaño de batch: {batch_size} tickets")
@@ -154,71 +246,314 @@ def procesar_batch_celery(batch_size=100):
     num_batches = (total // batch_size) + (1 if total % batch_size > 0 else 0)
     logger.info(f"📦 Número de batches: {num_batches}")
     
-    # Enviar tareas a Celery
-    task_ids = []
+    run_id = crear_run(total)
     
+    # Enviar tareas a Celery
     with tqdm(total=total, desc="Enviando tareas a Celery", unit="ticket") as pbar:
         
-        for i in range(0, total, batch_size):
-            batch = tickets[i:i + batch_size]
-            
-            for ticket in batch:
-                # Enviar tarea a Celery de forma asíncrona
-                task = procesar_ticket_task.delay(ticket.id)
-                task_ids.append(task.id)
-                pbar.update(1)
-    
-    logger.info(f"✅ {len(task_ids)} tareas enviadas a Celery")
-    logger.info("⏳ Esperando a que los workers procesen las tareas...")
-    logger.info("💡 Puedes monitorear el progreso en los logs de Celery")
+        for batch in lotes:
+            # Un mensaje por lote de ids: el worker lo procesa con una consulta y una transacción
+            procesar_batch_tickets_task.apply_async(
+                args=[[ticket_id for ticket_id, _, _ in batch]],
+                kwargs={'run_id': run_id},
+                ignore_result=True
+            )
+            registrar_envio(run_id, len(batch))
+            pbar.update(len(batch))
+    
+    cerrar_despacho(run_id)
+    
+    estado = leer_run(run_id)
+    logger.info(f"✅ {estado['lotes_enviados']} tareas de lote enviadas a Celery (corrida {run_id})")
+    logger.info(f"💡 Progreso: GET /api/jobs/{run_id}")
     logger.info("💡 O usar Flower: http://localhost:5555")
     
     # Opcional: Esperar a que todas las tareas terminen
-    print("\n¿Deseas esperar a que todas las tareas terminen? (y/n): ", end="")
-    respuesta = input().strip().lower()
+    if esperar is None:
+        print("\n¿Deseas esperar a que todas las tareas terminen? (y/n): ", end="")
+        esperar = input().strip().lower() == 'y'
     
-    if respuesta == 'y':
-        logger.info("⏳ Monitoreando progreso de tareas...")
-        
-        from celery.result import AsyncResult
-        
-        completadas = 0
-        fallidas = 0
-        
-        with tqdm(total=len(task_ids), desc="Tareas completadas", unit="tarea") as pbar:
-            
-            while completadas + fallidas < len(task_ids):
-                time.sleep(5)  # Chequear cada 5 segundos
-                
-                temp_completadas = 0
-                temp_fallidas = 0
-                
-                for task_id in task_ids:
-                    result = AsyncResult(task_id, app=celery)
-                    
-                    if result.ready():
-                        if result.successful():
-                            temp_completadas += 1
-                        else:
-                            temp_fallidas += 1
-                
-                nuevas_completadas = temp_completadas - completadas
-                nuevas_fallidas = temp_fallidas - fallidas
-                
-                if nuevas_completadas > 0 or nuevas_fallidas > 0:
-                    completadas = temp_completadas
-                    fallidas = temp_fallidas
-                    pbar.update(nuevas_completadas + nuevas_fallidas)
-                    pbar.set_postfix({
-                        'exitosas': completadas,
-                        'fallidas': fallidas
-                    })
-        
-        logger.info(f"✅ Procesamiento completado")
-        logger.info(f"✅ Exitosas: {completadas}")
-        logger.info(f"❌ Fallidas: {fallidas}")
+    if esperar:
+        esperar_run(run_id)
     else:
         logger.info("✅ Tareas enviadas. El procesamiento continúa en background.")
+    
+    return run_id
+
+def esperar_run(run_id, intervalo=5, max_sin_avance=1800):
+    """
+    Espera a que termine una corrida leyendo sus contadores (O(1) por chequeo)
+    
+    Args:
+        run_id (str): Corrida a monitorear
+        intervalo (int): Segundos entre chequeos
+        max_sin_avance (int): Dejar de esperar si no hay avance en este tiempo
+        
+    Returns:
+        dict: Último estado de la corrida
+    """
+    logger.info(f"⏳ Monitoreando corrida {run_id}...")
+    
+    estado = leer_run(run_id)
+    if estado is None:
+        logger.error(f"❌ Corrida {run_id} no encontrada")
+        return None
+    
+    ultimo_avance = time.time()
+    terminados = 0
+    
+    with tqdm(total=estado['total'], desc="Tickets procesados", unit="ticket") as pbar:
+        while not estado['terminado']:
+            time.sleep(intervalo)
+            estado = leer_run(run_id)
+            
+            nuevos = estado['hechos'] + estado['fallidos'] + estado['omitidos'] - terminados
+            if nuevos > 0:
+                terminados += nuevos
+                ultimo_avance = time.time()
+                pbar.total = estado['total']
+                pbar.update(nuevos)
+                pbar.set_postfix({
+                    'fallidos': estado['fallidos'],
+                    'en_curso': estado['en_curso'],
+                    'tickets/s': estado['tickets_por_segundo']
+                })
+            elif time.time() - ultimo_avance > max_sin_avance:
+                logger.warning(f"⚠️  Sin avance en {max_sin_avance}s; {estado['en_curso']} tickets siguen en curso")
+                break
+    
+    logger.info(f"✅ Procesamiento completado")
+    logger.info(f"✅ Exitosos: {estado['hechos']}")
+    logger.info(f"❌ Fallidos: {estado['fallidos']}")
+    logger.info(f"⏭️  Omitidos (ya procesados o inexistentes): {estado['omitidos']}")
+    logger.info(f"⚡ {estado['tickets_por_segundo']} tickets/s")
+    _log_etapas(estado.get('etapas'))
+    return estado
+
+def _poner(cola, item, procesos, detener, timeout=1):
+    """
+    put en una cola acotada que no se cuelga si nadie la consume
+
+    Mientras la cola esté llena reintenta cada `timeout` segundos, salvo
+    que se pida detener o ya no quede ningún worker vivo.
+
+    Returns:
+        bool: True si el item entró en la cola
+    """
+    while not detener.is_set():
+        try:
+            cola.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            if not any(proceso.is_alive() for proceso in procesos):
+                return False
+    return False
+
+def _etapa_lector(cola_entrada, batch_size, procesos, estado, detener):
+    """Etapa 1: lee lotes de la base de datos hacia la cola de entrada"""
+    try:
+        for lote in db_manager.iterar_tickets_pendientes(batch_size):
+            # Bloquea si la cola está llena, pero no si los workers murieron
+            if not _poner(cola_entrada, lote, procesos, detener):
+                logger.error("❌ Lector detenido: el pipeline terminó o los workers NLP ya no consumen la cola")
+                estado['error'] = 'pipeline detenido'
+                break
+            estado['leidos'] += len(lote)
+    except Exception as e:
+        logger.error(f"❌ Error en el lector: {str(e)}")
+        estado['error'] = str(e)
+    finally:
+        # Un marcador de fin por worker
+        for _ in procesos:
+            if not _poner(cola_entrada, None, procesos, detener):
+                break
+
+def _worker_nlp(numero, cola_entrada, cola_salida):
+    """
+    Etapa 2: cada worker carga su propio modelo y procesa lotes completos
+
+    Al terminar envía su número como marcador de fin, para que el escritor
+    no lo cuente dos veces si además sale con código distinto de 0.
+    """
+    from services.nlp_processor import get_nlp_processor
+    from services.keyword_engine import TfidfKeywordEngine
+
+    # Las conexiones heredadas del padre no se usan ni se cierran aquí
+    if db_manager.engine is not None:
+        db_manager.engine.dispose(close=False)
+
+    try:
+        processor = get_nlp_processor()
+        motor_tfidf = TfidfKeywordEngine.desde_config()
+
+        while True:
+            lote = cola_entrada.get()
+            if lote is None:
+                break
+
+            inicio = time.perf_counter()
+            try:
+                resultados = processor.procesar_batch([
+                    {'id': ticket_id, 'descripcion': descripcion, 'categoria': categoria}
+                    for ticket_id, descripcion, categoria in lote
+                ])
+                if motor_tfidf is not None:
+                    motor_tfidf.aplicar(resultados)
+            except Exception as e:
+                logger.error(f"❌ Error procesando lote en pid {os.getpid()}: {str(e)}")
+                resultados = [processor._resultado_vacio(ticket_id, str(e)) for ticket_id, _, _ in lote]
+            segundos = time.perf_counter() - inicio
+
+            categorias = [categoria for _, _, categoria in lote]
+            cola_salida.put((resultados, categorias, segundos))
+    finally:
+        cola_salida.put(numero)
+
+def _etapa_escritor(cola_salida, procesos, pbar):
+    """Etapa 3: escritor único, una transacción por lote"""
+    from models.analisis import Analisis
+
+    session = db_manager.get_session()
+    estado = {'escritos': 0, 'exitosos': 0, 'fallidos': 0, 'segundos_nlp': 0.0, 'segundos_escritura': 0.0,
+              'histograma': {}}
+    # Números de worker ya terminados, por marcador de fin o por código de salida
+    terminados = set()
+
+    try:
+        while len(terminados) < len(procesos):
+            try:
+                item = cola_salida.get(timeout=5)
+            except queue.Empty:
+                # Un worker que muere sin enviar su marcador de fin no debe colgar el escritor
+                for numero, proceso in enumerate(procesos):
+                    if proceso.exitcode not in (None, 0) and numero not in terminados:
+                        logger.error(f"❌ Worker {proceso.pid} terminó con código {proceso.exitcode}")
+                        terminados.add(numero)
+                continue
+
+            if isinstance(item, int):
+                terminados.add(item)
+                continue
+
+            resultados, categorias, segundos = item
+            inicio = time.perf_counter()
+            ms_por_ticket = segundos * 1000 / len(resultados)
+
+            db_manager.guardar_analisis_batch(session, [
+                Analisis.valores_desde_resultado(resultado, categoria, ms_por_ticket)
+                for resultado, categoria in zip(resultados, categorias)
+            ])
+            session.commit()
+
+            exitosos = sum(1 for r in resultados if r.get('procesado'))
+            estado['escritos'] += len(resultados)
+            estado['exitosos'] += exitosos
+            estado['fallidos'] += len(resultados) - exitosos
+            estado['segundos_nlp'] += segundos
+            estado['segundos_escritura'] += time.perf_counter() - inicio
+            _acumular_resultados(estado['histograma'], resultados)
+            pbar.update(len(resultados))
+
+        return estado
+
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def procesar_pipeline(workers=None, queue_depth=4, batch_size=500):
+    """
+    Procesa los tickets pendientes en tres etapas solapadas
+
+    Un hilo lector pagina la base de datos, un pool de procesos NLP (cada
+    uno con su propio modelo) procesa lotes completos y un escritor único
+    guarda cada lote en una transacción. Las etapas se comunican por colas
+    acotadas, de modo que la memoria se mantiene plana sin importar el total
+    de tickets.
+
+    Args:
+        workers (int): Procesos NLP (default: MAX_WORKERS)
+        queue_depth (int): Lotes máximos en cada cola
+        batch_size (int): Tickets por lote
+
+    Returns:
+        dict: Resumen de throughput
+    """
+    workers = workers or get_config().MAX_WORKERS
+
+    logger.info("🔄 Iniciando procesamiento en PIPELINE")
+    logger.info(f"⚙️  Workers: {workers} | Profundidad de cola: {queue_depth} | Batch: {batch_size}")
+
+    contexto = multiprocessing.get_context()
+    cola_entrada = contexto.Queue(maxsize=queue_depth)
+    cola_salida = contexto.Queue(maxsize=queue_depth)
+
+    inicio = time.time()
+
+    # Los workers arrancan antes que el lector para no heredar conexiones en uso.
+    # No son daemon: un proceso daemon no puede crear hijos y nlp.pipe los
+    # necesita con NLP_N_PROCESS>1; se terminan y se esperan explícitamente
+    procesos = [
+        contexto.Process(target=_worker_nlp, args=(numero, cola_entrada, cola_salida), daemon=False)
+        for numero in range(workers)
+    ]
+    for proceso in procesos:
+        proceso.start()
+
+    estado_lector = {'leidos': 0, 'error': None}
+    detener = threading.Event()
+    lector = threading.Thread(
+        target=_etapa_lector,
+        args=(cola_entrada, batch_size, procesos, estado_lector, detener),
+        daemon=True
+    )
+    lector.start()
+
+    try:
+        with tqdm(desc="Procesando tickets", unit="ticket") as pbar:
+            estado = _etapa_escritor(cola_salida, procesos, pbar)
+    except Exception as e:
+        logger.error(f"❌ Error en el escritor: {str(e)}")
+        for proceso in procesos:
+            proceso.terminate()
+        raise
+    finally:
+        # Si el escritor terminó antes (workers caídos), el lector no debe quedar esperando
+        detener.set()
+        lector.join()
+        for proceso in procesos:
+            proceso.join()
+
+    segundos = time.time() - inicio
+    resumen = {
+        'workers': workers,
+        'queue_depth': queue_depth,
+        'batch_size': batch_size,
+        'leidos': estado_lector['leidos'],
+        'escritos': estado['escritos'],
+        'exitosos': estado['exitosos'],
+        'fallidos': estado['fallidos'],
+        'segundos': round(segundos, 2),
+        'tickets_por_segundo': round(estado['escritos'] / segundos, 1) if segundos else 0.0,
+        'segundos_nlp': round(estado['segundos_nlp'], 2),
+        'segundos_escritura': round(estado['segundos_escritura'], 2),
+        'etapas': resumir_histograma(estado['histograma'])
+    }
+
+    logger.info("📊 Resumen del pipeline:")
+    logger.info(f"   Leídos: {resumen['leidos']} | Escritos: {resumen['escritos']}")
+    logger.info(f"   ✅ Exitosos: {resumen['exitosos']} | ❌ Sin procesar: {resumen['fallidos']}")
+    logger.info(f"   ⏱️  {resumen['segundos']}s → {resumen['tickets_por_segundo']} tickets/s")
+    logger.info(f"   🧠 NLP (suma de workers): {resumen['segundos_nlp']}s | 💾 Escritura: {resumen['segundos_escritura']}s")
+    _log_etapas(resumen['etapas'])
+
+    if estado_lector['error']:
+        logger.error(f"❌ El lector se detuvo antes de terminar: {estado_lector['error']}")
+    if resumen['escritos'] < resumen['leidos']:
+        logger.warning(f"⚠️  {resumen['leidos'] - resumen['escritos']} tickets leídos no se escribieron")
+
+    return resumen
 
 def verificar_progreso():
     """Verifica el progreso del procesamiento"""
@@ -248,33 +583,33 @@ def verificar_progreso():
     finally:
         session.close()
 
-def main():
-    """Función principal"""
-    print("=" * 60)
-    print("🎮 SEIRA 2.0 - Procesamiento Batch de Tickets")
-    print("=" * 60)
-    print()
-    
-    # Inicializar base de datos
-    try:
-        db_manager.init_engine()
-    except Exception as e:
-        logger.error(f"❌ Error conectando a la base de datos: {str(e)}")
-        return
-    
-    # Verificar progreso actual
-    verificar_progreso()
-    print()
-    
-    # Menú de opciones
+def ejecutar_modo(modo, batch_size=None, workers=None, queue_depth=4, esperar=False,
+                  categorias=None, desde=None, hasta=None):
+    """Ejecuta un modo de procesamiento sin interacción"""
+    if modo == 'sincrono':
+        inicio = time.time()
+        procesar_batch_sincrono(batch_size=batch_size or 1000)
+        logger.info(f"⏱️  Tiempo total: {(time.time() - inicio) / 60:.2f} minutos")
+    elif modo == 'celery':
+        procesar_batch_celery(batch_size=batch_size or 500, esperar=esperar)
+    elif modo == 'pipeline':
+        procesar_pipeline(workers=workers, queue_depth=queue_depth, batch_size=batch_size or 500)
+    elif modo == 'reprocesar':
+        reprocesar_obsoletos(batch_size=batch_size or 1000, categorias=categorias, desde=desde, hasta=hasta)
+    elif modo == 'progreso':
+        verificar_progreso()
+
+def menu_interactivo():
+    """Menú de opciones para uso manual"""
     print("Selecciona el modo de procesamiento:")
     print("1. Procesamiento SÍNCRONO (sin Celery, más lento pero simple)")
     print("2. Procesamiento ASÍNCRONO (con Celery, más rápido)")
-    print("3. Solo verificar progreso")
-    print("4. Salir")
+    print("3. Procesamiento en PIPELINE (multiproceso, sin Celery)")
+    print("4. Solo verificar progreso")
+    print("5. Salir")
     print()
     
-    opcion = input("Opción (1-4): ").strip()
+    opcion = input("Opción (1-5): ").strip()
     print()
     
     if opcion == '1':
@@ -288,19 +623,73 @@ def main():
         logger.info(f"⏱️  Tiempo total: {(fin - inicio) / 60:.2f} minutos")
         
     elif opcion == '2':
-        batch_size = input("Tamaño de batch (default: 100): ").strip()
-        batch_size = int(batch_size) if batch_size else 100
+        batch_size = input("Tamaño de batch (default: 500): ").strip()
+        batch_size = int(batch_size) if batch_size else 500
         
         procesar_batch_celery(batch_size=batch_size)
         
     elif opcion == '3':
-        verificar_progreso()
+        workers = input(f"Workers NLP (default: {get_config().MAX_WORKERS}): ").strip()
+        batch_size = input("Tamaño de batch (default: 500): ").strip()
+        
+        procesar_pipeline(
+            workers=int(workers) if workers else None,
+            batch_size=int(batch_size) if batch_size else 500
+        )
         
     elif opcion == '4':
+        verificar_progreso()
+        
+    elif opcion == '5':
         logger.info("👋 Saliendo...")
-        return
+        return False
     else:
         logger.error("❌ Opción inválida")
+        return False
+    
+    return True
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Procesamiento batch de tickets')
+    parser.add_argument('--modo', choices=['sincrono', 'celery', 'pipeline', 'reprocesar', 'progreso'],
+                        help='Modo a ejecutar sin menú (uso desatendido)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Tickets por lote (default: 1000 síncrono, 500 celery y pipeline)')
+    parser.add_argument('--workers', type=int, default=None, help='Workers NLP del pipeline (default: MAX_WORKERS)')
+    parser.add_argument('--queue-depth', type=int, default=4, help='Lotes máximos en cada cola del pipeline')
+    parser.add_argument('--esperar', '--wait', action='store_true',
+                        help='Modo celery: esperar a que termine la corrida')
+    parser.add_argument('--run-id', default=None, help='Solo esperar una corrida ya enviada')
+    parser.add_argument('--categorias', nargs='+', default=None, help='Modo reprocesar: limitar a estas categorías')
+    parser.add_argument('--desde', type=datetime.fromisoformat, default=None,
+                        help='Modo reprocesar: fecha_creacion mínima (YYYY-MM-DD)')
+    parser.add_argument('--hasta', type=datetime.fromisoformat, default=None,
+                        help='Modo reprocesar: fecha_creacion máxima, excluida (YYYY-MM-DD)')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🎮 SEIRA 2.0 - Procesamiento Batch de Tickets")
+    print("=" * 60)
+    print()
+    
+    # Inicializar base de datos
+    try:
+        db_manager.init_engine()
+    except Exception as e:
+        logger.error(f"❌ Error conectando a la base de datos: {str(e)}")
+        return
+    
+    # Verificar progreso actual
+    verificar_progreso()
+    print()
+    
+    if args.run_id:
+        esperar_run(args.run_id)
+    elif args.modo:
+        ejecutar_modo(args.modo, args.batch_size, args.workers, args.queue_depth, args.esperar,
+                      args.categorias, args.desde, args.hasta)
+    elif not menu_interactivo():
         return
     
     print()
@@ -309,4 +698,4 @@ def main():
     print("=" * 60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
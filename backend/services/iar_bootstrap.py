@@ -0,0 +1,162 @@
+"""
+Intervalos bootstrap del IAR por categoría
+
+Remuestrea con reposición los tickets analizados de cada categoría
+(complejidad y urgencia de cada uno) y recalcula el IAR de cada réplica
+con IARCalculator.calcular_lote; se guardan los percentiles 5, 50 y 95.
+
+Los tickets no se leen uno por uno: la base de datos devuelve celdas
+(categoría, complejidad, urgencia, conteo) y cada réplica es un vector
+multinomial de conteos sobre esas celdas. La complejidad (0-100 con dos
+decimales) se redondea en el GROUP BY a múltiplos de
+IAR_BOOTSTRAP_PASO_COMPLEJIDAD: con el paso por defecto (2) hay a lo
+sumo 51 valores por urgencia, unas 200 celdas por categoría, y 1000
+réplicas caben en la ruta multinomial exacta. Solo si una categoría aún tiene tantas celdas que
+muestras × celdas se vuelve caro (paso 0 o muchas réplicas), la suma de n
+tickets remuestreados se aproxima con una normal multivariada con la
+media y la covarianza de los tickets (teorema central del límite).
+Frecuencia y repetitividad no dependen de complejidad ni urgencia y
+quedan fijas.
+
+El costo no depende de los agregados incrementales (AGREGADOS_CATEGORIA):
+celdas_por_categoria siempre es un GROUP BY completo sobre analisis,
+también cuando el IAR se calcula leyendo solo agregados_categoria.
+"""
+import logging
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import func
+
+from config import get_config
+from models import Analisis, Ticket
+from utils.particiones import join_ticket_analisis, filtrar_tickets_periodo
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (5, 50, 95)
+
+# Elementos de la matriz multinomial (muestras × celdas) por categoría antes de pasar a la normal
+LIMITE_EXACTO = 250_000
+
+def celdas_por_categoria(session, desde=None, hasta=None, paso=None):
+    """
+    Tickets analizados agrupados por categoría, complejidad redondeada y urgencia
+
+    Recorre todos los análisis del período (GROUP BY sobre analisis), haya
+    o no agregados incrementales.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        paso (float): Ancho del redondeo de complejidad (default: config
+            IAR_BOOTSTRAP_PASO_COMPLEJIDAD; 0 = valores exactos). Las
+            complejidades positivas de NLPProcessor son mayores que 4, así
+            que con pasos chicos ninguna cae a 0 (sin complejidad)
+
+    Returns:
+        dict: {categoria: [(complejidad, urgencia, conteo)]}
+    """
+    if paso is None:
+        paso = get_config().IAR_BOOTSTRAP_PASO_COMPLEJIDAD
+
+    # La misma expresión en el SELECT y en el GROUP BY (mismo parámetro)
+    complejidad = Analisis.complejidad_score
+    if paso:
+        complejidad = func.round(Analisis.complejidad_score / paso) * paso
+
+    query = session.query(
+        Ticket.categoria, complejidad, Analisis.urgencia, func.count()
+    ).select_from(Ticket).join(Analisis, join_ticket_analisis())
+    query = filtrar_tickets_periodo(query, desde, hasta, con_analisis=True)
+
+    celdas = defaultdict(list)
+    for categoria, complejidad, urgencia, conteo in query.group_by(
+        Ticket.categoria, complejidad, Analisis.urgencia
+    ):
+        celdas[categoria].append((float(complejidad or 0), urgencia, int(conteo)))
+    return celdas
+
+def _remuestrear(rng, celdas, tiempo_por_urgencia, muestras):
+    """
+    Estadísticos suficientes de cada réplica de una categoría
+
+    Returns:
+        tuple: (n_complejidad, Σx, Σx², horas) como arreglos de largo muestras
+    """
+    complejidad = np.array([c for c, _, _ in celdas], dtype=float)
+    horas = np.array([tiempo_por_urgencia.get(u, 0.0) for _, u, _ in celdas], dtype=float)
+    conteos = np.array([n for _, _, n in celdas], dtype=float)
+    n = int(conteos.sum())
+
+    # Una fila por estadístico, una columna por celda
+    valores = np.stack([complejidad != 0, complejidad, complejidad * complejidad, horas]).astype(float)
+
+    if muestras * len(celdas) <= LIMITE_EXACTO:
+        pesos = rng.multinomial(n, conteos / n, size=muestras)
+        estadisticos = pesos @ valores.T
+    else:
+        media = valores @ conteos / n
+        centrados = valores - media[:, np.newaxis]
+        covarianza = (centrados * conteos) @ centrados.T / n
+        estadisticos = rng.multivariate_normal(n * media, n * covarianza, size=muestras, method='eigh')
+        estadisticos = np.maximum(estadisticos, 0.0)
+
+    return estadisticos[:, 0], estadisticos[:, 1], estadisticos[:, 2], estadisticos[:, 3]
+
+def intervalos_iar(calculadora, metricas, celdas, total_global, tiempo_por_urgencia, muestras=1000, semilla=None):
+    """
+    Percentiles 5/50/95 del IAR de cada categoría por bootstrap
+
+    Todas las réplicas de todas las categorías se puntúan en una sola
+    llamada a calcular_lote.
+
+    Args:
+        calculadora: IARCalculator
+        metricas: {categoria: métricas} del cálculo del IAR
+        celdas: Resultado de celdas_por_categoria
+        total_global: Total de tickets (para la frecuencia)
+        tiempo_por_urgencia: {urgencia: horas} para el tiempo total
+        muestras (int): Réplicas por categoría
+        semilla (int): Semilla del generador (opcional)
+
+    Returns:
+        dict: {categoria: {'p5', 'p50', 'p95', 'muestras'}}
+    """
+    rng = np.random.default_rng(semilla)
+    categorias = [c for c in metricas if celdas.get(c)]
+    if not categorias:
+        return {}
+
+    complejidad_promedio, tiempo_total, uniformidad = [], [], []
+    for categoria in categorias:
+        n_complejidad, suma, suma_cuadrados, horas = _remuestrear(rng, celdas[categoria], tiempo_por_urgencia, muestras)
+
+        con_datos = n_complejidad > 0
+        media = np.divide(suma, n_complejidad, out=np.zeros(muestras), where=con_datos)
+        varianza = np.divide(suma_cuadrados, n_complejidad, out=np.zeros(muestras), where=con_datos) - media * media
+        desviacion = np.where(n_complejidad > 1, np.sqrt(np.maximum(varianza, 0.0)), 0.0)
+
+        complejidad_promedio.append(media)
+        tiempo_total.append(horas)
+        uniformidad.append(np.where(desviacion > 0, np.maximum(100 - desviacion, 0), 100.0))
+
+    repetir = lambda clave: np.repeat([metricas[c][clave] for c in categorias], muestras)
+    resultado = calculadora.calcular_lote({
+        'total_tickets': repetir('total_tickets'),
+        'complejidad_promedio': np.concatenate(complejidad_promedio),
+        'tiempo_total_anual_horas': np.concatenate(tiempo_total),
+        'repetitividad_score': repetir('repetitividad_score'),
+        'uniformidad_score': np.concatenate(uniformidad),
+        'tasa_resolucion': repetir('tasa_resolucion'),
+    }, total_global=total_global)
+
+    cuantiles = np.percentile(resultado['iar'].reshape(len(categorias), muestras), PERCENTILES, axis=1)
+    return {
+        categoria: {
+            **{f'p{p}': round(float(cuantiles[j, i]), 2) for j, p in enumerate(PERCENTILES)},
+            'muestras': int(muestras)
+        }
+        for i, categoria in enumerate(categorias)
+    }
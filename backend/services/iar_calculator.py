@@ -1,13 +1,41 @@
 """
 Calculador del Índice de Automatización Recomendada (IAR)
+
+Los métodos calcular_* puntúan una categoría a la vez; calcular_lote hace
+lo mismo para muchas categorías (o combinaciones categoría/período/
+escenario) con operaciones de NumPy por columna y da exactamente los
+mismos valores.
 """
 import logging
 from collections import Counter
 import json
+import numpy as np
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
+NIVELES = ('NO_RECOMENDADO', 'EVALUAR', 'RECOMENDADO', 'ALTAMENTE_RECOMENDADO')
+
+def _redondear(valores, decimales=2):
+    """
+    round(x, decimales) de Python sobre un arreglo
+
+    np.round escala, redondea y divide, y puede diferir de round() cuando
+    x * 10**decimales cae casi en .5; esos pocos elementos se redondean
+    con round() para que el resultado sea idéntico al escalar.
+    """
+    valores = np.asarray(valores, dtype=float)
+    escalados = valores * 10.0 ** decimales
+    resultado = np.round(escalados) / 10.0 ** decimales
+    fraccion = np.abs(escalados - np.floor(escalados) - 0.5)
+    dudosos = np.flatnonzero(fraccion <= 1e-9 + np.abs(escalados) * 1e-12)
+    if dudosos.size:
+        planos = resultado.reshape(-1)
+        fuente = valores.reshape(-1)
+        for i in dudosos:
+            planos[i] = round(float(fuente[i]), decimales)
+    return resultado
+
 class IARCalculator:
     """Calculador del IAR basado en 4 métricas ponderadas"""
     
@@ -189,6 +217,26 @@ class IARCalculator:
         else:
             return 'ALTAMENTE_RECOMENDADO'
     
+    def calcular_prioridad(self, iar, nivel):
+        """
+        Prioridad de implementación (1-10) dentro del rango de cada nivel
+        
+        Args:
+            iar: Índice IAR (0-100)
+            nivel: Nivel de recomendación (determinar_nivel)
+            
+        Returns:
+            int: Prioridad 1-10
+        """
+        if nivel == 'ALTAMENTE_RECOMENDADO':
+            return 9 + min(int((iar - 80) / 2), 1)  # 9-10
+        elif nivel == 'RECOMENDADO':
+            return 6 + min(int((iar - 60) / 6), 2)  # 6-8
+        elif nivel == 'EVALUAR':
+            return 3 + min(int((iar - 30) / 10), 2)  # 3-5
+        else:
+            return 1 + min(int(iar / 15), 1)  # 1-2
+    
     def sugerir_tipo_ia(self, categoria, urgencia_critica, sentimiento_negativo):
         """
         Sugiere el tipo de IA más apropiado
@@ -332,4 +380,148 @@ class IARCalculator:
         # 0.5 kg CO2 por hora × 70% de automatización
         ahorro_carbono = tiempo_total_anual_horas * 0.5 * 0.7
         
-        return round(ahorro_carbono, 2)
\ No newline at end of file
+        return round(ahorro_carbono, 2)
+    
+    def calcular_lote(self, metricas, total_global=None, costo_implementacion=None):
+        """
+        Scores, nivel, prioridad y ROI de muchas categorías a la vez
+        
+        Equivale a llamar calcular_frecuencia_score, calcular_complejidad_score,
+        calcular_impacto_score, calcular_viabilidad_score, calcular_iar,
+        determinar_nivel, calcular_prioridad y estimar_roi fila por fila,
+        con los mismos resultados exactos, pero con np.select/np.where por
+        columna en lugar de if/elif por categoría.
+        
+        Args:
+            metricas: dict de arreglos o DataFrame con total_tickets,
+                complejidad_promedio, tiempo_total_anual_horas,
+                repetitividad_score, uniformidad_score y tasa_resolucion
+            total_global: Total de tickets (escalar o arreglo);
+                por defecto la suma de total_tickets
+            costo_implementacion: Costo por fila o escalar (default: config)
+            
+        Returns:
+            dict: {columna: np.ndarray} con frecuencia_score, complejidad_score,
+                  impacto_score, viabilidad_score, iar, nivel, prioridad,
+                  ahorro_anual_usd, roi_porcentaje, meses_recuperacion,
+                  costo_mantenimiento_anual y beneficio_neto_anual
+                  (pd.DataFrame(resultado) da la tabla)
+        """
+        columna = lambda nombre: np.asarray(metricas[nombre], dtype=float)
+        total_tickets = columna('total_tickets')
+        if total_global is None:
+            total_global = total_tickets.sum()
+        
+        frecuencia = self._frecuencia_lote(total_tickets, np.broadcast_to(np.asarray(total_global, dtype=float), total_tickets.shape))
+        complejidad = _redondear(np.maximum(0.0, np.minimum(100.0 - columna('complejidad_promedio'), 100.0)))
+        horas = columna('tiempo_total_anual_horas')
+        impacto = self._impacto_lote(horas)
+        viabilidad = self._viabilidad_lote(columna('repetitividad_score'), columna('uniformidad_score'), columna('tasa_resolucion'))
+        
+        iar = _redondear(np.minimum(
+            frecuencia * self.weights['frecuencia'] +
+            complejidad * self.weights['complejidad'] +
+            impacto * self.weights['impacto_productividad'] +
+            viabilidad * self.weights['viabilidad_tecnica'],
+            100.0
+        ))
+        
+        # Niveles como índice 0-3 sobre NIVELES
+        indice_nivel = np.select([iar <= 30, iar <= 60, iar <= 80], [0, 1, 2], default=3)
+        prioridad = np.select(
+            [indice_nivel == 3, indice_nivel == 2, indice_nivel == 1],
+            [
+                9 + np.minimum(np.trunc((iar - 80) / 2), 1),
+                6 + np.minimum(np.trunc((iar - 60) / 6), 2),
+                3 + np.minimum(np.trunc((iar - 30) / 10), 2),
+            ],
+            default=1 + np.minimum(np.trunc(iar / 15), 1)
+        ).astype(int)
+        
+        resultado = {
+            'frecuencia_score': frecuencia,
+            'complejidad_score': complejidad,
+            'impacto_score': impacto,
+            'viabilidad_score': viabilidad,
+            'iar': iar,
+            'nivel': np.array(NIVELES, dtype=object)[indice_nivel],
+            'prioridad': prioridad,
+        }
+        resultado.update(self._roi_lote(horas, costo_implementacion))
+        return resultado
+    
+    def _frecuencia_lote(self, total_tickets, total_global):
+        """calcular_frecuencia_score por columna"""
+        sin_total = total_global == 0
+        proporcion = np.divide(total_tickets, total_global, out=np.zeros_like(total_tickets), where=~sin_total)
+        score = proporcion * 100
+        score = np.select(
+            [sin_total, proporcion > 0.10, proporcion > 0.05],
+            [0.0, 100.0, np.minimum(score * 1.5, 100.0)],
+            default=np.minimum(score * 2.0, 100.0)
+        )
+        return _redondear(np.minimum(score, 100.0))
+    
+    def _impacto_lote(self, horas):
+        """calcular_impacto_score por columna (mismos tramos)"""
+        score = np.select(
+            [horas <= 0, horas < 100, horas < 500, horas < 1000],
+            [
+                0.0,
+                (horas / 100) * 20,
+                20 + ((horas - 100) / 400) * 30,
+                50 + ((horas - 500) / 500) * 25,
+            ],
+            default=75 + np.minimum(((horas - 1000) / 2000) * 25, 25)
+        )
+        return _redondear(np.minimum(score, 100.0))
+    
+    def _viabilidad_lote(self, repetitividad, uniformidad, tasa_resolucion):
+        """calcular_viabilidad_score por columna"""
+        score = (
+            repetitividad * 0.40 +
+            uniformidad * 0.30 +
+            (tasa_resolucion * 100) * 0.30
+        )
+        return _redondear(np.minimum(score, 100.0))
+    
+    def _roi_lote(self, horas, costo_implementacion=None, costo_hora_soporte=None):
+        """
+        estimar_roi por columna
+        
+        horas, costo_implementacion y costo_hora_soporte se combinan con
+        broadcasting (p. ej. categorías en filas y escenarios en columnas).
+        """
+        if costo_implementacion is None:
+            costo_implementacion = self.costo_base
+        if costo_hora_soporte is None:
+            costo_hora_soporte = self.costo_hora_soporte
+        horas, costo, costo_hora_soporte = np.broadcast_arrays(
+            np.asarray(horas, dtype=float),
+            np.asarray(costo_implementacion, dtype=float),
+            np.asarray(costo_hora_soporte, dtype=float)
+        )
+        
+        ahorro_anual = horas * costo_hora_soporte * 0.7
+        costo_mantenimiento_anual = costo * self.costo_mantenimiento_porcentaje
+        beneficio_neto = ahorro_anual - costo_mantenimiento_anual
+        
+        con_costo = costo > 0
+        roi_porcentaje = np.where(
+            con_costo,
+            np.divide(beneficio_neto, costo, out=np.zeros_like(beneficio_neto), where=con_costo) * 100,
+            0.0
+        )
+        
+        beneficio_mensual = ahorro_anual / 12 - costo_mantenimiento_anual / 12
+        recupera = beneficio_mensual > 0
+        meses = np.divide(costo, beneficio_mensual, out=np.zeros_like(beneficio_mensual), where=recupera)
+        meses_recuperacion = np.where(recupera, np.trunc(meses), 999).astype(int)
+        
+        return {
+            'ahorro_anual_usd': _redondear(ahorro_anual),
+            'roi_porcentaje': _redondear(roi_porcentaje),
+            'meses_recuperacion': meses_recuperacion,
+            'costo_mantenimiento_anual': _redondear(costo_mantenimiento_anual),
+            'beneficio_neto_anual': _redondear(beneficio_neto)
+        }
@@ -0,0 +1,337 @@
+"""
+Simulador de sensibilidad del IAR (what-if)
+
+Los scores de frecuencia, complejidad, impacto y viabilidad de cada
+categoría no dependen de las ponderaciones ni de los costos: se leen una
+vez de la última corrida del IAR (MetricaCategoria.datos_adicionales) y
+cada escenario solo cambia las ponderaciones, COSTO_HORA_SOPORTE y
+COSTO_IMPLEMENTACION_BASE. Todos los escenarios se evalúan juntos como
+matrices categorías × escenarios, de modo que 10.000 escenarios toman
+unos milisegundos.
+"""
+import itertools
+import logging
+
+import numpy as np
+from sqlalchemy import desc
+
+from config import get_config
+from models.metrica import MetricaCategoria
+from services.iar_calculator import IARCalculator, NIVELES, _redondear
+
+logger = logging.getLogger(__name__)
+
+# Orden de las columnas de pesos (claves de Config.IAR_WEIGHTS) y su score en datos_adicionales
+COMPONENTES = ('frecuencia', 'complejidad', 'impacto_productividad', 'viabilidad_tecnica')
+SCORES = ('frecuencia_score', 'complejidad_score', 'impacto_score', 'viabilidad_score')
+
+# Límites superiores de NO_RECOMENDADO, EVALUAR y RECOMENDADO (determinar_nivel)
+UMBRALES_NIVEL = np.array([30.0, 60.0, 80.0])
+
+PERCENTILES = (5, 50, 95)
+
+class SimuladorIAR:
+    """Evalúa el IAR de todas las categorías bajo muchos escenarios de pesos y costos"""
+
+    def __init__(self, categorias, scores, horas_anuales, calculadora=None):
+        """
+        Args:
+            categorias: Nombres de las categorías
+            scores: Matriz categorías × 4 en el orden de COMPONENTES
+            horas_anuales: tiempo_total_anual_horas de cada categoría
+            calculadora: IARCalculator con los pesos y costos base (default: config)
+        """
+        self.categorias = list(categorias)
+        self.scores = np.asarray(scores, dtype=float).reshape(len(self.categorias), len(COMPONENTES))
+        self.horas = np.asarray(horas_anuales, dtype=float)
+        self.calculadora = calculadora or IARCalculator()
+        self.max_escenarios = get_config().IAR_SIMULACION_MAX_ESCENARIOS
+
+    @classmethod
+    def desde_bd(cls, session, calculadora=None):
+        """
+        Carga los scores de la última corrida del IAR (una fila por categoría)
+
+        Args:
+            session: Sesión de SQLAlchemy
+            calculadora: IARCalculator (opcional)
+
+        Returns:
+            SimuladorIAR
+        """
+        filas = session.query(
+            MetricaCategoria.categoria, MetricaCategoria.datos_adicionales
+        ).order_by(MetricaCategoria.categoria, desc(MetricaCategoria.fecha), desc(MetricaCategoria.id))
+
+        categorias, scores, horas = [], [], []
+        for categoria, datos in filas:
+            if categorias and categorias[-1] == categoria:
+                continue  # Ya se tomó la métrica más reciente
+            if not datos or any(datos.get(clave) is None for clave in SCORES):
+                continue
+            categorias.append(categoria)
+            scores.append([float(datos[clave]) for clave in SCORES])
+            horas.append(float(datos.get('tiempo_total_anual_horas') or 0.0))
+
+        logger.info(f"🎲 Simulador IAR: {len(categorias)} categorías cargadas")
+        return cls(categorias, scores, horas, calculadora)
+
+    # ========== ESCENARIOS ==========
+
+    def pesos_base(self):
+        """Ponderaciones de la configuración en el orden de COMPONENTES"""
+        return np.array([self.calculadora.weights[c] for c in COMPONENTES], dtype=float)
+
+    def escenario_base(self):
+        """Un solo escenario con los pesos y costos de la configuración"""
+        return {
+            'pesos': self.pesos_base()[np.newaxis, :],
+            'costo_hora_soporte': np.array([self.calculadora.costo_hora_soporte]),
+            'costo_implementacion': np.array([self.calculadora.costo_base])
+        }
+
+    def muestreo(self, n, semilla=None, variacion_pesos=0.25,
+                 costo_hora_soporte=None, costo_implementacion=None):
+        """
+        Escenarios aleatorios alrededor de la configuración
+
+        Cada peso base se multiplica por un factor uniforme en
+        [1 - variacion_pesos, 1 + variacion_pesos] y se renormaliza a 1.
+
+        Args:
+            n (int): Cantidad de escenarios
+            semilla (int): Semilla del generador (opcional)
+            variacion_pesos (float): Variación relativa de cada peso (0-1)
+            costo_hora_soporte: Rango (min, max) uniforme; None = valor base
+            costo_implementacion: Rango (min, max) uniforme; None = valor base
+
+        Returns:
+            dict: {'pesos': (n, 4), 'costo_hora_soporte': (n,), 'costo_implementacion': (n,)}
+
+        Raises:
+            ValueError: Si algún parámetro está fuera de rango
+        """
+        n = int(n)
+        if n < 1 or n > self.max_escenarios:
+            raise ValueError(f"escenarios debe estar entre 1 y {self.max_escenarios}")
+        if not 0 <= variacion_pesos < 1:
+            raise ValueError("variacion_pesos debe estar en [0, 1)")
+
+        rng = np.random.default_rng(semilla)
+        factores = rng.uniform(1 - variacion_pesos, 1 + variacion_pesos, size=(n, len(COMPONENTES)))
+        pesos = self.pesos_base() * factores
+
+        def costos(rango, base):
+            if rango is None:
+                return np.full(n, base)
+            minimo, maximo = self._rango(rango)
+            return rng.uniform(minimo, maximo, size=n)
+
+        return {
+            'pesos': self._normalizar(pesos),
+            'costo_hora_soporte': costos(costo_hora_soporte, self.calculadora.costo_hora_soporte),
+            'costo_implementacion': costos(costo_implementacion, self.calculadora.costo_base)
+        }
+
+    def grilla(self, pesos=None, costo_hora_soporte=None, costo_implementacion=None):
+        """
+        Producto cartesiano de valores de pesos y costos
+
+        Args:
+            pesos: dict {componente: [valores]}; los componentes que faltan
+                quedan en su valor base. Cada combinación se renormaliza a 1.
+            costo_hora_soporte: Lista de valores (default: valor base)
+            costo_implementacion: Lista de valores (default: valor base)
+
+        Returns:
+            dict: Igual que muestreo()
+
+        Raises:
+            ValueError: Si algún componente no existe o la grilla es demasiado grande
+        """
+        pesos = pesos or {}
+        desconocidos = set(pesos) - set(COMPONENTES)
+        if desconocidos:
+            raise ValueError(f"Componentes desconocidos: {sorted(desconocidos)} (válidos: {list(COMPONENTES)})")
+
+        base = self.pesos_base()
+        ejes = [self._valores(pesos.get(c), base[i]) for i, c in enumerate(COMPONENTES)]
+        ejes.append(self._valores(costo_hora_soporte, self.calculadora.costo_hora_soporte))
+        ejes.append(self._valores(costo_implementacion, self.calculadora.costo_base))
+
+        total = int(np.prod([len(eje) for eje in ejes]))
+        if total > self.max_escenarios:
+            raise ValueError(f"La grilla tiene {total:,} escenarios (máximo {self.max_escenarios:,})")
+
+        combinaciones = np.array(list(itertools.product(*ejes)), dtype=float)
+        matriz_pesos = combinaciones[:, :len(COMPONENTES)]
+        validas = matriz_pesos.sum(axis=1) > 0
+        if not validas.any():
+            raise ValueError("Ninguna combinación de pesos suma más que 0")
+        combinaciones = combinaciones[validas]
+
+        return {
+            'pesos': self._normalizar(combinaciones[:, :len(COMPONENTES)]),
+            'costo_hora_soporte': combinaciones[:, len(COMPONENTES)],
+            'costo_implementacion': combinaciones[:, len(COMPONENTES) + 1]
+        }
+
+    @staticmethod
+    def _normalizar(pesos):
+        return pesos / pesos.sum(axis=1, keepdims=True)
+
+    @staticmethod
+    def _valores(valores, base):
+        """Lista de valores no negativos de un eje de la grilla"""
+        if valores is None:
+            return [float(base)]
+        if not isinstance(valores, (list, tuple)) or not valores:
+            raise ValueError("Los ejes de la grilla deben ser listas no vacías")
+        valores = [float(v) for v in valores]
+        if min(valores) < 0:
+            raise ValueError("Los pesos y costos no pueden ser negativos")
+        return valores
+
+    @staticmethod
+    def _rango(rango):
+        """(min, max) de un rango de costos"""
+        if not isinstance(rango, (list, tuple)) or len(rango) != 2:
+            raise ValueError("Los rangos de costos deben ser [min, max]")
+        minimo, maximo = float(rango[0]), float(rango[1])
+        if minimo < 0 or maximo < minimo:
+            raise ValueError("Rango de costos inválido: se espera 0 <= min <= max")
+        return minimo, maximo
+
+    # ========== EVALUACIÓN ==========
+
+    def evaluar(self, escenarios):
+        """
+        IAR, nivel, ranking y ROI de cada categoría en cada escenario
+
+        Mismas operaciones que IARCalculator.calcular_iar, determinar_nivel y
+        estimar_roi, en matrices categorías × escenarios.
+
+        Args:
+            escenarios: dict de muestreo(), grilla() o escenario_base()
+
+        Returns:
+            dict: {'iar', 'nivel' (índice sobre NIVELES), 'ranking' (1 = mayor IAR),
+                   'roi_porcentaje', 'ahorro_anual_usd', 'meses_recuperacion'}
+        """
+        pesos = escenarios['pesos']
+        s = self.scores
+        iar = _redondear(np.minimum(
+            s[:, 0:1] * pesos[:, 0] +
+            s[:, 1:2] * pesos[:, 1] +
+            s[:, 2:3] * pesos[:, 2] +
+            s[:, 3:4] * pesos[:, 3],
+            100.0
+        ))
+
+        # searchsorted 'left': iar == umbral queda en el nivel inferior (iar <= 30, <= 60, <= 80)
+        nivel = np.searchsorted(UMBRALES_NIVEL, iar, side='left')
+
+        orden = np.argsort(-iar, axis=0, kind='stable')
+        ranking = np.empty_like(orden)
+        np.put_along_axis(ranking, orden, np.arange(1, len(self.categorias) + 1)[:, np.newaxis], axis=0)
+
+        roi = self.calculadora._roi_lote(
+            self.horas[:, np.newaxis],
+            escenarios['costo_implementacion'][np.newaxis, :],
+            escenarios['costo_hora_soporte'][np.newaxis, :]
+        )
+
+        return {
+            'iar': iar,
+            'nivel': nivel,
+            'ranking': ranking,
+            'roi_porcentaje': roi['roi_porcentaje'],
+            'ahorro_anual_usd': roi['ahorro_anual_usd'],
+            'meses_recuperacion': roi['meses_recuperacion']
+        }
+
+    def simular(self, escenarios, top_n=5):
+        """
+        Resumen de sensibilidad por categoría y global
+
+        Args:
+            escenarios: dict de muestreo() o grilla()
+            top_n (int): Tamaño del top para la estabilidad del conjunto
+
+        Returns:
+            dict: {'escenarios', 'categorias': [...], 'global': {...}}
+        """
+        n = len(escenarios['pesos'])
+        if not self.categorias:
+            return {'escenarios': n, 'categorias': [], 'global': {}}
+
+        base = self.evaluar(self.escenario_base())
+        resultado = self.evaluar(escenarios)
+        c = len(self.categorias)
+        top_n = max(1, min(int(top_n), c))
+
+        ranking_base = base['ranking'][:, 0]
+        nivel_base = base['nivel'][:, 0]
+
+        cuantiles = lambda matriz: np.percentile(matriz, PERCENTILES, axis=1)
+        iar_q = cuantiles(resultado['iar'])
+        roi_q = cuantiles(resultado['roi_porcentaje'])
+        ahorro_q = cuantiles(resultado['ahorro_anual_usd'])
+        meses_q = cuantiles(resultado['meses_recuperacion'])
+
+        iar_min, iar_max = resultado['iar'].min(axis=1), resultado['iar'].max(axis=1)
+        roi_min, roi_max = resultado['roi_porcentaje'].min(axis=1), resultado['roi_porcentaje'].max(axis=1)
+        rank_min, rank_max = resultado['ranking'].min(axis=1), resultado['ranking'].max(axis=1)
+        mismo_rank = (resultado['ranking'] == ranking_base[:, np.newaxis]).mean(axis=1)
+        cambio_nivel = (resultado['nivel'] != nivel_base[:, np.newaxis]).mean(axis=1)
+        en_top = (resultado['ranking'] <= top_n).mean(axis=1)
+        # Fracción de escenarios en cada nivel: (categorías, 4)
+        niveles = np.stack([(resultado['nivel'] == i).mean(axis=1) for i in range(len(NIVELES))], axis=1)
+
+        r = lambda x: round(float(x), 2)
+        categorias = []
+        for i in np.argsort(ranking_base, kind='stable'):
+            categorias.append({
+                'categoria': self.categorias[i],
+                'base': {
+                    'iar': r(base['iar'][i, 0]),
+                    'nivel': NIVELES[nivel_base[i]],
+                    'ranking': int(ranking_base[i]),
+                    'roi_porcentaje': r(base['roi_porcentaje'][i, 0]),
+                    'meses_recuperacion': int(base['meses_recuperacion'][i, 0])
+                },
+                'iar': {'min': r(iar_min[i]), 'p5': r(iar_q[0, i]), 'p50': r(iar_q[1, i]),
+                        'p95': r(iar_q[2, i]), 'max': r(iar_max[i])},
+                'ranking': {'min': int(rank_min[i]), 'max': int(rank_max[i]),
+                            'estabilidad': round(float(mismo_rank[i]), 4),
+                            'en_top': round(float(en_top[i]), 4)},
+                'nivel': {
+                    'cambio': round(float(cambio_nivel[i]), 4),
+                    'distribucion': {NIVELES[j]: round(float(niveles[i, j]), 4) for j in range(len(NIVELES))}
+                },
+                'roi_porcentaje': {'min': r(roi_min[i]), 'p5': r(roi_q[0, i]), 'p50': r(roi_q[1, i]),
+                                   'p95': r(roi_q[2, i]), 'max': r(roi_max[i])},
+                'ahorro_anual_usd': {'p5': r(ahorro_q[0, i]), 'p50': r(ahorro_q[1, i]), 'p95': r(ahorro_q[2, i])},
+                'meses_recuperacion': {'p5': r(meses_q[0, i]), 'p50': r(meses_q[1, i]), 'p95': r(meses_q[2, i])}
+            })
+
+        # Estabilidad del top N como conjunto y Spearman contra el ranking base
+        top_base = ranking_base <= top_n
+        mismo_top = ((resultado['ranking'] <= top_n) == top_base[:, np.newaxis]).all(axis=0)
+        if c > 1:
+            d2 = ((resultado['ranking'] - ranking_base[:, np.newaxis]) ** 2).sum(axis=0)
+            spearman = 1 - 6 * d2 / (c * (c ** 2 - 1))
+        else:
+            spearman = np.ones(n)
+
+        return {
+            'escenarios': n,
+            'categorias': categorias,
+            'global': {
+                'top_n': top_n,
+                'estabilidad_top': round(float(mismo_top.mean()), 4),
+                'spearman_promedio': round(float(spearman.mean()), 4),
+                'spearman_p5': round(float(np.percentile(spearman, 5)), 4),
+                'cambio_nivel_promedio': round(float(cambio_nivel.mean()), 4)
+            }
+        }
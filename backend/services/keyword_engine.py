@@ -0,0 +1,282 @@
+"""
+Motor de palabras clave TF-IDF a nivel de corpus
+
+Ajusta un modelo TF-IDF disperso sobre un snapshot de textos limpios (uno
+global o uno por categoría), puntúa lotes completos con operaciones sobre
+matrices dispersas y persiste vocabulario e IDF para que los lotes
+posteriores solo ejecuten transform.
+
+Cada motor tiene una huella (hash del contenido de sus modelos) que se
+agrega a huella_analizador de los resultados: reajustar el modelo marca
+como obsoletos los análisis hechos con el anterior.
+"""
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import get_config
+
+try:
+    from spacy.lang.es.stop_words import STOP_WORDS
+except ImportError:  # spaCy no instalado: sin stopwords
+    STOP_WORDS = frozenset()
+
+logger = logging.getLogger(__name__)
+
+_RE_PALABRA = re.compile(r'\w+')
+
+# Clave del modelo global
+CORPUS = '__corpus__'
+
+def analizar_texto(texto):
+    """Tokenizador del motor: palabras de más de 2 letras que no son stopwords"""
+    return [p for p in _RE_PALABRA.findall(texto or '') if len(p) > 2 and p not in STOP_WORDS]
+
+def huella_analizador(huella, motor=None):
+    """
+    Huella de un análisis: la de NLPProcessor más la del motor TF-IDF si se usa
+
+    Args:
+        huella (str): NLPProcessor.huella
+        motor (TfidfKeywordEngine): Motor aplicado a los resultados (o None)
+
+    Returns:
+        str: Huella para huella_analizador y el reproceso incremental
+    """
+    if motor is None:
+        return huella
+    return f"{huella}:tfidf-{motor.huella}"
+
+class TfidfKeywordEngine:
+    """Extracción de palabras clave TF-IDF por lotes"""
+
+    def __init__(self, top_n=10, ambito='corpus', min_df=2, max_df=0.9):
+        """
+        Args:
+            top_n (int): Palabras clave por ticket
+            ambito (str): 'corpus' (un modelo) o 'categoria' (un modelo por categoría)
+            min_df (int): Frecuencia documental mínima de un término
+            max_df (float): Proporción documental máxima de un término
+        """
+        self.top_n = top_n
+        self.ambito = ambito
+        self.min_df = min_df
+        self.max_df = max_df
+
+        # clave -> (vectorizer, terminos como np.array)
+        self.modelos = {}
+        self.huella = self._calcular_huella()
+
+    def _nuevo_vectorizer(self, vocabulario=None):
+        # norm=None: el score es tf*idf, así el conteo se recupera dividiendo por idf
+        return TfidfVectorizer(
+            analyzer=analizar_texto,
+            vocabulary=vocabulario,
+            norm=None,
+            min_df=self.min_df,
+            max_df=self.max_df
+        )
+
+    def ajustar(self, textos, categorias=None):
+        """
+        Ajusta los modelos sobre un snapshot del corpus
+
+        Args:
+            textos (list): Textos limpios
+            categorias (list): Categoría de cada texto (requerido si ambito='categoria')
+
+        Returns:
+            TfidfKeywordEngine: self
+        """
+        textos = list(textos)
+        grupos = {CORPUS: textos}
+
+        if self.ambito == 'categoria':
+            if categorias is None:
+                raise ValueError("ambito='categoria' requiere la categoría de cada texto")
+            grupos = {}
+            for texto, categoria in zip(textos, categorias):
+                grupos.setdefault(categoria, []).append(texto)
+
+        for clave, docs in grupos.items():
+            vectorizer = self._nuevo_vectorizer()
+            try:
+                vectorizer.fit(docs)
+            except ValueError as e:
+                # Vocabulario vacío tras min_df/max_df (categoría muy pequeña)
+                logger.warning(f"⚠️  Sin modelo TF-IDF para '{clave}': {str(e)}")
+                continue
+            self.modelos[clave] = (vectorizer, vectorizer.get_feature_names_out())
+            logger.info(f"✅ Modelo TF-IDF '{clave}': {len(docs):,} docs, {len(vectorizer.vocabulary_):,} términos")
+
+        self.huella = self._calcular_huella()
+        return self
+
+    def _calcular_huella(self):
+        """Hash corto de parámetros, vocabulario e IDF de todos los modelos"""
+        h = hashlib.sha1(f"{self.top_n}:{self.ambito}:{self.min_df}:{self.max_df}".encode('utf-8'))
+        for clave, (vectorizer, terminos) in sorted(self.modelos.items()):
+            h.update(f"\0{clave}\0".encode('utf-8'))
+            h.update('\0'.join(terminos.tolist()).encode('utf-8'))
+            h.update(np.ascontiguousarray(vectorizer.idf_, dtype=np.float64).tobytes())
+        return h.hexdigest()[:12]
+
+    def extraer(self, textos, categorias=None):
+        """
+        Calcula las top-N palabras clave de un lote completo
+
+        Los textos se agrupan por modelo y cada grupo se transforma con una
+        sola operación dispersa.
+
+        Args:
+            textos (list): Textos limpios
+            categorias (list): Categoría de cada texto
+
+        Returns:
+            list: Por texto, lista [{palabra, frecuencia, score}] o None si
+                  no hay modelo aplicable
+        """
+        textos = list(textos)
+        salida = [None] * len(textos)
+
+        grupos = {}
+        for i, texto in enumerate(textos):
+            clave = self._clave_modelo(categorias[i] if categorias is not None else None)
+            if clave is not None:
+                grupos.setdefault(clave, []).append(i)
+
+        for clave, indices in grupos.items():
+            vectorizer, terminos = self.modelos[clave]
+            matriz = vectorizer.transform([textos[i] for i in indices]).tocsr()
+            idf = vectorizer.idf_
+
+            for fila, i in enumerate(indices):
+                inicio, fin = matriz.indptr[fila], matriz.indptr[fila + 1]
+                if inicio == fin:
+                    salida[i] = []
+                    continue
+
+                scores = matriz.data[inicio:fin]
+                columnas = matriz.indices[inicio:fin]
+                k = min(self.top_n, fin - inicio)
+
+                seleccion = np.argpartition(-scores, k - 1)[:k]
+                # Orden por score descendente, desempate alfabético
+                seleccion = seleccion[np.lexsort((terminos[columnas[seleccion]], -scores[seleccion]))]
+
+                salida[i] = [
+                    {
+                        'palabra': str(terminos[columnas[j]]),
+                        'frecuencia': int(round(scores[j] / idf[columnas[j]])),
+                        'score': round(float(scores[j]), 4)
+                    }
+                    for j in seleccion
+                ]
+
+        return salida
+
+    def aplicar(self, resultados):
+        """
+        Reemplaza palabras_clave de resultados de NLPProcessor por las TF-IDF
+
+        Los resultados no procesados o sin modelo aplicable conservan sus
+        palabras clave. A todos se les agrega la huella del motor en
+        huella_analizador.
+
+        Args:
+            resultados (list): Resultados de procesar_batch/procesar_stream
+
+        Returns:
+            list: Los mismos resultados, modificados en sitio
+        """
+        procesados = [r for r in resultados if r.get('procesado')]
+        palabras = self.extraer(
+            [r['texto_limpio'] for r in procesados],
+            [r.get('categoria') for r in procesados]
+        )
+        for resultado, palabras_clave in zip(procesados, palabras):
+            if palabras_clave is not None:
+                resultado['palabras_clave'] = palabras_clave
+        for resultado in resultados:
+            if resultado.get('huella_analizador'):
+                resultado['huella_analizador'] = huella_analizador(resultado['huella_analizador'], self)
+        return resultados
+
+    def _clave_modelo(self, categoria):
+        """Modelo de la categoría, o el global como respaldo"""
+        if categoria in self.modelos:
+            return categoria
+        if CORPUS in self.modelos:
+            return CORPUS
+        return None
+
+    def guardar(self, directorio):
+        """
+        Persiste vocabulario e IDF de cada modelo (npz comprimido + manifiesto)
+
+        Args:
+            directorio (str): Carpeta destino
+        """
+        directorio = Path(directorio)
+        directorio.mkdir(parents=True, exist_ok=True)
+
+        archivos = {}
+        for n, (clave, (vectorizer, terminos)) in enumerate(sorted(self.modelos.items())):
+            archivo = f"modelo_{n}.npz"
+            np.savez_compressed(directorio / archivo, terminos=terminos.astype(str), idf=vectorizer.idf_)
+            archivos[clave] = archivo
+
+        manifiesto = {
+            'top_n': self.top_n,
+            'ambito': self.ambito,
+            'min_df': self.min_df,
+            'max_df': self.max_df,
+            'modelos': archivos
+        }
+        with open(directorio / 'manifiesto.json', 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"💾 {len(archivos)} modelos TF-IDF guardados en {directorio}")
+
+    @classmethod
+    def cargar(cls, directorio):
+        """
+        Carga modelos guardados listos para transform
+
+        Returns:
+            TfidfKeywordEngine: Motor cargado, o None si no hay modelos
+        """
+        directorio = Path(directorio)
+        ruta_manifiesto = directorio / 'manifiesto.json'
+        if not ruta_manifiesto.exists():
+            return None
+
+        with open(ruta_manifiesto, encoding='utf-8') as f:
+            manifiesto = json.load(f)
+
+        motor = cls(
+            top_n=manifiesto['top_n'],
+            ambito=manifiesto['ambito'],
+            min_df=manifiesto['min_df'],
+            max_df=manifiesto['max_df']
+        )
+        for clave, archivo in manifiesto['modelos'].items():
+            with np.load(directorio / archivo, allow_pickle=False) as datos:
+                terminos = datos['terminos']
+                vectorizer = motor._nuevo_vectorizer({t: i for i, t in enumerate(terminos.tolist())})
+                vectorizer.idf_ = datos['idf']
+            motor.modelos[clave] = (vectorizer, terminos)
+        motor.huella = motor._calcular_huella()
+
+        logger.info(f"✅ {len(motor.modelos)} modelos TF-IDF cargados desde {directorio}")
+        return motor
+
+    @classmethod
+    def desde_config(cls):
+        """Carga los modelos del directorio configurado (None si no existen)"""
+        return cls.cargar(get_config().TFIDF_MODELO_DIR)
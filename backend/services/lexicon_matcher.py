@@ -0,0 +1,140 @@
+"""
+Matcher de léxicos compilado (Aho-Corasick sobre palabras)
+
+Compila todos los léxicos (urgencia, sentimiento, vocabulario técnico) en
+un único autómata que recorre cada texto una sola vez y encuentra tanto
+palabras sueltas como frases de varias palabras ('no funciona').
+Los léxicos se cargan desde un archivo JSON versionado.
+"""
+import hashlib
+import json
+import logging
+import re
+from collections import deque
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+_RE_PALABRA = re.compile(r'\w+')
+
+# Plegado de acentos para comparar 'crítico' con 'critico'
+_PLEGADO = str.maketrans('áéíóúüñàèìòù', 'aeiouunaeiou')
+
+def plegar(texto):
+    """Minúsculas sin acentos, usado tanto en léxicos como en textos"""
+    return texto.lower().translate(_PLEGADO)
+
+class LexiconMatcher:
+    """Autómata Aho-Corasick cuyo alfabeto son palabras"""
+
+    def __init__(self, lexicones, version='0'):
+        """
+        Args:
+            lexicones (dict): {nombre_lexicon: [entradas]}
+            version (str): Versión del archivo de léxicos
+        """
+        self.version = str(version)
+        self.lexicones = {nombre: list(entradas) for nombre, entradas in lexicones.items()}
+        
+        # Huella del contenido: cambia con cualquier edición aunque no se suba la versión
+        contenido = json.dumps(self.lexicones, sort_keys=True, ensure_ascii=False)
+        self.huella = hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:10]
+
+        # Estado 0 = raíz. transiciones[estado] = {palabra: estado}
+        self._transiciones = [{}]
+        self._fallo = [0]
+        # salidas[estado] = [(lexicon, entrada, num_palabras)]
+        self._salidas = [[]]
+
+        for nombre, entradas in self.lexicones.items():
+            for entrada in entradas:
+                self._agregar(nombre, entrada)
+        self._construir_fallos()
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Carga los léxicos desde un JSON {version, lexicones: {...}}"""
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        matcher = cls(datos['lexicones'], version=datos.get('version', '0'))
+        logger.info(f"📚 Léxicos v{matcher.version} cargados desde {ruta}")
+        return matcher
+
+    def _agregar(self, nombre, entrada):
+        palabras = _RE_PALABRA.findall(plegar(entrada))
+        if not palabras:
+            return
+        estado = 0
+        for palabra in palabras:
+            siguiente = self._transiciones[estado].get(palabra)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+                self._transiciones[estado][palabra] = siguiente
+            estado = siguiente
+        self._salidas[estado].append((nombre, entrada, len(palabras)))
+
+    def _construir_fallos(self):
+        """Enlaces de fallo por BFS; cada estado hereda las salidas de su sufijo"""
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for palabra, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                fallo = self._fallo[estado]
+                while fallo and palabra not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                destino = self._transiciones[fallo].get(palabra, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallo[siguiente]]
+
+    def buscar(self, texto):
+        """
+        Recorre el texto una vez y devuelve las entradas encontradas por léxico
+
+        Una coincidencia contenida dentro de otra más larga se descarta, de
+        modo que 'no funciona' cuenta como negativo y no también como
+        'funciona' positivo.
+
+        Args:
+            texto (str): Texto a analizar
+
+        Returns:
+            dict: {nombre_lexicon: [entradas distintas en orden de aparición]}
+        """
+        coincidencias = []
+        estado = 0
+        for posicion, palabra in enumerate(_RE_PALABRA.findall(plegar(texto or ''))):
+            while estado and palabra not in self._transiciones[estado]:
+                estado = self._fallo[estado]
+            estado = self._transiciones[estado].get(palabra, 0)
+            for nombre, entrada, longitud in self._salidas[estado]:
+                coincidencias.append((posicion - longitud + 1, posicion, nombre, entrada))
+
+        resultado = {nombre: [] for nombre in self.lexicones}
+        if not coincidencias:
+            return resultado
+
+        # Descartar coincidencias cubiertas por otra más larga
+        tramos = {(inicio, fin) for inicio, fin, _, _ in coincidencias}
+        for inicio, fin, nombre, entrada in coincidencias:
+            cubierta = any(
+                i <= inicio and fin <= f and (f - i) > (fin - inicio)
+                for i, f in tramos
+            )
+            if not cubierta and entrada not in resultado[nombre]:
+                resultado[nombre].append(entrada)
+        return resultado
+
+
+# Instancia única por proceso
+_matcher = None
+
+def get_lexicon_matcher():
+    """Obtiene el matcher del proceso, compilándolo la primera vez"""
+    global _matcher
+    if _matcher is None:
+        _matcher = LexiconMatcher.desde_archivo(get_config().LEXICONES_PATH)
+    return _matcher
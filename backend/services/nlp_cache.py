@@ -0,0 +1,151 @@
+"""
+Cache de resultados NLP direccionado por contenido
+
+La clave es un hash del texto limpio más la huella del analizador (versión
+y modelo), de modo que tickets con la misma redacción comparten un único
+parse de spaCy. Tiene dos niveles:
+- Memoria: LRU por proceso, acotado por tamaño en bytes
+- Persistente (opcional): archivo SQLite local compartido entre procesos
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from collections import OrderedDict
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+class NLPCache:
+    """Cache LRU en memoria con nivel persistente opcional en SQLite"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ruta_sqlite=None):
+        """
+        Args:
+            max_bytes (int): Tamaño máximo del nivel en memoria
+            ruta_sqlite (str): Archivo SQLite del nivel persistente (None = desactivado)
+        """
+        self.max_bytes = max_bytes
+        self.ruta_sqlite = ruta_sqlite
+
+        self._memoria = OrderedDict()
+        self._bytes = 0
+        self._conexion = None
+        self._pid_conexion = None
+
+        # Contadores
+        self.hits_memoria = 0
+        self.hits_persistente = 0
+        self.misses = 0
+        self.evicciones = 0
+
+    @classmethod
+    def desde_config(cls):
+        """Crea el cache según la configuración (None si está desactivado)"""
+        config = get_config()
+        if not config.NLP_CACHE_ACTIVO:
+            return None
+        return cls(
+            max_bytes=config.NLP_CACHE_MAX_MB * 1024 * 1024,
+            ruta_sqlite=config.NLP_CACHE_SQLITE or None
+        )
+
+    @staticmethod
+    def clave(texto_limpio, huella):
+        """Clave de cache para un texto limpio y una huella de analizador"""
+        return hashlib.sha1(f"{huella}\0{texto_limpio}".encode('utf-8')).hexdigest()
+
+    def obtener(self, clave):
+        """
+        Busca un análisis en memoria y luego en SQLite
+
+        Returns:
+            dict: Copia del análisis guardado, o None si no existe
+        """
+        valor = self._memoria.get(clave)
+        if valor is not None:
+            self._memoria.move_to_end(clave)
+            self.hits_memoria += 1
+            return json.loads(valor)
+
+        if self.ruta_sqlite:
+            fila = self._sqlite().execute(
+                "SELECT valor FROM nlp_cache WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is not None:
+                self.hits_persistente += 1
+                self._guardar_memoria(clave, fila[0])
+                return json.loads(fila[0])
+
+        self.misses += 1
+        return None
+
+    def guardar(self, clave, analisis):
+        """Guarda un análisis en ambos niveles"""
+        self.guardar_muchos([(clave, analisis)])
+
+    def guardar_muchos(self, items):
+        """
+        Guarda varios análisis con una sola transacción SQLite
+
+        Args:
+            items (list): Tuplas (clave, analisis)
+        """
+        serializados = [(clave, json.dumps(analisis, ensure_ascii=False)) for clave, analisis in items]
+
+        for clave, valor in serializados:
+            self._guardar_memoria(clave, valor)
+
+        if self.ruta_sqlite and serializados:
+            conexion = self._sqlite()
+            conexion.executemany(
+                "INSERT OR REPLACE INTO nlp_cache (clave, valor) VALUES (?, ?)", serializados
+            )
+            conexion.commit()
+
+    def stats(self):
+        """Contadores de uso del cache"""
+        hits = self.hits_memoria + self.hits_persistente
+        consultas = hits + self.misses
+        return {
+            'hits': hits,
+            'hits_memoria': self.hits_memoria,
+            'hits_persistente': self.hits_persistente,
+            'misses': self.misses,
+            'hit_rate': round(hits / consultas, 4) if consultas else 0.0,
+            'entradas_memoria': len(self._memoria),
+            'bytes_memoria': self._bytes,
+            'evicciones': self.evicciones
+        }
+
+    def limpiar(self):
+        """Vacía el nivel en memoria"""
+        self._memoria.clear()
+        self._bytes = 0
+
+    def _guardar_memoria(self, clave, valor):
+        """Inserta en el LRU y expulsa las entradas más antiguas si se excede el tamaño"""
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= len(anterior)
+
+        self._memoria[clave] = valor
+        self._bytes += len(valor)
+
+        while self._bytes > self.max_bytes and self._memoria:
+            _, expulsado = self._memoria.popitem(last=False)
+            self._bytes -= len(expulsado)
+            self.evicciones += 1
+
+    def _sqlite(self):
+        """Conexión SQLite del proceso actual (no se comparte tras un fork)"""
+        if self._conexion is None or self._pid_conexion != os.getpid():
+            self._conexion = sqlite3.connect(self.ruta_sqlite, timeout=30)
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_cache (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)"
+            )
+            self._pid_conexion = os.getpid()
+            logger.info(f"💾 Cache NLP persistente: {self.ruta_sqlite}")
+        return self._conexion
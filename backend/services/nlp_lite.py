@@ -0,0 +1,209 @@
+"""
+Motor NLP "lite" sin spaCy
+
+Reemplaza el parse de spaCy por un tokenizador regex y una tabla de
+lemas/stopwords precalculada una sola vez con es_core_news_sm. Produce
+objetos con la misma interfaz mínima que un Doc de spaCy (tokens con
+text, lemma_, is_stop, is_punct y ents vacío), de modo que NLPProcessor
+los analiza con exactamente el mismo código y esquema de salida.
+"""
+import gzip
+import json
+import logging
+import re
+from collections import Counter, defaultdict
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Palabras o signos sueltos, como separa spaCy la puntuación básica
+_RE_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+VERSION_TABLA = '1'
+
+class LiteToken:
+    """Token mínimo compatible con el uso que hace NLPProcessor de spaCy"""
+    __slots__ = ('text', 'lemma_', 'is_stop', 'is_punct')
+
+    def __init__(self, text, lemma_, is_stop, is_punct):
+        self.text = text
+        self.lemma_ = lemma_
+        self.is_stop = is_stop
+        self.is_punct = is_punct
+
+class LiteDoc:
+    """Secuencia de LiteToken sin entidades nombradas"""
+    __slots__ = ('tokens',)
+
+    ents = ()
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+class LiteNLP:
+    """Sustituto de spacy.Language con __call__ y pipe"""
+
+    def __init__(self, lemas=None, stopwords=None, version='sin-tabla', modelo=None):
+        """
+        Args:
+            lemas (dict): {forma: lema}, solo formas cuyo lema difiere
+            stopwords (set): Stopwords del modelo de spaCy
+            version (str): Versión de la tabla
+            modelo (str): Modelo de spaCy con el que se construyó la tabla
+        """
+        self.lemas = lemas or {}
+        self.stopwords = frozenset(stopwords or ())
+        self.version = version
+        self.modelo = modelo
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Carga una tabla serializada por guardar_tabla"""
+        with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+            datos = json.load(f)
+        lite = cls(
+            lemas=datos['lemas'],
+            stopwords=datos['stopwords'],
+            version=f"{datos['version']}:{datos['huella']}",
+            modelo=datos['modelo']
+        )
+        logger.info(f"⚡ Tabla lite cargada: {len(lite.lemas):,} lemas, {len(lite.stopwords):,} stopwords ({ruta})")
+        return lite
+
+    @classmethod
+    def desde_config(cls):
+        """
+        Carga la tabla configurada
+
+        Sin tabla, usa formas sin lematizar y las stopwords en español de
+        spaCy (spacy.lang.es, no requiere descargar el modelo) para que las
+        palabras clave no se llenen de artículos y preposiciones.
+        """
+        ruta = get_config().NLP_LITE_TABLA
+        try:
+            return cls.desde_archivo(ruta)
+        except FileNotFoundError:
+            logger.warning(f"⚠️  Tabla lite no encontrada en {ruta}: sin lematización")
+            logger.info("💡 Constrúyela con: python backend/scripts/nlp_lite.py construir")
+            return cls.sin_tabla()
+
+    @classmethod
+    def sin_tabla(cls):
+        """Motor sin lemas con las stopwords de spacy.lang.es, si spaCy está instalado"""
+        try:
+            import spacy
+            from spacy.lang.es.stop_words import STOP_WORDS
+        except ImportError:
+            logger.warning("⚠️  spaCy no está instalado: motor lite sin stopwords")
+            return cls()
+        return cls(stopwords=STOP_WORDS, version=f"sin-tabla:stopwords-spacy-{spacy.__version__}")
+
+    def __call__(self, texto):
+        lemas = self.lemas
+        stopwords = self.stopwords
+        tokens = []
+        for forma in _RE_TOKEN.findall(texto):
+            minuscula = forma.lower()
+            tokens.append(LiteToken(
+                forma,
+                lemas.get(minuscula, minuscula),
+                minuscula in stopwords,
+                not (forma[0].isalnum() or forma[0] == '_')
+            ))
+        return LiteDoc(tokens)
+
+    def pipe(self, textos, batch_size=None, n_process=None):
+        """Misma firma que nlp.pipe; el motor lite no necesita lotes ni procesos"""
+        for texto in textos:
+            yield self(texto)
+
+def construir_tabla(nlp, textos, batch_size=256):
+    """
+    Construye la tabla de lemas corriendo spaCy una sola vez sobre un corpus
+
+    Para cada forma se guarda su lema más frecuente en el corpus (el
+    lematizador de es_core_news_sm depende del POS). Solo se guardan las
+    formas cuyo lema difiere de la forma, para mantener la tabla compacta.
+
+    Args:
+        nlp: Modelo de spaCy cargado
+        textos (iterable): Textos limpios
+        batch_size (int): Lote de nlp.pipe
+
+    Returns:
+        dict: Tabla lista para guardar_tabla
+    """
+    conteos = defaultdict(Counter)
+    total_docs = 0
+    for doc in nlp.pipe(textos, batch_size=batch_size):
+        total_docs += 1
+        for token in doc:
+            if token.is_punct or token.is_space:
+                continue
+            conteos[token.text.lower()][token.lemma_] += 1
+
+    lemas = {}
+    for forma, contador in conteos.items():
+        lema = contador.most_common(1)[0][0]
+        if lema != forma:
+            lemas[forma] = lema
+
+    logger.info(f"📚 Tabla construida con {total_docs:,} docs: {len(conteos):,} formas, {len(lemas):,} lemas distintos de la forma")
+
+    modelo = f"{nlp.meta.get('lang', '')}_{nlp.meta.get('name', '')}"
+    return {
+        'version': VERSION_TABLA,
+        'modelo': modelo,
+        'huella': f"{modelo}-{nlp.meta.get('version', '')}",
+        'stopwords': sorted(nlp.Defaults.stop_words),
+        'lemas': lemas
+    }
+
+def guardar_tabla(tabla, ruta):
+    """Serializa la tabla como JSON comprimido con gzip"""
+    with gzip.open(ruta, 'wt', encoding='utf-8') as f:
+        json.dump(tabla, f, ensure_ascii=False, separators=(',', ':'))
+    logger.info(f"💾 Tabla lite guardada en {ruta}")
+
+def reporte_concordancia(resultados_spacy, resultados_lite):
+    """
+    Compara resultados del motor spaCy y del lite para los mismos tickets
+
+    Args:
+        resultados_spacy (list): Resultados de NLPProcessor en modo spacy
+        resultados_lite (list): Resultados de NLPProcessor en modo lite
+
+    Returns:
+        dict: Tasas de acuerdo por campo y similitud de palabras clave
+    """
+    pares = [
+        (s, l) for s, l in zip(resultados_spacy, resultados_lite)
+        if s.get('procesado') and l.get('procesado')
+    ]
+    if not pares:
+        return {'tickets': 0}
+
+    def tasa(condicion):
+        return round(sum(1 for s, l in pares if condicion(s, l)) / len(pares), 4)
+
+    def jaccard(s, l):
+        a = {p['palabra'] for p in s['palabras_clave']}
+        b = {p['palabra'] for p in l['palabras_clave']}
+        return len(a & b) / len(a | b) if a | b else 1.0
+
+    return {
+        'tickets': len(pares),
+        'urgencia_nivel': tasa(lambda s, l: s['urgencia']['nivel'] == l['urgencia']['nivel']),
+        'sentimiento_tipo': tasa(lambda s, l: s['sentimiento']['tipo'] == l['sentimiento']['tipo']),
+        'complejidad': tasa(lambda s, l: s['complejidad'] == l['complejidad']),
+        'num_tokens': tasa(lambda s, l: s['num_tokens'] == l['num_tokens']),
+        'vocab_tecnico_score': tasa(lambda s, l: s['vocab_tecnico_score'] == l['vocab_tecnico_score']),
+        'palabras_clave_jaccard': round(sum(jaccard(s, l) for s, l in pares) / len(pares), 4),
+        'palabras_clave_identicas': tasa(lambda s, l: s['palabras_clave'] == l['palabras_clave'])
+    }
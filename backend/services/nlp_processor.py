@@ -1,27 +1,78 @@
 """
-Procesador NLP principal usando spaCy y scikit-learn
+Procesador NLP principal usando spaCy (o el motor lite sin spaCy)
 """
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from collections import Counter
+try:
+    import spacy
+except ImportError:  # Solo disponible el modo lite
+    spacy = None
+from collections import Counter, OrderedDict
+import copy
+from datetime import datetime
+from itertools import islice
 import logging
-from services.text_cleaner import (
-    limpiar_texto, 
-    extraer_entidades_basicas,
-    calcular_estadisticas_texto,
-    es_texto_valido
-)
+import os
+import sys
+import time
+from services.text_cleaner import normalizar_ticket
+from services.nlp_cache import NLPCache
+from services.lexicon_matcher import get_lexicon_matcher
+from services.nlp_lite import LiteNLP
+from services.tiempos_etapas import Cronometro, SIN_CRONOMETRO
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Versión de las reglas del analizador (léxicos, scoring). Cambiarla invalida el cache
+VERSION_ANALIZADOR = '2.1'
+
 class NLPProcessor:
     """Procesador de texto con spaCy para análisis de tickets"""
     
-    def __init__(self):
-        """Inicializa el modelo de spaCy"""
+    def __init__(self, modo=None):
+        """
+        Inicializa el modelo de spaCy o el motor lite
+        
+        Args:
+            modo (str): 'spacy' o 'lite' (default: config.NLP_MODO)
+        """
         config = get_config()
+        self.modo = modo or config.NLP_MODO
+        
+        if self.modo == 'lite' or spacy is None:
+            self._iniciar_lite()
+        else:
+            self._cargar_spacy(config)
+        
+        # Léxicos de urgencia, sentimiento y vocabulario técnico (un solo autómata)
+        self.matcher = get_lexicon_matcher()
+        self.palabras_urgentes = set(self.matcher.lexicones['urgencia'])
+        
+        # Huella de versión + léxicos + modelo: se guarda en cada análisis
+        # (reproceso incremental; TfidfKeywordEngine.aplicar le agrega la
+        # del modelo TF-IDF) y forma parte de la clave del cache
+        if self.modo == 'lite':
+            modelo = f"lite-{self.nlp.version}"
+        elif self.nlp is not None:
+            modelo = f"{config.SPACY_MODEL}-{self.nlp.meta.get('version', '')}"
+        else:
+            modelo = 'sin-spacy'
+        self.huella = f"{VERSION_ANALIZADOR}:{self.matcher.version}-{self.matcher.huella}:{modelo}"
+        
+        # Cache de resultados por texto limpio
+        self.cache = NLPCache.desde_config()
+        self.parses_ahorrados = 0
         
+        # Tiempos por etapa en cada resultado ('tiempos_etapas'), salvo que la llamada indique otra cosa
+        self.tiempos_etapas = config.NLP_TIEMPOS_ETAPAS
+    
+    def _iniciar_lite(self):
+        """Usa el motor lite (tokenizador regex + tabla de lemas)"""
+        self.modo = 'lite'
+        self.nlp = LiteNLP.desde_config()
+        logger.info("⚡ NLPProcessor en modo lite (sin spaCy)")
+    
+    def _cargar_spacy(self, config):
+        """Carga el modelo de spaCy, con el motor lite como respaldo"""
         try:
             self.nlp = spacy.load(config.SPACY_MODEL)
             logger.info(f"✅ Modelo spaCy cargado: {config.SPACY_MODEL}")
@@ -46,18 +97,10 @@ class NLPProcessor:
                     raise
             except Exception as e:
                 logger.error(f"❌ No se pudo descargar el modelo: {str(e)}")
-                logger.info("💡 Continuando con procesamiento básico sin spaCy...")
-                self.nlp = None
-        
-        # Palabras clave de urgencia
-        self.palabras_urgentes = {
-            'urgente', 'inmediato', 'critico', 'emergencia', 'grave',
-            'bloqueado', 'bloqueante', 'produccion', 'caido', 'error',
-            'falla', 'problema', 'roto', 'no funciona', 'perdida',
-            'importante', 'prioridad', 'rapido', 'asap', 'ya'
-        }
+                logger.info("💡 Continuando con el motor lite sin spaCy...")
+                self._iniciar_lite()
     
-    def procesar_ticket(self, ticket_id, descripcion, categoria=None):
+    def procesar_ticket(self, ticket_id, descripcion, categoria=None, tiempos=None):
         """
         Procesa un ticket completo con NLP
         
@@ -65,45 +108,127 @@ class NLPProcessor:
             ticket_id (int): ID del ticket
             descripcion (str): Descripción del ticket
             categoria (str): Categoría del ticket
+            tiempos (bool): Agregar 'tiempos_etapas' {etapa: ms} al resultado
+                (default: config.NLP_TIEMPOS_ETAPAS)
             
         Returns:
             dict: Resultados del análisis NLP
         """
         logger.info(f"🔄 Procesando ticket #{ticket_id}")
         
-        # Validar texto
-        if not es_texto_valido(descripcion):
+        medir = self.tiempos_etapas if tiempos is None else tiempos
+        crono = Cronometro() if medir else SIN_CRONOMETRO
+        
+        preparado = self._preparar_ticket(ticket_id, descripcion, categoria, crono)
+        if not preparado.get('valido'):
+            resultado = preparado['resultado']
+            if medir:
+                resultado['tiempos_etapas'] = crono.resultado()
+            return resultado
+        
+        clave = NLPCache.clave(preparado['texto_limpio'], self.huella)
+        analisis = self.cache.obtener(clave) if self.cache is not None else None
+        
+        if analisis is None:
+            # Procesar con spaCy (si está disponible)
+            crono.reiniciar()
+            doc = self.nlp(preparado['texto_limpio']) if self.nlp is not None else None
+            crono.marcar('parse')
+            analisis = self._analizar_texto(preparado['texto_limpio'], preparado['estadisticas'], doc, crono)
+            if self.cache is not None:
+                self.cache.guardar(clave, analisis)
+        else:
+            self.parses_ahorrados += 1
+        
+        resultado = self._armar_resultado(preparado, analisis)
+        if medir:
+            resultado['tiempos_etapas'] = crono.resultado()
+        
+        logger.info(f"✅ Ticket #{ticket_id} procesado - Urgencia: {resultado['urgencia']['nivel']}, Complejidad: {resultado['complejidad']}")
+        return resultado
+    
+    def _preparar_ticket(self, ticket_id, descripcion, categoria=None, crono=SIN_CRONOMETRO):
+        """
+        Etapa previa a spaCy: validación, limpieza, entidades y estadísticas
+        
+        Aquí se toma fecha_analisis: la marca de inicio decide qué análisis
+        es más reciente al guardar, así que un worker lento o un reintento
+        que termina después no pisa un análisis que empezó más tarde.
+        
+        Args:
+            crono (Cronometro): Marca limpieza, validacion, entidades y complejidad
+        
+        Returns:
+            dict: {'valido': bool, 'fecha_analisis', ...}. Si no es válido
+                  incluye 'resultado' con el resultado vacío ya construido.
+        """
+        fecha_analisis = datetime.utcnow()
+        
+        # Validar, limpiar, extraer entidades y estadísticas en una sola llamada
+        normalizado = normalizar_ticket(descripcion, crono=crono)
+        
+        if not normalizado['valido']:
             logger.warning(f"⚠️  Ticket #{ticket_id}: texto inválido o muy corto")
-            return self._resultado_vacio(ticket_id, "Texto inválido")
+            return {
+                'valido': False,
+                'fecha_analisis': fecha_analisis,
+                'resultado': self._resultado_vacio(ticket_id, "Texto inválido", fecha_analisis)
+            }
         
-        # Texto original para extracción de entidades
-        entidades_basicas = extraer_entidades_basicas(descripcion)
+        texto_limpio = normalizado['texto_limpio']
+        entidades_basicas = normalizado['entidades']
+        estadisticas = normalizado['estadisticas']
         
-        # Limpiar texto
-        texto_limpio = limpiar_texto(descripcion)
+        return {
+            'valido': True,
+            'fecha_analisis': fecha_analisis,
+            'ticket_id': ticket_id,
+            'categoria': categoria,
+            'texto_limpio': texto_limpio,
+            'entidades_basicas': entidades_basicas,
+            'estadisticas': estadisticas
+        }
+    
+    def _analizar_texto(self, texto_limpio, estadisticas, doc, crono=SIN_CRONOMETRO):
+        """
+        Etapa posterior a spaCy: tokens, NER, sentimiento, complejidad,
+        palabras clave, urgencia y vocabulario técnico
         
-        # Estadísticas básicas
-        estadisticas = calcular_estadisticas_texto(texto_limpio)
+        Solo depende del texto limpio, por lo que el resultado es cacheable.
         
-        # Procesar con spaCy (si está disponible)
-        if self.nlp is not None:
-            doc = self.nlp(texto_limpio)
+        Args:
+            texto_limpio (str): Texto normalizado
+            estadisticas (dict): Estadísticas del texto limpio
+            doc: Doc de spaCy, o None si se procesa sin spaCy
+            crono (Cronometro): Marca el tiempo de cada etapa
             
+        Returns:
+            dict: Campos del análisis que dependen del texto
+        """
+        # Una sola pasada del matcher para los tres léxicos
+        hits = self.matcher.buscar(texto_limpio)
+        crono.marcar('lexicones')
+        
+        if doc is not None:
             # Extraer tokens útiles (lematización + stopwords)
             tokens = [
                 token.lemma_ 
                 for token in doc 
                 if not token.is_stop and not token.is_punct and len(token.text) > 2
             ]
+            crono.marcar('parse')
             
             # Entidades nombradas (NER)
             entidades_ner = self._extraer_entidades_ner(doc)
+            crono.marcar('entidades')
             
             # Análisis de sentimiento básico
-            sentimiento = self._analizar_sentimiento_basico(doc, texto_limpio)
+            sentimiento = self._analizar_sentimiento_basico(doc, texto_limpio, hits)
+            crono.marcar('sentimiento')
             
             # Complejidad lingüística
             complejidad = self._calcular_complejidad(doc, estadisticas)
+            crono.marcar('complejidad')
         else:
             # Procesamiento básico sin spaCy
             logger.warning("⚠️  Procesando sin spaCy - funcionalidad limitada")
@@ -112,37 +237,55 @@ class NLPProcessor:
                 for palabra in texto_limpio.split() 
                 if len(palabra) > 2
             ]
+            crono.marcar('parse')
             entidades_ner = {}
-            sentimiento = self._analizar_sentimiento_basico(None, texto_limpio)
+            sentimiento = self._analizar_sentimiento_basico(None, texto_limpio, hits)
+            crono.marcar('sentimiento')
             complejidad = self._calcular_complejidad_basica(estadisticas)
+            crono.marcar('complejidad')
         
         # Palabras clave (TF-IDF simulado con frecuencia)
         palabras_clave = self._extraer_palabras_clave(tokens, top_n=10)
+        crono.marcar('palabras_clave')
         
         # Clasificación de urgencia
-        urgencia = self._clasificar_urgencia(texto_limpio, tokens)
+        urgencia = self._clasificar_urgencia(texto_limpio, tokens, hits)
+        crono.marcar('urgencia')
         
         # Vocabulario técnico
-        vocab_tecnico = self._detectar_vocabulario_tecnico(tokens)
+        vocab_tecnico = self._detectar_vocabulario_tecnico(tokens, hits)
+        crono.marcar('lexicones')
         
-        resultado = {
-            'ticket_id': ticket_id,
-            'procesado': True,
-            'texto_limpio': texto_limpio,
-            'estadisticas': estadisticas,
+        return {
             'palabras_clave': palabras_clave,
-            'entidades_basicas': entidades_basicas,
             'entidades_ner': entidades_ner,
             'sentimiento': sentimiento,
             'complejidad': complejidad,
             'urgencia': urgencia,
             'vocab_tecnico_score': vocab_tecnico,
-            'num_tokens': len(tokens),
-            'categoria': categoria
+            'num_tokens': len(tokens)
+        }
+    
+    def _armar_resultado(self, preparado, analisis):
+        """Combina los datos propios del ticket con el análisis del texto"""
+        return {
+            'ticket_id': preparado['ticket_id'],
+            'procesado': True,
+            'texto_limpio': preparado['texto_limpio'],
+            'estadisticas': preparado['estadisticas'],
+            'palabras_clave': analisis['palabras_clave'],
+            'entidades_basicas': preparado['entidades_basicas'],
+            'entidades_ner': analisis['entidades_ner'],
+            'sentimiento': analisis['sentimiento'],
+            'complejidad': analisis['complejidad'],
+            'urgencia': analisis['urgencia'],
+            'vocab_tecnico_score': analisis['vocab_tecnico_score'],
+            'num_tokens': analisis['num_tokens'],
+            'categoria': preparado['categoria'],
+            'fecha_analisis': preparado['fecha_analisis'],
+            'version_analizador': VERSION_ANALIZADOR,
+            'huella_analizador': self.huella
         }
-        
-        logger.info(f"✅ Ticket #{ticket_id} procesado - Urgencia: {urgencia['nivel']}, Complejidad: {complejidad}")
-        return resultado
     
     def _extraer_palabras_clave(self, tokens, top_n=10):
         """Extrae palabras clave más frecuentes"""
@@ -185,24 +328,13 @@ class NLPProcessor:
         
         return entidades
     
-    def _analizar_sentimiento_basico(self, doc, texto):
-        """Análisis de sentimiento básico por palabras clave"""
-        palabras_negativas = {
-            'mal', 'malo', 'peor', 'problema', 'error', 'falla', 'no funciona',
-            'decepcionado', 'molesto', 'frustrado', 'terrible', 'horrible',
-            'defectuoso', 'roto', 'dañado', 'incorrecto', 'insatisfecho'
-        }
-        
-        palabras_positivas = {
-            'bien', 'bueno', 'mejor', 'excelente', 'perfecto', 'funciona',
-            'satisfecho', 'contento', 'feliz', 'gracias', 'genial',
-            'rápido', 'eficiente', 'correcto'
-        }
+    def _analizar_sentimiento_basico(self, doc, texto, hits=None):
+        """Análisis de sentimiento básico por palabras y frases clave"""
+        if hits is None:
+            hits = self.matcher.buscar(texto)
         
-        tokens_texto = set(texto.lower().split())
-        
-        score_negativo = len(palabras_negativas.intersection(tokens_texto))
-        score_positivo = len(palabras_positivas.intersection(tokens_texto))
+        score_negativo = len(hits['negativo'])
+        score_positivo = len(hits['positivo'])
         
         if score_negativo > score_positivo:
             return {'tipo': 'negativo', 'score': -score_negativo, 'confianza': 0.6}
@@ -242,10 +374,11 @@ class NLPProcessor:
         
         return round(score, 2)
     
-    def _clasificar_urgencia(self, texto, tokens):
+    def _clasificar_urgencia(self, texto, tokens, hits=None):
         """Clasifica urgencia del ticket"""
-        tokens_set = set(tokens)
-        palabras_urgencia_encontradas = self.palabras_urgentes.intersection(tokens_set)
+        if hits is None:
+            hits = self.matcher.buscar(texto)
+        palabras_urgencia_encontradas = hits['urgencia']
         
         num_urgentes = len(palabras_urgencia_encontradas)
         
@@ -261,21 +394,15 @@ class NLPProcessor:
         return {
             'nivel': nivel,
             'score': num_urgentes,
-            'palabras_encontradas': list(palabras_urgencia_encontradas)
+            'palabras_encontradas': palabras_urgencia_encontradas
         }
     
-    def _detectar_vocabulario_tecnico(self, tokens):
+    def _detectar_vocabulario_tecnico(self, tokens, hits=None):
         """Detecta presencia de vocabulario técnico"""
-        palabras_tecnicas = {
-            'api', 'servidor', 'database', 'sql', 'error', 'codigo',
-            'version', 'actualizacion', 'configuracion', 'sistema',
-            'hardware', 'software', 'driver', 'firmware', 'backup',
-            'red', 'conexion', 'wifi', 'ethernet', 'protocolo',
-            'gpu', 'cpu', 'ram', 'disco', 'memoria', 'procesador'
-        }
-        
+        if hits is None:
+            hits = self.matcher.buscar(' '.join(tokens))
+        palabras_tecnicas_encontradas = hits['tecnico']
         tokens_set = set(tokens)
-        palabras_tecnicas_encontradas = palabras_tecnicas.intersection(tokens_set)
         
         # Score 0-100 basado en porcentaje de palabras técnicas
         if not tokens:
@@ -284,10 +411,11 @@ class NLPProcessor:
         score = (len(palabras_tecnicas_encontradas) / len(tokens_set)) * 100
         return round(min(score, 100), 2)
     
-    def _resultado_vacio(self, ticket_id, razon):
+    def _resultado_vacio(self, ticket_id, razon, fecha_analisis=None):
         """Retorna resultado vacío cuando el procesamiento falla"""
         return {
             'ticket_id': ticket_id,
+            'fecha_analisis': fecha_analisis or datetime.utcnow(),
             'procesado': False,
             'error': razon,
             'palabras_clave': [],
@@ -296,33 +424,221 @@ class NLPProcessor:
             'sentimiento': {'tipo': 'neutral', 'score': 0},
             'complejidad': 0,
             'urgencia': {'nivel': 'baja', 'score': 0},
-            'vocab_tecnico_score': 0
+            'vocab_tecnico_score': 0,
+            'version_analizador': VERSION_ANALIZADOR,
+            'huella_analizador': self.huella
         }
     
-    def procesar_batch(self, tickets):
+    def procesar_stream(self, tickets, batch_size=None, n_process=None, chunk_size=None, tiempos=None):
         """
-        Procesa múltiples tickets en batch
+        Procesa un iterable de tickets con nlp.pipe y entrega resultados
+        de forma perezosa, en el mismo orden de entrada
+        
+        Los tickets se consumen por bloques de ``chunk_size``: cada bloque se
+        prepara, se parsea con una sola llamada a ``nlp.pipe`` y se completa.
+        Si el pipe falla para un bloque, ese bloque se reprocesa ticket por
+        ticket para aislar el error. Los dicts producidos son idénticos a los
+        de procesar_ticket.
         
         Args:
-            tickets (list): Lista de diccionarios con ticket_id, descripcion, categoria
+            tickets (iterable): Diccionarios con id, descripcion y categoria
+            batch_size (int): Docs por lote interno de spaCy (default: config)
+            n_process (int): Procesos de spaCy (default: config)
+            chunk_size (int): Tickets leídos del iterable por bloque (default: config)
+            tiempos (bool): Agregar 'tiempos_etapas' a cada resultado; el parse
+                de nlp.pipe se reparte en partes iguales entre los docs del lote
+                (default: config.NLP_TIEMPOS_ETAPAS)
             
-        Returns:
-            list: Lista de resultados procesados
+        Yields:
+            dict: Resultado del análisis NLP de cada ticket
         """
-        logger.info(f"🔄 Procesando batch de {len(tickets)} tickets")
-        
-        resultados = []
-        for ticket in tickets:
+        config = get_config()
+        batch_size = batch_size or config.NLP_BATCH_SIZE
+        n_process = n_process or config.NLP_N_PROCESS
+        chunk_size = chunk_size or max(config.NLP_CHUNK_SIZE, batch_size * n_process)
+        medir = self.tiempos_etapas if tiempos is None else tiempos
+        
+        iterador = iter(tickets)
+        while True:
+            bloque = list(islice(iterador, chunk_size))
+            if not bloque:
+                break
+            yield from self._procesar_bloque(bloque, batch_size, n_process, medir)
+    
+    def _procesar_bloque(self, bloque, batch_size, n_process, medir=False):
+        """Procesa un bloque de tickets con una sola pasada de nlp.pipe"""
+        preparados = []
+        for ticket in bloque:
+            crono = Cronometro() if medir else SIN_CRONOMETRO
             try:
-                resultado = self.procesar_ticket(
+                preparado = self._preparar_ticket(
                     ticket['id'],
                     ticket['descripcion'],
-                    ticket.get('categoria')
+                    ticket.get('categoria'),
+                    crono
                 )
-                resultados.append(resultado)
             except Exception as e:
                 logger.error(f"❌ Error procesando ticket #{ticket['id']}: {str(e)}")
-                resultados.append(self._resultado_vacio(ticket['id'], str(e)))
+                preparado = {'valido': False, 'resultado': self._resultado_vacio(ticket['id'], str(e))}
+            preparado['crono'] = crono
+            preparados.append(preparado)
+        
+        # Resolver desde el cache y deduplicar textos repetidos dentro del bloque
+        analisis = {}
+        pendientes = OrderedDict()
+        for preparado in preparados:
+            if not preparado['valido']:
+                continue
+            clave = NLPCache.clave(preparado['texto_limpio'], self.huella)
+            preparado['clave'] = clave
+            if clave in analisis or clave in pendientes:
+                self.parses_ahorrados += 1
+                continue
+            cacheado = self.cache.obtener(clave) if self.cache is not None else None
+            if cacheado is not None:
+                analisis[clave] = cacheado
+                self.parses_ahorrados += 1
+            else:
+                pendientes[clave] = preparado
+        
+        # Parsear solo los textos nuevos
+        docs = {}
+        if self.nlp is not None and pendientes:
+            claves = list(pendientes)
+            textos = [pendientes[c]['texto_limpio'] for c in claves]
+            try:
+                inicio_pipe = time.perf_counter()
+                for clave, doc in zip(claves, self.nlp.pipe(textos, batch_size=batch_size, n_process=n_process)):
+                    docs[clave] = doc
+                if medir:
+                    # nlp.pipe no expone el tiempo por doc: parte igual para cada uno
+                    ms_por_doc = (time.perf_counter() - inicio_pipe) * 1000 / len(claves)
+                    for clave in claves:
+                        pendientes[clave]['crono'].sumar('parse', ms_por_doc)
+            except Exception as e:
+                logger.error(f"❌ Error en nlp.pipe, reprocesando bloque ticket por ticket: {str(e)}")
+                docs = {}
+                for clave in claves:
+                    try:
+                        docs[clave] = self.nlp(pendientes[clave]['texto_limpio'])
+                    except Exception as e_ticket:
+                        logger.error(f"❌ Error procesando ticket #{pendientes[clave]['ticket_id']}: {str(e_ticket)}")
+        
+        errores = {}
+        nuevos = []
+        for clave, preparado in pendientes.items():
+            if self.nlp is not None and clave not in docs:
+                errores[clave] = "Error en parse de spaCy"
+                continue
+            try:
+                preparado['crono'].reiniciar()
+                analisis[clave] = self._analizar_texto(
+                    preparado['texto_limpio'], preparado['estadisticas'], docs.get(clave), preparado['crono']
+                )
+                nuevos.append((clave, analisis[clave]))
+            except Exception as e:
+                logger.error(f"❌ Error procesando ticket #{preparado['ticket_id']}: {str(e)}")
+                errores[clave] = str(e)
+        
+        if self.cache is not None and nuevos:
+            self.cache.guardar_muchos(nuevos)
+        
+        usados = set()
+        for preparado in preparados:
+            if not preparado['valido']:
+                resultado = preparado['resultado']
+            elif preparado['clave'] in errores:
+                resultado = self._resultado_vacio(
+                    preparado['ticket_id'], errores[preparado['clave']], preparado['fecha_analisis']
+                )
+            else:
+                clave = preparado['clave']
+                # Los tickets duplicados reciben su propia copia del análisis
+                resultado_texto = analisis[clave] if clave not in usados else copy.deepcopy(analisis[clave])
+                usados.add(clave)
+                resultado = self._armar_resultado(preparado, resultado_texto)
+            if medir:
+                resultado['tiempos_etapas'] = preparado['crono'].resultado()
+            yield resultado
+    
+    def procesar_batch(self, tickets, batch_size=None, n_process=None, tiempos=None):
+        """
+        Procesa múltiples tickets en batch
+        
+        Args:
+            tickets (list): Lista de diccionarios con ticket_id, descripcion, categoria
+            batch_size (int): Docs por lote interno de spaCy (default: config)
+            n_process (int): Procesos de spaCy (default: config)
+            tiempos (bool): Agregar 'tiempos_etapas' a cada resultado (default: config)
+            
+        Returns:
+            list: Lista de resultados procesados
+        """
+        logger.info(f"🔄 Procesando batch de {len(tickets)} tickets")
+        
+        ahorrados_antes = self.parses_ahorrados
+        resultados = list(self.procesar_stream(tickets, batch_size=batch_size, n_process=n_process, tiempos=tiempos))
         
         logger.info(f"✅ Batch procesado: {len(resultados)} tickets")
-        return resultados
\ No newline at end of file
+        logger.info(f"♻️  Parses de spaCy ahorrados por cache: {self.parses_ahorrados - ahorrados_antes}")
+        return resultados
+    
+    def stats_cache(self):
+        """Contadores del cache y parses de spaCy ahorrados"""
+        stats = self.cache.stats() if self.cache is not None else {}
+        stats['parses_ahorrados'] = self.parses_ahorrados
+        return stats
+
+
+# Instancia única por proceso (compartida copy-on-write tras fork)
+_processor = None
+
+def get_nlp_processor():
+    """
+    Obtiene el NLPProcessor del proceso actual, creándolo la primera vez
+    
+    Si el proceso padre ya lo cargó antes de hacer fork (preload de Celery),
+    los hijos heredan el modelo sin volver a ejecutar spacy.load.
+    
+    Returns:
+        NLPProcessor: Procesador compartido del proceso
+    """
+    global _processor
+    if _processor is None:
+        _processor = NLPProcessor()
+    return _processor
+
+def precargar_nlp_processor():
+    """
+    Carga el procesador y reporta tiempo de carga y memoria residente
+    
+    Returns:
+        dict: {pid, tiempo_carga_s, memoria_mb, spacy}
+    """
+    inicio = time.time()
+    processor = get_nlp_processor()
+    tiempo_carga = time.time() - inicio
+    
+    reporte = {
+        'pid': os.getpid(),
+        'tiempo_carga_s': round(tiempo_carga, 3),
+        'memoria_mb': round(_memoria_residente_mb(), 1),
+        'spacy': processor.nlp is not None
+    }
+    logger.info(
+        f"🧠 NLPProcessor listo en pid {reporte['pid']}: "
+        f"{reporte['tiempo_carga_s']}s, {reporte['memoria_mb']} MB residentes"
+    )
+    return reporte
+
+def _memoria_residente_mb():
+    """Memoria residente actual del proceso en MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Fuera de Linux: pico de memoria (KB en Linux, bytes en macOS)
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
@@ -4,6 +4,21 @@ Utilidades para limpieza y normalización de texto
 import re
 import unicodedata
 
+# Patrones compilados una sola vez (limpieza)
+_RE_URL = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_RE_EMAIL_LIMPIEZA = re.compile(r'\S+@\S+')
+_RE_TELEFONO = re.compile(r'\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}')
+# Menciones y hashtags en una sola pasada: quitar '@\w+' y luego '#\w+'
+# da el mismo resultado porque lo que sigue a '\w+' nunca es un carácter de palabra
+_RE_MENCION_HASHTAG = re.compile(r'[@#]\w+')
+_RE_ESPACIOS = re.compile(r'\s+')
+_RE_NO_PERMITIDOS = re.compile(r'[^a-záéíóúñü\s.,;:¿?¡!-]')
+
+# Patrones compilados una sola vez (entidades y estadísticas)
+_RE_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_RE_NUMERO_ORDEN = re.compile(r'(?:ORD|ORDEN|#)\s*[-:]?\s*(\d{4,})', re.IGNORECASE)
+_RE_FIN_ORACION = re.compile(r'[.!?]+')
+
 def limpiar_texto(texto):
     """
     Limpia y normaliza texto para procesamiento NLP
@@ -17,27 +32,30 @@ def limpiar_texto(texto):
     if not texto or not isinstance(texto, str):
         return ""
     
+    return _limpiar(texto)
+
+def _limpiar(texto):
+    """Limpieza sobre un str ya validado (compartida con normalizar_ticket)"""
     # Convertir a minúsculas
     texto = texto.lower()
     
     # Eliminar URLs
-    texto = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', texto)
+    texto = _RE_URL.sub('', texto)
     
     # Eliminar emails
-    texto = re.sub(r'\S+@\S+', '', texto)
+    texto = _RE_EMAIL_LIMPIEZA.sub('', texto)
     
     # Eliminar números de teléfono comunes
-    texto = re.sub(r'\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}', '', texto)
+    texto = _RE_TELEFONO.sub('', texto)
     
     # Eliminar menciones y hashtags (si aplica)
-    texto = re.sub(r'@\w+', '', texto)
-    texto = re.sub(r'#\w+', '', texto)
+    texto = _RE_MENCION_HASHTAG.sub('', texto)
     
     # Normalizar espacios en blanco
-    texto = re.sub(r'\s+', ' ', texto)
+    texto = _RE_ESPACIOS.sub(' ', texto)
     
     # Eliminar caracteres especiales pero mantener puntuación básica
-    texto = re.sub(r'[^a-záéíóúñü\s.,;:¿?¡!-]', '', texto)
+    texto = _RE_NO_PERMITIDOS.sub('', texto)
     
     # Normalizar acentos (opcional, pero útil para consistencia)
     # Descomenta si prefieres eliminar acentos
@@ -45,9 +63,7 @@ def limpiar_texto(texto):
     #                 if unicodedata.category(c) != 'Mn')
     
     # Eliminar espacios al inicio y final
-    texto = texto.strip()
-    
-    return texto
+    return texto.strip()
 
 def extraer_entidades_basicas(texto):
     """
@@ -70,20 +86,16 @@ def extraer_entidades_basicas(texto):
         return entidades
     
     # Extraer emails
-    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', texto)
-    entidades['emails'] = list(set(emails))
+    entidades['emails'] = list(set(_RE_EMAIL.findall(texto)))
     
     # Extraer URLs
-    urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', texto)
-    entidades['urls'] = list(set(urls))
+    entidades['urls'] = list(set(_RE_URL.findall(texto)))
     
     # Extraer teléfonos
-    telefonos = re.findall(r'\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}', texto)
-    entidades['telefonos'] = list(set(telefonos))
+    entidades['telefonos'] = list(set(_RE_TELEFONO.findall(texto)))
     
     # Extraer números de orden (ej: ORD-12345, #12345)
-    numeros_orden = re.findall(r'(?:ORD|ORDEN|#)\s*[-:]?\s*(\d{4,})', texto, re.IGNORECASE)
-    entidades['numeros_orden'] = list(set(numeros_orden))
+    entidades['numeros_orden'] = list(set(_RE_NUMERO_ORDEN.findall(texto)))
     
     return entidades
 
@@ -106,11 +118,11 @@ def calcular_estadisticas_texto(texto):
             'longitud_promedio_palabra': 0
         }
     
-    palabras = texto.split()
-    oraciones = re.split(r'[.!?]+', texto)
-    oraciones = [o for o in oraciones if o.strip()]
-    
-    palabras_unicas = set(palabras)
+    return _estadisticas(texto, texto.split())
+
+def _estadisticas(texto, palabras):
+    """Estadísticas de un texto limpio no vacío ya dividido en palabras"""
+    oraciones = [o for o in _RE_FIN_ORACION.split(texto) if o.strip()]
     
     longitud_promedio = sum(len(p) for p in palabras) / len(palabras) if palabras else 0
     
@@ -118,7 +130,7 @@ def calcular_estadisticas_texto(texto):
         'num_palabras': len(palabras),
         'num_oraciones': len(oraciones),
         'num_caracteres': len(texto),
-        'palabras_unicas': len(palabras_unicas),
+        'palabras_unicas': len(set(palabras)),
         'longitud_promedio_palabra': round(longitud_promedio, 2)
     }
 
@@ -139,4 +151,58 @@ def es_texto_valido(texto, min_palabras=3):
     texto_limpio = limpiar_texto(texto)
     palabras = texto_limpio.split()
     
-    return len(palabras) >= min_palabras
\ No newline at end of file
+    return len(palabras) >= min_palabras
+
+def normalizar_ticket(texto, min_palabras=3, crono=None):
+    """
+    Normaliza un ticket en una sola llamada: valida, limpia, extrae
+    entidades y calcula estadísticas
+    
+    Equivale a es_texto_valido + extraer_entidades_basicas + limpiar_texto +
+    calcular_estadisticas_texto, pero limpia el texto una única vez y
+    reutiliza la división en palabras para validar y para las estadísticas.
+    
+    Args:
+        texto (str): Texto original sin limpiar
+        min_palabras (int): Mínimo de palabras requeridas
+        crono (Cronometro): Marca limpieza, validacion, entidades y
+            complejidad (estadísticas) si se pasa
+        
+    Returns:
+        dict: {valido, texto_limpio, entidades, estadisticas}. Si el texto no
+              es válido, entidades y estadisticas vienen vacías.
+    """
+    if not texto or not isinstance(texto, str):
+        texto_limpio = ""
+    else:
+        texto_limpio = _limpiar(texto)
+    if crono is not None:
+        crono.marcar('limpieza')
+    
+    palabras = texto_limpio.split()
+    valido = len(palabras) >= min_palabras
+    if crono is not None:
+        crono.marcar('validacion')
+    
+    if not valido:
+        return {
+            'valido': False,
+            'texto_limpio': texto_limpio,
+            'entidades': extraer_entidades_basicas(None),
+            'estadisticas': calcular_estadisticas_texto(None)
+        }
+    
+    entidades = extraer_entidades_basicas(texto)
+    if crono is not None:
+        crono.marcar('entidades')
+    
+    estadisticas = _estadisticas(texto_limpio, palabras)
+    if crono is not None:
+        crono.marcar('complejidad')
+    
+    return {
+        'valido': True,
+        'texto_limpio': texto_limpio,
+        'entidades': entidades,
+        'estadisticas': estadisticas
+    }
@@ -0,0 +1,131 @@
+"""
+Tiempos por etapa del análisis NLP
+
+Cronometro acumula milisegundos por etapa de un ticket; SIN_CRONOMETRO es
+el sustituto que no mide nada, para que el camino sin tiempos no pague
+más que una llamada vacía por etapa.
+
+Los histogramas agregan muchos tickets en buckets logarítmicos (potencias
+de 2 en microsegundos), de modo que se pueden sumar entre lotes y workers
+con simples incrementos (p. ej. HINCRBY en Redis).
+"""
+import time
+
+from models.tipos import ETAPAS_NLP
+
+# Bucket 0: < 16 µs; bucket i: [2^(i+3), 2^(i+4)) µs; el último acumula el resto (> 8 s)
+_BUCKET_MINIMO_BITS = 4
+NUM_BUCKETS = 20
+
+class Cronometro:
+    """Acumula {etapa: ms} marcando el fin de cada etapa"""
+    __slots__ = ('tiempos', '_ultimo')
+
+    def __init__(self):
+        self.tiempos = {}
+        self._ultimo = time.perf_counter()
+
+    def reiniciar(self):
+        """Descarta el tiempo transcurrido desde la última marca"""
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, etapa):
+        """Suma a `etapa` el tiempo desde la última marca"""
+        ahora = time.perf_counter()
+        self.tiempos[etapa] = self.tiempos.get(etapa, 0.0) + (ahora - self._ultimo) * 1000
+        self._ultimo = ahora
+
+    def sumar(self, etapa, ms):
+        """Suma un tiempo medido aparte (p. ej. la parte de un nlp.pipe)"""
+        self.tiempos[etapa] = self.tiempos.get(etapa, 0.0) + ms
+
+    def resultado(self):
+        return {etapa: round(ms, 3) for etapa, ms in self.tiempos.items()}
+
+class _SinCronometro:
+    """Cronometro que no mide"""
+    __slots__ = ()
+
+    def reiniciar(self):
+        pass
+
+    def marcar(self, etapa):
+        pass
+
+    def sumar(self, etapa, ms):
+        pass
+
+SIN_CRONOMETRO = _SinCronometro()
+
+def bucket(ms):
+    """Índice de bucket logarítmico de un tiempo en ms"""
+    microsegundos = int(ms * 1000)
+    return min(max(microsegundos.bit_length() - _BUCKET_MINIMO_BITS, 0), NUM_BUCKETS - 1)
+
+def limite_bucket_ms(indice):
+    """Límite superior en ms del bucket (el último no tiene límite)"""
+    return (1 << (indice + _BUCKET_MINIMO_BITS)) / 1000
+
+def acumular_histograma(histograma, tiempos):
+    """
+    Suma los tiempos de un ticket a un histograma plano
+
+    Las claves son 'etapa:bucket', 'etapa:n' y 'etapa:suma_us', todas
+    enteras, para poder sumarlas con HINCRBY.
+
+    Args:
+        histograma (dict): Histograma a actualizar
+        tiempos (dict): {etapa: ms} de un resultado
+    """
+    for etapa, ms in tiempos.items():
+        clave_bucket = f"{etapa}:{bucket(ms)}"
+        histograma[clave_bucket] = histograma.get(clave_bucket, 0) + 1
+        histograma[f"{etapa}:n"] = histograma.get(f"{etapa}:n", 0) + 1
+        histograma[f"{etapa}:suma_us"] = histograma.get(f"{etapa}:suma_us", 0) + int(ms * 1000)
+
+def histograma_resultados(resultados):
+    """Histograma plano de los tiempos_etapas de una lista de resultados"""
+    histograma = {}
+    for resultado in resultados:
+        tiempos = resultado.get('tiempos_etapas')
+        if tiempos:
+            acumular_histograma(histograma, tiempos)
+    return histograma
+
+def _percentil(conteos, n, fraccion):
+    """Límite superior del bucket que contiene el percentil pedido"""
+    objetivo = fraccion * n
+    acumulado = 0
+    for indice, cantidad in enumerate(conteos):
+        acumulado += cantidad
+        if acumulado >= objetivo:
+            return limite_bucket_ms(indice)
+    return limite_bucket_ms(NUM_BUCKETS - 1)
+
+def resumir_histograma(histograma):
+    """
+    Resumen legible de un histograma plano
+
+    Los percentiles son aproximados: el límite superior del bucket.
+
+    Returns:
+        dict: {etapa: {n, media_ms, p50_ms, p95_ms, p99_ms, buckets: {límite_ms: n}}}
+    """
+    resumen = {}
+    for etapa in ETAPAS_NLP:
+        n = int(histograma.get(f"{etapa}:n", 0))
+        if not n:
+            continue
+        conteos = [int(histograma.get(f"{etapa}:{i}", 0)) for i in range(NUM_BUCKETS)]
+        resumen[etapa] = {
+            'n': n,
+            'media_ms': round(int(histograma.get(f"{etapa}:suma_us", 0)) / n / 1000, 3),
+            'p50_ms': _percentil(conteos, n, 0.50),
+            'p95_ms': _percentil(conteos, n, 0.95),
+            'p99_ms': _percentil(conteos, n, 0.99),
+            'buckets': {
+                str(limite_bucket_ms(i)): cantidad
+                for i, cantidad in enumerate(conteos) if cantidad
+            }
+        }
+    return resumen
@@ -2,17 +2,30 @@
 Tareas de Celery para procesamiento de tickets
 """
 from celery_app import celery
-from services.nlp_processor import NLPProcessor
+from services.nlp_processor import get_nlp_processor
+from services.keyword_engine import TfidfKeywordEngine
 from models.ticket import Ticket
 from models.analisis import Analisis
 from utils.database import db_manager
+from utils.progreso import registrar_lote
+from services.tiempos_etapas import histograma_resultados
 import logging
 from datetime import datetime
 import time
 
 logger = logging.getLogger(__name__)
 
-@celery.task(bind=True, max_retries=3)
+# Motor TF-IDF del proceso worker (False = ya se buscó y no hay modelos)
+_motor_tfidf = None
+
+def _get_motor_tfidf():
+    """Carga una vez por proceso los modelos TF-IDF, si existen"""
+    global _motor_tfidf
+    if _motor_tfidf is None:
+        _motor_tfidf = TfidfKeywordEngine.desde_config() or False
+    return _motor_tfidf or None
+
+@celery.task(bind=True, max_retries=3, ignore_result=True)
 def procesar_ticket_task(self, ticket_id):
     """
     Tarea para procesar un ticket individual
@@ -23,8 +36,6 @@ def procesar_ticket_task(self, ticket_id):
     Returns:
         dict: Resultado del procesamiento
     """
-    inicio = time.time()
-    
     try:
         logger.info(f"🔄 Task iniciada para ticket #{ticket_id}")
         
@@ -39,41 +50,25 @@ def procesar_ticket_task(self, ticket_id):
             session.close()
             return {'error': 'Ticket no encontrado', 'ticket_id': ticket_id}
         
-        # Procesar con NLP
-        processor = NLPProcessor()
+        # Procesar con NLP (instancia compartida del worker)
+        processor = get_nlp_processor()
+        
+        # Solo el análisis: sin la lectura del ticket ni la carga del modelo
+        inicio = time.perf_counter()
         resultado = processor.procesar_ticket(
             ticket.id,
             ticket.descripcion,
             ticket.categoria
         )
+        motor_tfidf = _get_motor_tfidf()
+        if motor_tfidf is not None:
+            motor_tfidf.aplicar([resultado])
+        tiempo_procesamiento = (time.perf_counter() - inicio) * 1000  # ms
         
-        # Calcular tiempo de procesamiento
-        tiempo_procesamiento = (time.time() - inicio) * 1000  # ms
-        
-        # Guardar análisis en la base de datos
-        analisis = Analisis(
-            ticket_id=ticket.id,
-            texto_limpio=resultado.get('texto_limpio', ''),
-            palabras_clave=resultado.get('palabras_clave', []),
-            entidades=resultado.get('entidades_ner', {}),
-            tokens=resultado.get('num_tokens', 0),
-            complejidad_score=resultado.get('complejidad', 0.0),
-            sentimiento=resultado.get('sentimiento', {}).get('tipo', 'neutral'),
-            urgencia=resultado.get('urgencia', {}).get('nivel', 'baja'),
-            categoria_detectada=resultado.get('categoria', ticket.categoria),
-            confianza_clasificacion=0.8,  # Placeholder
-            longitud_texto=len(resultado.get('texto_limpio', '')),
-            num_palabras=resultado.get('estadisticas', {}).get('num_palabras', 0),
-            num_entidades=len(resultado.get('entidades_ner', {}).get('personas', [])),
-            fecha_analisis=datetime.utcnow(),
-            tiempo_procesamiento_ms=tiempo_procesamiento
-        )
-        
-        session.add(analisis)
-        
-        # Marcar ticket como procesado
-        ticket.procesado = True
-        ticket.fecha_procesamiento = datetime.utcnow()
+        # Guardar análisis y marcar el ticket como procesado
+        db_manager.guardar_analisis_batch(session, [
+            Analisis.valores_desde_resultado(resultado, ticket.categoria, tiempo_procesamiento)
+        ])
         
         session.commit()
         session.close()
@@ -94,62 +89,110 @@ def procesar_ticket_task(self, ticket_id):
         # Reintentar la tarea
         raise self.retry(exc=e, countdown=60)
 
+def _reportar_progreso(run_id, resultados, analisis=None):
+    """Suma el lote (y sus tiempos por etapa) a los contadores de la corrida, si la hay"""
+    if run_id:
+        histograma = histograma_resultados(analisis) if analisis else None
+        registrar_lote(run_id, resultados['exitosos'], resultados['fallidos'],
+                       omitidos=resultados.get('omitidos', 0), histograma=histograma)
+
 @celery.task(bind=True)
-def procesar_batch_tickets_task(self, ticket_ids):
+def procesar_batch_tickets_task(self, ticket_ids, run_id=None):
     """
     Tarea para procesar un lote de tickets
     
+    Lee todos los tickets con una sola consulta, los analiza con la ruta
+    por lotes del NLPProcessor del worker y guarda todos los análisis en
+    una sola transacción.
+    
     Args:
         ticket_ids (list): Lista de IDs de tickets a procesar
+        run_id (str): Corrida cuyos contadores de progreso se actualizan
         
     Returns:
-        dict: Resumen del procesamiento
+        dict: Resumen del procesamiento: exitosos, fallidos (errores de
+              análisis), omitidos (ids ya procesados o inexistentes) y errores
     """
+    inicio = time.time()
+    logger.info(f"🔄 Procesando batch de {len(ticket_ids)} tickets")
+    
+    resultados = {
+        'total': len(ticket_ids),
+        'exitosos': 0,
+        'fallidos': 0,
+        'omitidos': 0,
+        'errores': []
+    }
+    
+    session = db_manager.get_session()
+    
     try:
-        logger.info(f"🔄 Procesando batch de {len(ticket_ids)} tickets")
-        
-        resultados = {
-            'total': len(ticket_ids),
-            'exitosos': 0,
-            'fallidos': 0,
-            'errores': []
-        }
+        # Una consulta para todo el lote; los ya procesados se omiten
+        filas = session.query(Ticket.id, Ticket.descripcion, Ticket.categoria)\
+            .filter(Ticket.id.in_(ticket_ids), Ticket.procesado == False)\
+            .all()
+        
+        # Ya procesados (p. ej. un reenvío del mismo lote) o inexistentes: no son errores
+        resultados['omitidos'] = len(ticket_ids) - len(filas)
+        
+        if not filas:
+            _reportar_progreso(run_id, resultados)
+            return resultados
+        
+        # Analizar el lote completo con nlp.pipe
+        processor = get_nlp_processor()
+        inicio_nlp = time.time()
+        analisis = processor.procesar_batch([
+            {'id': fila.id, 'descripcion': fila.descripcion, 'categoria': fila.categoria}
+            for fila in filas
+        ])
+        motor_tfidf = _get_motor_tfidf()
+        if motor_tfidf is not None:
+            motor_tfidf.aplicar(analisis)
+        
+        # Tiempo de análisis amortizado por ticket dentro del lote (sin la lectura)
+        tiempo_procesamiento = (time.time() - inicio_nlp) * 1000 / len(filas)
+        
+        # Un INSERT y un UPDATE para todo el lote, en una transacción
+        db_manager.guardar_analisis_batch(session, [
+            Analisis.valores_desde_resultado(resultado, fila.categoria, tiempo_procesamiento)
+            for fila, resultado in zip(filas, analisis)
+        ])
+        session.commit()
         
-        # Procesar cada ticket individualmente
-        for ticket_id in ticket_ids:
-            try:
-                resultado = procesar_ticket_task.apply(args=[ticket_id])
-                
-                if resultado.get('procesado'):
-                    resultados['exitosos'] += 1
-                else:
-                    resultados['fallidos'] += 1
-                    resultados['fallidos'] += 1
-                    resultados['errores'].append({
-                        'ticket_id': ticket_id,
-                        'error': resultado.get('error', 'Error desconocido')
-                    })
-                    
-            except Exception as e:
-                logger.error(f"❌ Error en ticket #{ticket_id}: {str(e)}")
+        for resultado in analisis:
+            if resultado.get('procesado'):
+                resultados['exitosos'] += 1
+            else:
+                # Texto inválido: se guarda y se marca procesado, pero se reporta
                 resultados['fallidos'] += 1
                 resultados['errores'].append({
-                    'ticket_id': ticket_id,
-                    'error': str(e)
+                    'ticket_id': resultado['ticket_id'],
+                    'error': resultado.get('error', 'Error desconocido')
                 })
         
-        logger.info(f"✅ Batch completado: {resultados['exitosos']}/{resultados['total']} exitosos")
+        logger.info(f"✅ Batch completado: {resultados['exitosos']}/{resultados['total']} exitosos ({time.time() - inicio:.2f}s)")
         
+        _reportar_progreso(run_id, resultados, analisis)
         return resultados
         
     except Exception as e:
+        session.rollback()
         logger.error(f"❌ Error en batch: {str(e)}")
-        return {
+        
+        # Nada del lote quedó guardado: todos los tickets se reportan con el error
+        resultados = {
             'error': str(e),
             'total': len(ticket_ids),
             'exitosos': 0,
-            'fallidos': len(ticket_ids)
+            'fallidos': len(ticket_ids),
+            'omitidos': 0,
+            'errores': [{'ticket_id': ticket_id, 'error': str(e)} for ticket_id in ticket_ids]
         }
+        _reportar_progreso(run_id, resultados)
+        return resultados
+    finally:
+        session.close()
 
 @celery.task(bind=True)
 def procesar_todos_tickets_task(self):
@@ -162,17 +205,12 @@ def procesar_todos_tickets_task(self):
     try:
         logger.info("🔄 Iniciando procesamiento de todos los tickets no procesados")
         
-        session = get_session()
-        
-        # Obtener todos los tickets no procesados
-        tickets_pendientes = session.query(Ticket).filter_by(procesado_nlp=False).all()
-        total_tickets = len(tickets_pendientes)
+        total_tickets = db_manager.contar_tickets_pendientes()
         
         logger.info(f"📊 Total de tickets pendientes: {total_tickets}")
         
         if total_tickets == 0:
             logger.info("✅ No hay tickets pendientes de procesar")
-            session.close()
             return {'mensaje': 'No hay tickets pendientes', 'total': 0}
         
         # Dividir en batches para mejor rendimiento
@@ -186,38 +224,40 @@ def procesar_todos_tickets_task(self):
             'batches_procesados': 0,
             'tickets_exitosos': 0,
             'tickets_fallidos': 0,
+            'tickets_omitidos': 0,
             'inicio': datetime.utcnow().isoformat()
         }
         
         # Procesar por batches
-        for i in range(0, total_tickets, batch_size):
-            batch = tickets_pendientes[i:i + batch_size]
-            batch_ids = [ticket.id for ticket in batch]
+        procesados = 0
+        for numero, batch in enumerate(db_manager.iterar_tickets_pendientes(batch_size), start=1):
+            batch_ids = [ticket_id for ticket_id, _, _ in batch]
             
-            logger.info(f"🔄 Procesando batch {i//batch_size + 1}/{num_batches}")
+            logger.info(f"🔄 Procesando batch {numero}/{num_batches}")
             
             # Procesar batch
-            resultado_batch = procesar_batch_tickets_task.apply(args=[batch_ids])
+            resultado_batch = procesar_batch_tickets_task.apply(args=[batch_ids]).get()
             
             resultados_globales['batches_procesados'] += 1
             resultados_globales['tickets_exitosos'] += resultado_batch.get('exitosos', 0)
             resultados_globales['tickets_fallidos'] += resultado_batch.get('fallidos', 0)
+            resultados_globales['tickets_omitidos'] += resultado_batch.get('omitidos', 0)
             
             # Actualizar progreso
-            progreso = ((i + len(batch)) / total_tickets) * 100
+            procesados += len(batch)
+            progreso = (procesados / total_tickets) * 100
             self.update_state(
                 state='PROGRESS',
                 meta={
-                    'current': i + len(batch),
+                    'current': procesados,
                     'total': total_tickets,
                     'porcentaje': round(progreso, 2),
                     'exitosos': resultados_globales['tickets_exitosos'],
-                    'fallidos': resultados_globales['tickets_fallidos']
+                    'fallidos': resultados_globales['tickets_fallidos'],
+                    'omitidos': resultados_globales['tickets_omitidos']
                 }
             )
         
-        session.close()
-        
         resultados_globales['fin'] = datetime.utcnow().isoformat()
         
         logger.info(f"✅ Procesamiento completo: {resultados_globales['tickets_exitosos']}/{total_tickets} exitosos")
@@ -0,0 +1,366 @@
+"""
+Agregados incrementales por categoría (agregados_categoria / agregados_palabras)
+
+Con AGREGADOS_CATEGORIA=true el escritor de análisis bloquea los tickets
+del lote, lee su categoría y el análisis vigente, y aplica la diferencia
+(resta lo anterior, suma lo nuevo) con un INSERT ... ON CONFLICT que
+incrementa los contadores, todo dentro de la transacción del lote. Los
+reprocesos y reintentos no duplican conteos, y la regla de fecha_analisis
+del upsert se respeta también aquí.
+
+La complejidad se guarda como n, suma y suma de cuadrados, de modo que la
+media y la desviación poblacional salen sin volver a leer analisis.
+complejidad_min/max son una envolvente: reprocesar no las achica, pero
+reconstruir() las deja exactas.
+
+Al activar los agregados sobre una base con análisis existentes hay que
+reconstruirlos una vez (scripts/calcular_iar.py --reconstruir-agregados).
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import func, text, tuple_
+
+from config import get_config
+from models import Analisis, Ticket, AgregadoCategoria, AgregadoPalabra
+from models.tipos import SENTIMIENTOS, URGENCIAS
+from utils.palabras_clave import palabras_de, palabras_por_categoria
+from utils.particiones import join_ticket_analisis
+
+logger = logging.getLogger(__name__)
+
+AGREGADOS_ACTIVOS = get_config().AGREGADOS_CATEGORIA
+
+# Columnas que se suman al aplicar una diferencia
+_CONTADORES = (
+    ['tickets_procesados', 'n_complejidad', 'suma_complejidad', 'suma_cuadrados_complejidad', 'total_palabras']
+    + [f'urgencia_{u}' for u in URGENCIAS]
+    + [f'sentimiento_{s}' for s in SENTIMIENTOS]
+)
+
+def desviacion_poblacional(n, suma, suma_cuadrados):
+    """Desviación estándar poblacional a partir de n, Σx y Σx²"""
+    if n <= 1:
+        return 0.0
+    media = suma / n
+    return max(suma_cuadrados / n - media * media, 0.0) ** 0.5
+
+def _dialecto(session):
+    return session.get_bind().dialect.name
+
+def leer_estado_previo(session, ticket_ids):
+    """
+    Bloquea los tickets del lote y lee su categoría y su análisis vigente
+
+    Debe llamarse antes del upsert. En PostgreSQL los tickets se bloquean
+    (FOR UPDATE, en orden de id) con una sentencia previa, así dos
+    escritores del mismo ticket se serializan y el segundo lee el análisis
+    que dejó el primero.
+
+    Args:
+        session: Sesión de SQLAlchemy (transacción del lote)
+        ticket_ids (list): Tickets del lote
+
+    Returns:
+        dict: {ticket_id: fila con categoria, analisis_id, complejidad_score,
+               urgencia, sentimiento, palabras_clave, fecha_analisis}
+    """
+    if _dialecto(session) == 'postgresql':
+        session.query(Ticket.id).filter(Ticket.id.in_(ticket_ids)).order_by(Ticket.id).with_for_update().all()
+
+    filas = (
+        session.query(
+            Ticket.id, Ticket.categoria, Analisis.id.label('analisis_id'),
+            Analisis.complejidad_score, Analisis.urgencia, Analisis.sentimiento,
+            Analisis.palabras_clave, Analisis.fecha_analisis
+        )
+        .select_from(Ticket)
+        .outerjoin(Analisis, join_ticket_analisis())
+        .filter(Ticket.id.in_(ticket_ids))
+        .all()
+    )
+    return {fila.id: fila for fila in filas}
+
+def _delta_vacio():
+    delta = dict.fromkeys(_CONTADORES, 0)
+    delta.update(complejidad_min=None, complejidad_max=None)
+    return delta
+
+def _sumar(delta, palabras, complejidad, urgencia, sentimiento, palabras_clave, signo):
+    """Suma (signo=1) o resta (signo=-1) un análisis a la diferencia de su categoría"""
+    if complejidad:
+        delta['n_complejidad'] += signo
+        delta['suma_complejidad'] += signo * complejidad
+        delta['suma_cuadrados_complejidad'] += signo * complejidad * complejidad
+    if urgencia in URGENCIAS:
+        delta[f'urgencia_{urgencia}'] += signo
+    if sentimiento in SENTIMIENTOS:
+        delta[f'sentimiento_{sentimiento}'] += signo
+    for palabra in palabras_de(palabras_clave):
+        palabras[palabra] += signo
+        delta['total_palabras'] += signo
+
+def calcular_deltas(previos, filas):
+    """
+    Diferencias por categoría de un lote de análisis
+
+    Args:
+        previos (dict): Resultado de leer_estado_previo
+        filas (list): Dicts de Analisis.valores_desde_resultado ya deduplicados
+
+    Returns:
+        tuple: ({categoria: delta}, {categoria: Counter(palabra)})
+    """
+    deltas = {}
+    palabras = defaultdict(Counter)
+
+    for fila in filas:
+        previo = previos.get(fila['ticket_id'])
+        if previo is None:
+            continue  # El ticket no existe; el upsert tampoco lo escribe
+
+        if previo.analisis_id is not None:
+            # Misma condición que el upsert: no se pisa un análisis más reciente
+            if previo.fecha_analisis is None or previo.fecha_analisis > fila['fecha_analisis']:
+                continue
+
+        delta = deltas.setdefault(previo.categoria, _delta_vacio())
+        contador = palabras[previo.categoria]
+
+        if previo.analisis_id is None:
+            delta['tickets_procesados'] += 1
+        else:
+            _sumar(delta, contador, previo.complejidad_score, previo.urgencia,
+                   previo.sentimiento, previo.palabras_clave, -1)
+
+        complejidad = fila.get('complejidad_score')
+        _sumar(delta, contador, complejidad, fila.get('urgencia'),
+               fila.get('sentimiento'), fila.get('palabras_clave'), 1)
+        if complejidad:
+            delta['complejidad_min'] = min(complejidad, delta['complejidad_min'] or complejidad)
+            delta['complejidad_max'] = max(complejidad, delta['complejidad_max'] or complejidad)
+
+    return deltas, palabras
+
+def _insert(session):
+    """insert con ON CONFLICT y las funciones mínimo/máximo de dos valores del motor"""
+    dialecto = _dialecto(session)
+    if dialecto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert, func.least, func.greatest
+    if dialecto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert, func.min, func.max
+    return None, None, None
+
+def aplicar_deltas(session, deltas, palabras):
+    """
+    Suma las diferencias a agregados_categoria y agregados_palabras
+
+    Un INSERT ... ON CONFLICT multi-fila por tabla, en orden de clave para
+    que escritores concurrentes bloqueen las filas en el mismo orden.
+    """
+    if not deltas:
+        return
+    insert, menor, mayor = _insert(session)
+    if insert is None:
+        logger.debug("Agregados incrementales no soportados en este motor")
+        return
+
+    ahora = datetime.utcnow()
+    tabla = AgregadoCategoria.__table__
+    stmt = insert(tabla)
+    actualizar = {c: tabla.c[c] + stmt.excluded[c] for c in _CONTADORES}
+    actualizar['complejidad_min'] = menor(
+        func.coalesce(tabla.c.complejidad_min, stmt.excluded.complejidad_min),
+        func.coalesce(stmt.excluded.complejidad_min, tabla.c.complejidad_min)
+    )
+    actualizar['complejidad_max'] = mayor(
+        func.coalesce(tabla.c.complejidad_max, stmt.excluded.complejidad_max),
+        func.coalesce(stmt.excluded.complejidad_max, tabla.c.complejidad_max)
+    )
+    actualizar['updated_at'] = stmt.excluded.updated_at
+    session.execute(
+        stmt.on_conflict_do_update(index_elements=['categoria'], set_=actualizar),
+        [dict(deltas[categoria], categoria=categoria, updated_at=ahora) for categoria in sorted(deltas)]
+    )
+
+    filas_palabras = [
+        {'categoria': categoria, 'palabra': palabra, 'conteo': conteo}
+        for categoria in sorted(palabras)
+        for palabra, conteo in sorted(palabras[categoria].items())
+        if conteo
+    ]
+    if not filas_palabras:
+        return
+
+    tabla = AgregadoPalabra.__table__
+    stmt = insert(tabla)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['categoria', 'palabra'],
+            set_={'conteo': tabla.c.conteo + stmt.excluded.conteo}
+        ),
+        filas_palabras
+    )
+
+    # Palabras que dejaron de aparecer por un reproceso
+    restadas = [(f['categoria'], f['palabra']) for f in filas_palabras if f['conteo'] < 0]
+    if restadas:
+        session.query(AgregadoPalabra).filter(
+            tuple_(AgregadoPalabra.categoria, AgregadoPalabra.palabra).in_(restadas),
+            AgregadoPalabra.conteo <= 0
+        ).delete(synchronize_session=False)
+
+def aplicar_lote(session, previos, filas):
+    """Actualiza los agregados con un lote ya escrito por el upsert"""
+    aplicar_deltas(session, *calcular_deltas(previos, filas))
+
+def aplicar_palabras_clave(session, previos, palabras_nuevas):
+    """
+    Actualiza los agregados cuando solo cambian las palabras clave
+
+    Para reescrituras que no pasan por el upsert (scripts/ajustar_tfidf.py
+    --reescribir): resta las palabras vigentes y suma las nuevas, sin
+    tocar complejidad, urgencia ni sentimiento.
+
+    Args:
+        session: Sesión de SQLAlchemy (transacción de la reescritura)
+        previos (dict): Resultado de leer_estado_previo, antes de reescribir
+        palabras_nuevas (dict): {ticket_id: palabras_clave nuevas}
+    """
+    deltas = {}
+    palabras = defaultdict(Counter)
+    for ticket_id, palabras_clave in palabras_nuevas.items():
+        previo = previos.get(ticket_id)
+        if previo is None or previo.analisis_id is None:
+            continue
+        delta = deltas.setdefault(previo.categoria, _delta_vacio())
+        contador = palabras[previo.categoria]
+        _sumar(delta, contador, None, None, None, previo.palabras_clave, -1)
+        _sumar(delta, contador, None, None, None, palabras_clave, 1)
+    aplicar_deltas(session, deltas, palabras)
+
+def reconstruir(session):
+    """
+    Recalcula los agregados desde analisis (no hace commit)
+
+    En PostgreSQL bloquea ambas tablas contra escritura mientras corre: los
+    lotes que se escriban en paralelo esperan y aplican su diferencia
+    sobre el resultado reconstruido, sin perder ni duplicar conteos.
+
+    Returns:
+        int: Categorías reconstruidas
+    """
+    if _dialecto(session) == 'postgresql':
+        session.execute(text("LOCK TABLE agregados_categoria, agregados_palabras IN SHARE ROW EXCLUSIVE MODE"))
+
+    session.query(AgregadoPalabra).delete(synchronize_session=False)
+    session.query(AgregadoCategoria).delete(synchronize_session=False)
+
+    complejidad = func.nullif(Analisis.complejidad_score, 0)
+    columnas = [
+        Ticket.categoria.label('categoria'),
+        func.count(Analisis.id).label('tickets_procesados'),
+        func.count(complejidad).label('n_complejidad'),
+        func.coalesce(func.sum(complejidad), 0.0).label('suma_complejidad'),
+        func.coalesce(func.sum(complejidad * complejidad), 0.0).label('suma_cuadrados_complejidad'),
+        func.min(complejidad).label('complejidad_min'),
+        func.max(complejidad).label('complejidad_max'),
+    ]
+    columnas += [func.count().filter(Analisis.urgencia == u).label(f'urgencia_{u}') for u in URGENCIAS]
+    columnas += [func.count().filter(Analisis.sentimiento == s).label(f'sentimiento_{s}') for s in SENTIMIENTOS]
+
+    filas = (
+        session.query(*columnas)
+        .select_from(Ticket)
+        .join(Analisis, join_ticket_analisis())
+        .group_by(Ticket.categoria)
+        .all()
+    )
+
+    palabras = palabras_por_categoria(session)
+
+    ahora = datetime.utcnow()
+    categorias = []
+    for fila in filas:
+        valores = dict(fila._mapping)
+        valores['total_palabras'] = sum(palabras[fila.categoria].values())
+        valores['updated_at'] = ahora
+        categorias.append(valores)
+    if categorias:
+        session.execute(AgregadoCategoria.__table__.insert(), categorias)
+
+    filas_palabras = [
+        {'categoria': categoria, 'palabra': palabra, 'conteo': conteo}
+        for categoria, contador in palabras.items()
+        for palabra, conteo in contador.items()
+    ]
+    for inicio in range(0, len(filas_palabras), 10000):
+        session.execute(AgregadoPalabra.__table__.insert(), filas_palabras[inicio:inicio + 10000])
+
+    logger.info(f"🧮 Agregados reconstruidos: {len(categorias)} categorías, {len(filas_palabras)} palabras")
+    return len(categorias)
+
+def inicializar_si_vacio(session):
+    """Reconstruye los agregados si están vacíos pero ya hay análisis (no hace commit)"""
+    if session.query(AgregadoCategoria.categoria).first() is not None:
+        return False
+    if session.query(Analisis.id).first() is None:
+        return False
+    logger.info("🧮 Agregados vacíos con análisis existentes: reconstruyendo")
+    reconstruir(session)
+    return True
+
+def leer_agregados(session, top_n=10):
+    """
+    Estado agregado de todas las categorías, sin leer analisis
+
+    Args:
+        session: Sesión de SQLAlchemy
+        top_n (int): Palabras clave más frecuentes por categoría
+
+    Returns:
+        dict: {categoria: {tickets_procesados, n_complejidad,
+               complejidad_promedio, complejidad_min, complejidad_max,
+               complejidad_std, urgencia_*, sentimiento_*, total_palabras,
+               top_palabras: [(palabra, conteo)]}}
+    """
+    resultado = {}
+    for a in session.query(AgregadoCategoria).all():
+        n = a.n_complejidad
+        resultado[a.categoria] = {
+            'tickets_procesados': a.tickets_procesados,
+            'n_complejidad': n,
+            'complejidad_promedio': a.suma_complejidad / n if n else 0.0,
+            'complejidad_min': a.complejidad_min or 0.0,
+            'complejidad_max': a.complejidad_max or 0.0,
+            'complejidad_std': desviacion_poblacional(n, a.suma_complejidad, a.suma_cuadrados_complejidad),
+            **{f'urgencia_{u}': getattr(a, f'urgencia_{u}') for u in URGENCIAS},
+            **{f'sentimiento_{s}': getattr(a, f'sentimiento_{s}') for s in SENTIMIENTOS},
+            'total_palabras': a.total_palabras,
+            'top_palabras': []
+        }
+
+    # Top N por categoría con una función de ventana
+    orden = func.row_number().over(
+        partition_by=AgregadoPalabra.categoria,
+        order_by=(AgregadoPalabra.conteo.desc(), AgregadoPalabra.palabra)
+    ).label('orden')
+    ranking = (
+        session.query(AgregadoPalabra.categoria, AgregadoPalabra.palabra, AgregadoPalabra.conteo, orden)
+        .filter(AgregadoPalabra.conteo > 0)
+        .subquery()
+    )
+    filas = (
+        session.query(ranking.c.categoria, ranking.c.palabra, ranking.c.conteo)
+        .filter(ranking.c.orden <= top_n)
+        .order_by(ranking.c.categoria, ranking.c.orden)
+        .all()
+    )
+    for categoria, palabra, conteo in filas:
+        if categoria in resultado:
+            resultado[categoria]['top_palabras'].append((palabra, conteo))
+
+    return resultado
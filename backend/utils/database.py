@@ -1,14 +1,21 @@
 """
 Gestión de conexión a PostgreSQL con SQLAlchemy
 """
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, event, text, func, or_
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
+from sqlalchemy.types import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from contextlib import contextmanager
+from datetime import datetime, timedelta
 import logging
 
 from config import get_config
-from models import Base
+from models import Base, Analisis, Ticket
+from models.analisis import CLAVE_CONFLICTO, PARTICIONADO
+from utils.migraciones import aplicar_migraciones
+from utils.particiones import asegurar_particiones
+from utils import agregados, palabras_clave
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +70,22 @@ class DatabaseManager:
         
         logger.info("Creando tablas en PostgreSQL...")
         Base.metadata.create_all(bind=self.engine)
+        aplicar_migraciones(self.engine)
+        asegurar_particiones(self.engine)
+        if agregados.AGREGADOS_ACTIVOS:
+            with self.session_scope() as session:
+                agregados.inicializar_si_vacio(session)
+        if palabras_clave.PALABRAS_TABLA:
+            with self.session_scope() as session:
+                palabras_clave.inicializar_si_vacia(session)
         logger.info("✅ Tablas creadas correctamente")
     
+    def asegurar_particiones(self, desde=None, hasta=None):
+        """Crear particiones mensuales para un rango de fechas (PARTICIONADO_MENSUAL)"""
+        if self.engine is None:
+            self.init_engine()
+        return asegurar_particiones(self.engine, desde, hasta)
+    
     def drop_all_tables(self):
         """Eliminar todas las tablas (¡CUIDADO!)"""
         if self.engine is None:
@@ -126,6 +147,385 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Error obteniendo estadísticas: {e}")
             return {}
+
+    def get_tamanos_tablas(self) -> dict:
+        """
+        Tamaño en disco por tabla (solo PostgreSQL)
+
+        Returns:
+            dict: {tabla: {filas, total_bytes, tabla_bytes, indices_bytes, toast_bytes, bytes_por_fila}}
+        """
+        if self.engine.dialect.name != 'postgresql':
+            logger.warning("⚠️  Reporte de tamaños disponible solo en PostgreSQL")
+            return {}
+
+        tamanos = {}
+        with self.engine.connect() as conn:
+            for table in ['tickets', 'analisis', 'recomendaciones', 'metricas_categoria']:
+                if conn.execute(text("SELECT to_regclass(:tabla)"), {'tabla': table}).scalar() is None:
+                    continue
+                # pg_partition_tree suma las particiones; una tabla simple es su único nodo
+                fila = conn.execute(text(
+                    "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint, "
+                    "COALESCE(SUM(pg_total_relation_size(c.oid)), 0)::bigint, "
+                    "COALESCE(SUM(pg_relation_size(c.oid)), 0)::bigint, "
+                    "COALESCE(SUM(pg_indexes_size(c.oid)), 0)::bigint, "
+                    "COALESCE(SUM(pg_total_relation_size(NULLIF(c.reltoastrelid, 0))), 0)::bigint "
+                    "FROM pg_partition_tree(to_regclass(:tabla)) p "
+                    "JOIN pg_class c ON c.oid = p.relid WHERE p.isleaf"
+                ), {'tabla': table}).fetchone()
+                filas, total, tabla_bytes, indices, toast = fila
+                tamanos[table] = {
+                    'filas': filas,
+                    'total_bytes': total,
+                    'tabla_bytes': tabla_bytes,
+                    'indices_bytes': indices,
+                    'toast_bytes': toast,
+                    'bytes_por_fila': round(total / filas, 1) if filas else None
+                }
+        return tamanos
+
+    def contar_tickets_pendientes(self) -> int:
+        """Cantidad de tickets con procesado=False"""
+        session = self.get_session()
+        try:
+            return session.query(func.count(Ticket.id)).filter(Ticket.procesado == False).scalar()
+        finally:
+            session.close()
+    
+    def iterar_tickets_pendientes(self, batch_size=1000, desde_id=0):
+        """
+        Lotes de tickets pendientes como tuplas (id, descripcion, categoria)
+        
+        Pagina por keyset sobre id: cada consulta es un rango de la clave
+        primaria, solo proyecta las tres columnas necesarias y no deja
+        objetos en el identity map. La memoria queda acotada por batch_size
+        y los tickets que se marcan como procesados durante la corrida no se
+        releen.
+        
+        Args:
+            batch_size (int): Tickets por lote
+            desde_id (int): Empezar después de este id
+            
+        Yields:
+            list: Tuplas (id, descripcion, categoria) ordenadas por id
+        """
+        session = self.get_session()
+        try:
+            ultimo_id = desde_id
+            while True:
+                lote = session.query(Ticket.id, Ticket.descripcion, Ticket.categoria)\
+                    .filter(Ticket.procesado == False, Ticket.id > ultimo_id)\
+                    .order_by(Ticket.id)\
+                    .limit(batch_size)\
+                    .all()
+                if not lote:
+                    break
+                ultimo_id = lote[-1][0]
+                session.commit()  # No mantener abierta la transacción de lectura
+                yield [tuple(fila) for fila in lote]
+        finally:
+            session.close()
+    
+    def _alcance_reproceso(self, query, categorias=None, desde=None, hasta=None):
+        """Aplica filtros de categoría y rango de fecha_creacion del ticket"""
+        query = query.join(Ticket, Ticket.id == Analisis.ticket_id)
+        if categorias:
+            query = query.filter(Ticket.categoria.in_(categorias))
+        if desde is not None:
+            query = query.filter(Ticket.fecha_creacion >= desde)
+        if hasta is not None:
+            query = query.filter(Ticket.fecha_creacion < hasta)
+        return query
+    
+    def contar_reproceso(self, huella, categorias=None, desde=None, hasta=None) -> dict:
+        """
+        Análisis dentro del alcance y cuántos tienen una huella distinta a la actual
+        
+        Returns:
+            dict: {'en_alcance': int, 'obsoletos': int}
+        """
+        session = self.get_session()
+        try:
+            obsoleto = or_(Analisis.huella_analizador.is_(None), Analisis.huella_analizador != huella)
+            en_alcance, obsoletos = self._alcance_reproceso(
+                session.query(
+                    func.count(Analisis.id),
+                    func.count(Analisis.id).filter(obsoleto)
+                ),
+                categorias, desde, hasta
+            ).one()
+            return {'en_alcance': en_alcance, 'obsoletos': obsoletos}
+        finally:
+            session.close()
+    
+    def iterar_analisis_obsoletos(self, huella, batch_size=1000, categorias=None, desde=None, hasta=None):
+        """
+        Lotes de tickets cuyo análisis fue hecho con otra huella de analizador
+        
+        Misma paginación por keyset que iterar_tickets_pendientes, sobre
+        ticket_id, proyectando solo lo necesario para reanalizar.
+        
+        Args:
+            huella (str): Huella actual (keyword_engine.huella_analizador)
+            batch_size (int): Tickets por lote
+            categorias (list): Limitar a estas categorías
+            desde (datetime): fecha_creacion mínima (incluida)
+            hasta (datetime): fecha_creacion máxima (excluida)
+            
+        Yields:
+            list: Tuplas (id, descripcion, categoria) ordenadas por id
+        """
+        session = self.get_session()
+        try:
+            ultimo_id = 0
+            while True:
+                lote = self._alcance_reproceso(
+                    session.query(Ticket.id, Ticket.descripcion, Ticket.categoria).select_from(Analisis),
+                    categorias, desde, hasta
+                )\
+                    .filter(
+                        or_(Analisis.huella_analizador.is_(None), Analisis.huella_analizador != huella),
+                        Analisis.ticket_id > ultimo_id
+                    )\
+                    .order_by(Analisis.ticket_id)\
+                    .limit(batch_size)\
+                    .all()
+                if not lote:
+                    break
+                ultimo_id = lote[-1][0]
+                session.commit()
+                yield [tuple(fila) for fila in lote]
+        finally:
+            session.close()
+    
+    def reclamar_tickets(self, cantidad, lease_segundos, worker):
+        """
+        Reclama tickets pendientes para un worker (cola sobre PostgreSQL)
+        
+        Toma hasta `cantidad` tickets no procesados y sin lease vigente, en
+        orden de fecha_creacion (índice idx_ticket_procesado_fecha), con
+        FOR UPDATE SKIP LOCKED: varios workers pueden reclamar a la vez sin
+        bloquearse ni repartirse el mismo ticket. El reclamo se confirma de
+        inmediato; si el worker muere antes de guardar, el lease vence y
+        otro worker recupera esos tickets.
+        
+        Args:
+            cantidad (int): Máximo de tickets a reclamar
+            lease_segundos (int): Duración del lease
+            worker (str): Identificador del worker
+            
+        Returns:
+            list: Tuplas (id, descripcion, categoria)
+        """
+        ahora = datetime.utcnow()
+        bloqueo = "FOR UPDATE SKIP LOCKED" if self.engine.dialect.name == 'postgresql' else ""
+        
+        with self.engine.begin() as conn:
+            filas = conn.execute(text(f"""
+                UPDATE tickets SET reclamado_en = :ahora, reclamado_por = :worker
+                WHERE id IN (
+                    SELECT id FROM tickets
+                    WHERE procesado = FALSE
+                      AND (reclamado_en IS NULL OR reclamado_en < :vencido)
+                    ORDER BY procesado, fecha_creacion
+                    LIMIT :cantidad
+                    {bloqueo}
+                )
+                RETURNING id, descripcion, categoria
+            """), {
+                'ahora': ahora,
+                'worker': worker,
+                'vencido': ahora - timedelta(seconds=lease_segundos),
+                'cantidad': cantidad
+            }).all()
+        
+        return [tuple(fila) for fila in filas]
+    
+    def guardar_analisis_batch(self, session, filas):
+        """
+        Guarda (upsert) un lote de análisis y marca sus tickets como procesados
+        
+        En PostgreSQL son dos sentencias por lote (un INSERT multi-fila con
+        execute_values y un UPDATE ... FROM (VALUES ...)), en lugar de un
+        INSERT y un UPDATE por ticket. No hace commit: el lote queda dentro
+        de la transacción de la sesión recibida.
+        
+        La escritura es idempotente: si el ticket ya tiene análisis se
+        actualiza (ON CONFLICT sobre ticket_id, más fecha_ticket si analisis
+        está particionada), salvo que el existente sea más reciente según
+        fecha_analisis, que marca el inicio del análisis (no la escritura).
+        Así reintentos de Celery, workers lentos o corridas solapadas no
+        fallan ni pisan un resultado nuevo con uno viejo.
+        
+        Con AGREGADOS_CATEGORIA=true también actualiza los agregados por
+        categoría (utils/agregados.py) en la misma transacción, y con
+        ANALISIS_KEYWORDS_TABLA=true las filas de analisis_keywords.
+        
+        Args:
+            session: Sesión de SQLAlchemy
+            filas (list): Dicts de Analisis.valores_desde_resultado
+            
+        Returns:
+            int: Filas insertadas o actualizadas
+        """
+        if not filas:
+            return 0
+        
+        # Un mismo ticket dos veces en el lote: gana el resultado más reciente
+        por_ticket = {}
+        for fila in filas:
+            previa = por_ticket.get(fila['ticket_id'])
+            if previa is None or previa['fecha_analisis'] <= fila['fecha_analisis']:
+                por_ticket[fila['ticket_id']] = fila
+        filas = list(por_ticket.values())
+        
+        if PARTICIONADO:
+            filas = self._completar_fecha_ticket(session, filas)
+            if not filas:
+                return 0
+        
+        columnas = list(filas[0].keys())
+        
+        # Estado anterior de los tickets, antes de que el upsert lo reemplace
+        previos = None
+        if agregados.AGREGADOS_ACTIVOS:
+            previos = agregados.leer_estado_previo(session, [f['ticket_id'] for f in filas])
+        
+        if session.bind.dialect.name != 'postgresql':
+            escritas = self._upsert_analisis_orm(session, filas, columnas)
+        else:
+            escritas = self._upsert_analisis_pg(session, filas, columnas)
+        
+        if previos is not None:
+            agregados.aplicar_lote(session, previos, filas)
+        palabras_clave.sincronizar_lote(session, [f['ticket_id'] for f in filas])
+        
+        self.marcar_tickets_procesados(session, [f['ticket_id'] for f in filas])
+        return escritas
+    
+    def _completar_fecha_ticket(self, session, filas):
+        """
+        Agrega fecha_ticket (clave de partición de analisis) a las filas que no la traen
+        
+        Una consulta por lote; las filas cuyo ticket no existe se descartan.
+        """
+        faltantes = [f['ticket_id'] for f in filas if f.get('fecha_ticket') is None]
+        if not faltantes:
+            return filas
+        
+        fechas = dict(
+            session.query(Ticket.id, Ticket.fecha_creacion)
+            .filter(Ticket.id.in_(faltantes))
+            .all()
+        )
+        completas = []
+        for fila in filas:
+            if fila.get('fecha_ticket') is None:
+                if fila['ticket_id'] not in fechas:
+                    logger.warning(f"⚠️  Ticket {fila['ticket_id']} no existe; análisis descartado")
+                    continue
+                fila = dict(fila, fecha_ticket=fechas[fila['ticket_id']])
+            completas.append(fila)
+        return completas
+    
+    def _upsert_analisis_pg(self, session, filas, columnas):
+        """INSERT ... ON CONFLICT multi-fila con execute_values"""
+        from psycopg2.extras import execute_values
+        
+        tabla = Analisis.__table__
+        dialecto = session.bind.dialect
+        
+        # Convertir con el mismo procesamiento de tipos que haría el ORM
+        # (JSON serializado, etiquetas codificadas, texto comprimido)
+        procesadores = []
+        casts = []
+        for columna in columnas:
+            tipo = tabla.c[columna].type.dialect_impl(dialecto)
+            procesadores.append(tipo.bind_processor(dialecto))
+            if isinstance(tipo, JSONB):
+                casts.append('%s::jsonb')
+            elif isinstance(tipo, JSON):
+                casts.append('%s::json')
+            else:
+                casts.append('%s')
+        plantilla = '(' + ', '.join(casts) + ')'
+        
+        valores = [
+            tuple(
+                procesador(fila[columna]) if procesador is not None else fila[columna]
+                for columna, procesador in zip(columnas, procesadores)
+            )
+            for fila in filas
+        ]
+        
+        actualizar = ', '.join(f"{c} = EXCLUDED.{c}" for c in columnas if c not in CLAVE_CONFLICTO)
+        sql = (
+            f"INSERT INTO {tabla.name} ({', '.join(columnas)}) VALUES %s "
+            f"ON CONFLICT ({', '.join(CLAVE_CONFLICTO)}) DO UPDATE SET {actualizar} "
+            f"WHERE {tabla.name}.fecha_analisis <= EXCLUDED.fecha_analisis"
+        )
+        
+        cursor = session.connection().connection.cursor()
+        try:
+            execute_values(cursor, sql, valores, template=plantilla, page_size=len(valores))
+            return cursor.rowcount
+        finally:
+            cursor.close()
+    
+    def _upsert_analisis_orm(self, session, filas, columnas):
+        """Mismo upsert para otros motores (p. ej. SQLite en pruebas)"""
+        tabla = Analisis.__table__
+        dialecto = session.bind.dialect.name
+        
+        if dialecto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            # Sin ON CONFLICT portable: inserción simple
+            session.bulk_insert_mappings(Analisis, filas)
+            return len(filas)
+        
+        stmt = insert(tabla)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(CLAVE_CONFLICTO),
+            set_={c: stmt.excluded[c] for c in columnas if c not in CLAVE_CONFLICTO},
+            where=tabla.c.fecha_analisis <= stmt.excluded.fecha_analisis
+        )
+        return session.execute(stmt, filas).rowcount
+    
+    def marcar_tickets_procesados(self, session, ticket_ids, fecha=None):
+        """
+        Marca tickets como procesados con un solo UPDATE por lote
+        
+        Args:
+            session: Sesión de SQLAlchemy
+            ticket_ids (list): IDs de tickets
+            fecha (datetime): fecha_procesamiento (default: ahora)
+        """
+        if not ticket_ids:
+            return
+        fecha = fecha or datetime.utcnow()
+        
+        if session.bind.dialect.name != 'postgresql':
+            session.query(Ticket)\
+                .filter(Ticket.id.in_(ticket_ids))\
+                .update({'procesado': True, 'fecha_procesamiento': fecha}, synchronize_session=False)
+            return
+        
+        from psycopg2.extras import execute_values
+        
+        cursor = session.connection().connection.cursor()
+        try:
+            execute_values(
+                cursor,
+                "UPDATE tickets SET procesado = TRUE, fecha_procesamiento = v.fecha "
+                "FROM (VALUES %s) AS v(id, fecha) WHERE tickets.id = v.id",
+                [(ticket_id, fecha) for ticket_id in ticket_ids],
+                template='(%s::integer, %s::timestamp)',
+                page_size=len(ticket_ids)
+            )
+        finally:
+            cursor.close()
     
     def close(self):
         """Cerrar conexiones"""
@@ -0,0 +1,123 @@
+"""
+Migraciones incrementales del esquema PostgreSQL
+
+create_all solo crea tablas nuevas; los cambios sobre tablas existentes se
+registran aquí como sentencias idempotentes, en orden. Cada migración se
+aplica una sola vez y queda anotada en la tabla seira_migraciones.
+"""
+import logging
+
+from sqlalchemy import text
+
+from config import get_config
+from models.tipos import SENTIMIENTOS, URGENCIAS
+
+logger = logging.getLogger(__name__)
+
+def _alterar_si_tipo(columna, tipo_actual, alter):
+    """
+    Sentencia ALTER sobre analisis que solo corre si la columna todavía
+    tiene tipo_actual (information_schema.columns.data_type)
+    """
+    return f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'analisis' AND column_name = '{columna}' AND data_type = '{tipo_actual}'
+            ) THEN
+                {alter};
+            END IF;
+        END $$
+    """
+
+def _caso_etiqueta(columna, mapeo):
+    """CASE que convierte etiquetas de texto en su código smallint"""
+    ramas = ' '.join(f"WHEN '{etiqueta}' THEN {codigo}" for etiqueta, codigo in mapeo.items())
+    return f"CASE {columna} {ramas} ELSE NULL END"
+
+def _es_compacto(config):
+    return config.ANALISIS_ALMACENAMIENTO == 'compacto'
+
+def _texto_comprimido(config):
+    return config.ANALISIS_TEXTO_LIMPIO == 'comprimido'
+
+# (nombre, [sentencias SQL][, condición(config)]) en orden de aplicación.
+# Las migraciones con condición solo se aplican (y registran) si se cumple.
+MIGRACIONES = [
+    ('015_lease_tickets', [
+        "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS reclamado_en TIMESTAMP NULL",
+        "ALTER TABLE tickets ADD COLUMN IF NOT EXISTS reclamado_por VARCHAR(100) NULL",
+    ]),
+    ('016_version_analizador', [
+        "ALTER TABLE analisis ADD COLUMN IF NOT EXISTS version_analizador VARCHAR(20) NULL",
+        "ALTER TABLE analisis ADD COLUMN IF NOT EXISTS huella_analizador VARCHAR(120) NULL",
+        "CREATE INDEX IF NOT EXISTS idx_analisis_huella ON analisis (huella_analizador)",
+    ]),
+    ('017_analisis_compacto', [
+        _alterar_si_tipo('palabras_clave', 'json',
+                         "ALTER TABLE analisis ALTER COLUMN palabras_clave TYPE jsonb USING palabras_clave::jsonb"),
+        _alterar_si_tipo('entidades', 'json',
+                         "ALTER TABLE analisis ALTER COLUMN entidades TYPE jsonb USING entidades::jsonb"),
+        _alterar_si_tipo('tokens', 'json',
+                         "ALTER TABLE analisis ALTER COLUMN tokens TYPE integer "
+                         "USING NULLIF(tokens::text, 'null')::integer"),
+        _alterar_si_tipo('sentimiento', 'character varying',
+                         "ALTER TABLE analisis ALTER COLUMN sentimiento TYPE smallint "
+                         f"USING {_caso_etiqueta('sentimiento', SENTIMIENTOS)}"),
+        _alterar_si_tipo('urgencia', 'character varying',
+                         "ALTER TABLE analisis ALTER COLUMN urgencia TYPE smallint "
+                         f"USING {_caso_etiqueta('urgencia', URGENCIAS)}"),
+    ], _es_compacto),
+    ('017_texto_limpio_comprimido', [
+        # Las filas existentes quedan como UTF-8 plano (sin prefijo), que TextoComprimido lee tal cual
+        _alterar_si_tipo('texto_limpio', 'text',
+                         "ALTER TABLE analisis ALTER COLUMN texto_limpio TYPE bytea "
+                         "USING convert_to(texto_limpio, 'UTF8')"),
+    ], _texto_comprimido),
+    ('017_sin_indice_palabras_clave', [
+        # Ninguna consulta usa @> sobre palabras_clave y el GIN encarecía cada upsert
+        "DROP INDEX IF EXISTS idx_analisis_palabras_clave_gin",
+    ]),
+    ('019_tiempos_etapas', [
+        "ALTER TABLE analisis ADD COLUMN IF NOT EXISTS tiempos_etapas BYTEA NULL",
+    ]),
+]
+
+def aplicar_migraciones(engine):
+    """
+    Aplica las migraciones pendientes (solo PostgreSQL)
+
+    Args:
+        engine: Engine de SQLAlchemy
+
+    Returns:
+        list: Nombres de las migraciones aplicadas en esta llamada
+    """
+    if engine.dialect.name != 'postgresql':
+        return []
+
+    config = get_config()
+    aplicadas = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS seira_migraciones ("
+            "nombre VARCHAR(100) PRIMARY KEY, "
+            "aplicada_en TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        existentes = {fila[0] for fila in conn.execute(text("SELECT nombre FROM seira_migraciones"))}
+
+        for nombre, sentencias, *condicion in MIGRACIONES:
+            if nombre in existentes:
+                continue
+            if condicion and not condicion[0](config):
+                continue
+            logger.info(f"🔧 Aplicando migración {nombre}")
+            for sentencia in sentencias:
+                conn.execute(text(sentencia))
+            conn.execute(text("INSERT INTO seira_migraciones (nombre) VALUES (:nombre)"), {'nombre': nombre})
+            aplicadas.append(nombre)
+
+    if aplicadas:
+        logger.info(f"✅ {len(aplicadas)} migraciones aplicadas")
+    return aplicadas
@@ -0,0 +1,236 @@
+"""
+Agregación de palabras clave en la base de datos
+
+top_palabras_por_categoria devuelve solo el top N de cada categoría y el
+total de palabras (para la repetitividad del IAR). En PostgreSQL todo
+corre en el servidor: se expande palabras_clave con json_array_elements
+(jsonb_array_elements con almacenamiento compacto), se agrupa por
+categoría y palabra y row_number() corta el top N de cada categoría.
+
+Con ANALISIS_KEYWORDS_TABLA=true la misma agregación lee la tabla
+analisis_keywords (una fila por ticket y palabra, indexada por categoría
+y palabra), que el escritor de análisis reemplaza en la transacción de
+cada lote. En otros motores las palabras se cuentan en Python.
+"""
+import logging
+from collections import Counter, defaultdict
+
+from sqlalchemy import column, func, insert, select, text, true
+from sqlalchemy.dialects.postgresql import JSON, JSONB
+
+from config import get_config
+from models import Analisis, AnalisisKeyword, Ticket
+from models.analisis import COMPACTO
+from utils.particiones import join_ticket_analisis, filtrar_tickets_periodo
+
+logger = logging.getLogger(__name__)
+
+PALABRAS_TABLA = get_config().ANALISIS_KEYWORDS_TABLA
+
+LARGO_PALABRA = AnalisisKeyword.__table__.c.palabra.type.length
+
+def palabras_de(palabras_clave):
+    """Palabras de una lista palabras_clave de Analisis ([{'palabra': ...}, ...])"""
+    if not palabras_clave or not isinstance(palabras_clave, list):
+        return
+    for item in palabras_clave:
+        if isinstance(item, dict) and 'palabra' in item:
+            yield item['palabra'][:LARGO_PALABRA]
+
+def contar_palabras_por_categoria(query):
+    """
+    Frecuencia de palabras clave por categoría, en Python
+
+    Args:
+        query: Query de (categoria, palabras_clave), se lee por lotes
+
+    Returns:
+        dict: {categoria: Counter(palabra)}
+    """
+    palabras = defaultdict(Counter)
+    for categoria, palabras_clave in query.yield_per(5000):
+        palabras[categoria].update(palabras_de(palabras_clave))
+    return palabras
+
+def _es_postgresql(session):
+    return session.get_bind().dialect.name == 'postgresql'
+
+def _elementos():
+    """
+    Expansión lateral de analisis.palabras_clave
+
+    Returns:
+        tuple: (elemento lateral, expresión de la palabra, condición "es un arreglo")
+    """
+    if COMPACTO:
+        expandir, tipo_de, tipo = func.jsonb_array_elements, func.jsonb_typeof, JSONB
+    else:
+        expandir, tipo_de, tipo = func.json_array_elements, func.json_typeof, JSON
+    elemento = expandir(Analisis.palabras_clave).table_valued(column('value', tipo)).lateral('elemento')
+    palabra = func.left(elemento.c.value['palabra'].astext, LARGO_PALABRA)
+    return elemento, palabra, tipo_de(Analisis.palabras_clave) == 'array'
+
+def _conteos_json(session, desde, hasta, categoria):
+    """(categoria, palabra, conteo) expandiendo el JSON de cada análisis"""
+    elemento, palabra, es_arreglo = _elementos()
+    query = (
+        session.query(Ticket.categoria.label('categoria'), palabra.label('palabra'), func.count().label('conteo'))
+        .select_from(Ticket)
+        .join(Analisis, join_ticket_analisis())
+        .join(elemento, true())
+        .filter(es_arreglo, palabra.isnot(None))
+    )
+    query = filtrar_tickets_periodo(query, desde, hasta, con_analisis=True)
+    if categoria is not None:
+        query = query.filter(Ticket.categoria == categoria)
+    return query.group_by(Ticket.categoria, palabra)
+
+def _conteos_tabla(session, desde, hasta, categoria):
+    """(categoria, palabra, conteo) desde analisis_keywords"""
+    query = session.query(
+        AnalisisKeyword.categoria.label('categoria'),
+        AnalisisKeyword.palabra.label('palabra'),
+        func.sum(AnalisisKeyword.veces).label('conteo')
+    )
+    if desde is not None:
+        query = query.filter(AnalisisKeyword.fecha_ticket >= desde)
+    if hasta is not None:
+        query = query.filter(AnalisisKeyword.fecha_ticket < hasta)
+    if categoria is not None:
+        query = query.filter(AnalisisKeyword.categoria == categoria)
+    return query.group_by(AnalisisKeyword.categoria, AnalisisKeyword.palabra)
+
+def conteos_palabras(session, desde=None, hasta=None, categoria=None):
+    """
+    Query de (categoria, palabra, conteo) agregada en PostgreSQL
+
+    Args:
+        session: Sesión de SQLAlchemy (PostgreSQL)
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        categoria: Limitar a una categoría (opcional)
+    """
+    if PALABRAS_TABLA:
+        return _conteos_tabla(session, desde, hasta, categoria)
+    return _conteos_json(session, desde, hasta, categoria)
+
+def palabras_por_categoria(session):
+    """
+    Todas las palabras de cada categoría, agregadas en el servidor si es PostgreSQL
+
+    Returns:
+        dict: {categoria: Counter(palabra)}
+    """
+    if not _es_postgresql(session):
+        return contar_palabras_por_categoria(
+            session.query(Ticket.categoria, Analisis.palabras_clave).join(Analisis, join_ticket_analisis())
+        )
+    palabras = defaultdict(Counter)
+    for categoria, palabra, conteo in conteos_palabras(session).yield_per(10000):
+        palabras[categoria][palabra] = int(conteo)
+    return palabras
+
+def top_palabras_por_categoria(session, desde=None, hasta=None, categoria=None, top_n=10):
+    """
+    Top N de palabras clave y total de palabras de cada categoría
+
+    Args:
+        session: Sesión de SQLAlchemy
+        desde: Solo tickets creados desde esta fecha (opcional)
+        hasta: Solo tickets creados antes de esta fecha (opcional)
+        categoria: Limitar a una categoría (opcional)
+        top_n (int): Palabras por categoría
+
+    Returns:
+        dict: {categoria: {'top': [(palabra, conteo)], 'total': int}}
+    """
+    if not _es_postgresql(session):
+        query = session.query(Ticket.categoria, Analisis.palabras_clave).join(Analisis, join_ticket_analisis())
+        query = filtrar_tickets_periodo(query, desde, hasta, con_analisis=True)
+        if categoria is not None:
+            query = query.filter(Ticket.categoria == categoria)
+        # Mismo orden que en PostgreSQL y en los agregados: conteo y luego palabra
+        return {
+            cat: {'top': sorted(contador.items(), key=lambda p: (-p[1], p[0]))[:top_n], 'total': sum(contador.values())}
+            for cat, contador in contar_palabras_por_categoria(query).items()
+        }
+
+    conteos = conteos_palabras(session, desde, hasta, categoria).subquery()
+    ranking = select(
+        conteos.c.categoria,
+        conteos.c.palabra,
+        conteos.c.conteo,
+        func.row_number().over(
+            partition_by=conteos.c.categoria,
+            order_by=(conteos.c.conteo.desc(), conteos.c.palabra)
+        ).label('orden'),
+        func.sum(conteos.c.conteo).over(partition_by=conteos.c.categoria).label('total')
+    ).subquery()
+
+    filas = session.execute(
+        select(ranking.c.categoria, ranking.c.palabra, ranking.c.conteo, ranking.c.total)
+        .where(ranking.c.orden <= top_n)
+        .order_by(ranking.c.categoria, ranking.c.orden)
+    )
+
+    resultado = {}
+    for cat, palabra, conteo, total in filas:
+        entrada = resultado.setdefault(cat, {'top': [], 'total': int(total)})
+        entrada['top'].append((palabra, int(conteo)))
+    return resultado
+
+def _select_filas_tabla():
+    """SELECT de las filas de analisis_keywords a partir de analisis"""
+    elemento, palabra, es_arreglo = _elementos()
+    return (
+        select(Analisis.ticket_id, palabra, func.count(), Ticket.categoria, Ticket.fecha_creacion)
+        .select_from(Ticket)
+        .join(Analisis, join_ticket_analisis())
+        .join(elemento, true())
+        .where(es_arreglo, palabra.isnot(None))
+        .group_by(Analisis.ticket_id, palabra, Ticket.categoria, Ticket.fecha_creacion)
+    )
+
+_COLUMNAS_TABLA = ['ticket_id', 'palabra', 'veces', 'categoria', 'fecha_ticket']
+
+def sincronizar_lote(session, ticket_ids):
+    """
+    Reemplaza las filas de analisis_keywords de los tickets de un lote
+
+    Se llama después del upsert, dentro de la misma transacción, y lee las
+    palabras que quedaron en analisis (un análisis más reciente que el
+    lote se conserva tal cual).
+    """
+    if not PALABRAS_TABLA or not _es_postgresql(session):
+        return
+    session.query(AnalisisKeyword).filter(
+        AnalisisKeyword.ticket_id.in_(ticket_ids)
+    ).delete(synchronize_session=False)
+    session.execute(insert(AnalisisKeyword).from_select(
+        _COLUMNAS_TABLA, _select_filas_tabla().where(Analisis.ticket_id.in_(ticket_ids))
+    ))
+
+def reconstruir_tabla(session):
+    """
+    Vuelve a llenar analisis_keywords desde analisis (no hace commit)
+
+    Returns:
+        int: Filas insertadas
+    """
+    if not _es_postgresql(session):
+        return 0
+    session.execute(text("TRUNCATE analisis_keywords"))
+    filas = session.execute(insert(AnalisisKeyword).from_select(_COLUMNAS_TABLA, _select_filas_tabla())).rowcount
+    logger.info(f"🔤 analisis_keywords reconstruida: {filas:,} filas")
+    return filas
+
+def inicializar_si_vacia(session):
+    """Llena analisis_keywords si está activa y vacía pero ya hay análisis"""
+    if not PALABRAS_TABLA or not _es_postgresql(session):
+        return False
+    if session.query(AnalisisKeyword.ticket_id).first() is not None:
+        return False
+    if session.query(Analisis.id).first() is None:
+        return False
+    reconstruir_tabla(session)
+    return True
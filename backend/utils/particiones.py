@@ -0,0 +1,196 @@
+"""
+Particionado mensual de tickets y analisis (PostgreSQL)
+
+Con PARTICIONADO_MENSUAL=true las tablas se crean particionadas por rango
+(tickets por fecha_creacion, analisis por fecha_ticket, la misma fecha del
+ticket) y aquí se crean las particiones de cada mes más una partición
+DEFAULT para fechas fuera de rango.
+
+Los filtros de período de este módulo ponen la clave de partición en el
+WHERE de ambas tablas para que PostgreSQL descarte las particiones que no
+corresponden (partition pruning) también en los joins ticket-análisis.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import text, and_
+
+from config import get_config
+from models import Analisis, Ticket
+
+logger = logging.getLogger(__name__)
+
+PARTICIONADO = get_config().PARTICIONADO_MENSUAL
+
+# Tabla particionada -> columna de partición
+TABLAS_PARTICIONADAS = {
+    'tickets': 'fecha_creacion',
+    'analisis': 'fecha_ticket',
+}
+
+def sumar_meses(fecha, meses):
+    """Primer día del mes desplazado en `meses`"""
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return datetime(total // 12, total % 12 + 1, 1)
+
+def meses_entre(desde, hasta):
+    """
+    Primer día de cada mes entre dos fechas, ambos extremos incluidos
+
+    Args:
+        desde (datetime): Inicio
+        hasta (datetime): Fin
+
+    Returns:
+        list: [datetime del día 1 de cada mes]
+    """
+    mes = sumar_meses(desde, 0)
+    meses = []
+    while mes <= hasta:
+        meses.append(mes)
+        mes = sumar_meses(mes, 1)
+    return meses
+
+def nombre_particion(tabla, mes):
+    return f"{tabla}_{mes.year:04d}_{mes.month:02d}"
+
+def es_particionada(conn, tabla):
+    """True si la tabla existe y está declarada como particionada"""
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:tabla)"
+    ), {'tabla': tabla}).first() is not None
+
+def asegurar_particiones(engine, desde=None, hasta=None):
+    """
+    Crea las particiones mensuales faltantes (y la DEFAULT) de cada tabla
+
+    Sin fechas se cubre desde PARTICIONES_MESES_ATRAS hasta
+    PARTICIONES_MESES_ADELANTE meses alrededor de hoy. Es idempotente: las
+    particiones existentes se saltean.
+
+    Args:
+        engine: Engine de SQLAlchemy
+        desde (datetime): Primer mes a cubrir
+        hasta (datetime): Último mes a cubrir
+
+    Returns:
+        list: Nombres de las particiones creadas
+    """
+    if not PARTICIONADO or engine.dialect.name != 'postgresql':
+        return []
+
+    config = get_config()
+    hoy = datetime.utcnow()
+    desde = desde or sumar_meses(hoy, -config.PARTICIONES_MESES_ATRAS)
+    hasta = hasta or sumar_meses(hoy, config.PARTICIONES_MESES_ADELANTE)
+
+    creadas = []
+    for tabla in TABLAS_PARTICIONADAS:
+        with engine.connect() as conn:
+            if not es_particionada(conn, tabla):
+                logger.warning(
+                    f"⚠️  La tabla {tabla} ya existe sin particionar; PARTICIONADO_MENSUAL "
+                    f"solo aplica a tablas nuevas (recrearla y recargar los datos)"
+                )
+                continue
+
+        for mes in meses_entre(desde, hasta):
+            particion = nombre_particion(tabla, mes)
+            try:
+                with engine.begin() as conn:
+                    if conn.execute(text("SELECT to_regclass(:p)"), {'p': particion}).scalar():
+                        continue
+                    conn.execute(text(
+                        f"CREATE TABLE {particion} PARTITION OF {tabla} "
+                        f"FOR VALUES FROM ('{mes:%Y-%m-%d}') TO ('{sumar_meses(mes, 1):%Y-%m-%d}')"
+                    ))
+                    creadas.append(particion)
+            except Exception as e:
+                # Típicamente: la DEFAULT ya tiene filas de ese mes
+                logger.warning(f"⚠️  No se pudo crear {particion}: {e}")
+
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {tabla}_default PARTITION OF {tabla} DEFAULT"))
+
+    if creadas:
+        logger.info(f"🗂️  {len(creadas)} particiones creadas ({desde:%Y-%m} a {hasta:%Y-%m})")
+    return creadas
+
+def listar_particiones(engine):
+    """
+    Particiones existentes con su rango, filas estimadas y tamaño
+
+    Returns:
+        list: [{tabla, particion, rango, filas, total_bytes}]
+    """
+    if engine.dialect.name != 'postgresql':
+        return []
+
+    with engine.connect() as conn:
+        filas = conn.execute(text(
+            "SELECT padre.relname, hija.relname, pg_get_expr(hija.relpartbound, hija.oid), "
+            "GREATEST(hija.reltuples, 0)::bigint, pg_total_relation_size(hija.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class padre ON padre.oid = i.inhparent "
+            "JOIN pg_class hija ON hija.oid = i.inhrelid "
+            "WHERE padre.relname = ANY(:tablas) "
+            "ORDER BY padre.relname, hija.relname"
+        ), {'tablas': list(TABLAS_PARTICIONADAS)}).all()
+
+    return [
+        {'tabla': tabla, 'particion': particion, 'rango': rango, 'filas': n, 'total_bytes': tamano}
+        for tabla, particion, rango, n, tamano in filas
+    ]
+
+def join_ticket_analisis():
+    """
+    Condición de join Ticket-Analisis
+
+    Con particionado incluye la igualdad de fechas, que permite el join
+    partición a partición y propagar el pruning de un lado al otro.
+    """
+    condicion = Ticket.id == Analisis.ticket_id
+    if PARTICIONADO:
+        condicion = and_(condicion, Ticket.fecha_creacion == Analisis.fecha_ticket)
+    return condicion
+
+def filtrar_tickets_periodo(query, desde=None, hasta=None, con_analisis=False):
+    """
+    Restringe una query sobre Ticket a [desde, hasta)
+
+    Args:
+        query: Query que incluye Ticket
+        desde (datetime): Inicio (incluido)
+        hasta (datetime): Fin (excluido)
+        con_analisis (bool): La query también incluye Analisis (join)
+
+    Returns:
+        Query filtrada
+    """
+    if desde is not None:
+        query = query.filter(Ticket.fecha_creacion >= desde)
+        if con_analisis and PARTICIONADO:
+            query = query.filter(Analisis.fecha_ticket >= desde)
+    if hasta is not None:
+        query = query.filter(Ticket.fecha_creacion < hasta)
+        if con_analisis and PARTICIONADO:
+            query = query.filter(Analisis.fecha_ticket < hasta)
+    return query
+
+def filtrar_analisis_periodo(query, desde=None, hasta=None):
+    """
+    Restringe una query sobre Analisis a tickets creados en [desde, hasta)
+
+    Con particionado filtra por fecha_ticket sin tocar tickets; sin
+    particionado necesita el join con Ticket.
+    """
+    if desde is None and hasta is None:
+        return query
+    if PARTICIONADO:
+        if desde is not None:
+            query = query.filter(Analisis.fecha_ticket >= desde)
+        if hasta is not None:
+            query = query.filter(Analisis.fecha_ticket < hasta)
+        return query
+    query = query.join(Ticket, join_ticket_analisis())
+    return filtrar_tickets_periodo(query, desde, hasta)
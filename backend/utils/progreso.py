@@ -0,0 +1,166 @@
+"""
+Progreso de corridas batch con contadores atómicos en Redis
+
+Cada corrida (run) es un hash de Redis con contadores que el despachador
+y los workers incrementan con HINCRBY. Consultar el progreso es un solo
+HGETALL sin importar cuántos tickets o tareas tenga la corrida, y no hace
+falta guardar un resultado por tarea en el backend de Celery.
+
+Si los resultados traen tiempos por etapa, cada lote suma además su
+histograma a un segundo hash (seira:run:<id>:etapas) con las mismas
+operaciones atómicas.
+
+Cada actualización renueva el TTL (JOBS_TTL_HORAS) en el mismo pipeline:
+si el hash ya había vencido, HINCRBY lo recrearía sin vencimiento.
+"""
+import logging
+import time
+import uuid
+
+import redis
+
+from config import get_config
+from services.tiempos_etapas import resumir_histograma
+
+logger = logging.getLogger(__name__)
+
+_PREFIJO = 'seira:run:'
+
+_cliente = None
+
+def get_redis():
+    """Cliente Redis del proceso para los contadores de progreso"""
+    global _cliente
+    if _cliente is None:
+        _cliente = redis.Redis.from_url(get_config().JOBS_REDIS_URL, decode_responses=True)
+    return _cliente
+
+def _clave(run_id):
+    return f"{_PREFIJO}{run_id}"
+
+def _clave_etapas(run_id):
+    return f"{_PREFIJO}{run_id}:etapas"
+
+def _ttl():
+    return get_config().JOBS_TTL_HORAS * 3600
+
+def crear_run(total_estimado=0):
+    """
+    Registra una corrida nueva
+
+    Args:
+        total_estimado (int): Tickets pendientes al iniciar
+
+    Returns:
+        str: run_id
+    """
+    run_id = uuid.uuid4().hex[:12]
+    clave = _clave(run_id)
+    cliente = get_redis()
+    with cliente.pipeline() as pipe:
+        pipe.hset(clave, mapping={
+            'total_estimado': total_estimado,
+            'enviados': 0,
+            'lotes_enviados': 0,
+            'lotes_terminados': 0,
+            'hechos': 0,
+            'fallidos': 0,
+            'omitidos': 0,
+            'despacho_completo': 0,
+            'inicio': time.time(),
+            'ultimo': time.time()
+        })
+        pipe.expire(clave, _ttl())
+        pipe.execute()
+    logger.info(f"🆔 Corrida registrada: {run_id}")
+    return run_id
+
+def registrar_envio(run_id, tickets):
+    """El despachador envió un lote de `tickets` tickets"""
+    with get_redis().pipeline() as pipe:
+        pipe.hincrby(_clave(run_id), 'enviados', tickets)
+        pipe.hincrby(_clave(run_id), 'lotes_enviados', 1)
+        pipe.expire(_clave(run_id), _ttl())
+        pipe.execute()
+
+def cerrar_despacho(run_id):
+    """El despachador terminó de enviar lotes"""
+    with get_redis().pipeline() as pipe:
+        pipe.hset(_clave(run_id), 'despacho_completo', 1)
+        pipe.expire(_clave(run_id), _ttl())
+        pipe.execute()
+
+def registrar_lote(run_id, exitosos, fallidos, omitidos=0, histograma=None):
+    """
+    Un worker terminó un lote; nunca propaga errores de Redis
+
+    Args:
+        run_id (str): Corrida a la que pertenece el lote
+        exitosos (int): Tickets analizados correctamente
+        fallidos (int): Tickets con error de análisis o de escritura
+        omitidos (int): Tickets ya procesados o inexistentes al leer el lote
+        histograma (dict): Histograma plano de tiempos por etapa del lote
+            (services.tiempos_etapas.histograma_resultados)
+    """
+    try:
+        clave = _clave(run_id)
+        with get_redis().pipeline() as pipe:
+            pipe.hincrby(clave, 'hechos', exitosos)
+            pipe.hincrby(clave, 'fallidos', fallidos)
+            pipe.hincrby(clave, 'omitidos', omitidos)
+            pipe.hincrby(clave, 'lotes_terminados', 1)
+            pipe.hset(clave, 'ultimo', time.time())
+            pipe.expire(clave, _ttl())
+            if histograma:
+                clave_etapas = _clave_etapas(run_id)
+                for campo, valor in histograma.items():
+                    pipe.hincrby(clave_etapas, campo, valor)
+                pipe.expire(clave_etapas, _ttl())
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️  No se pudo registrar progreso de la corrida {run_id}: {str(e)}")
+
+def leer_run(run_id):
+    """
+    Estado de una corrida con una sola lectura
+
+    Returns:
+        dict: Contadores y derivados (en_curso, tickets_por_segundo,
+              porcentaje, terminado) y el resumen por etapa si hay tiempos,
+              o None si la corrida no existe
+    """
+    with get_redis().pipeline() as pipe:
+        pipe.hgetall(_clave(run_id))
+        pipe.hgetall(_clave_etapas(run_id))
+        datos, etapas = pipe.execute()
+    if not datos:
+        return None
+
+    enviados = int(datos['enviados'])
+    hechos = int(datos['hechos'])
+    fallidos = int(datos['fallidos'])
+    omitidos = int(datos.get('omitidos', 0))
+    despacho_completo = datos['despacho_completo'] == '1'
+    terminados = hechos + fallidos + omitidos
+
+    inicio = float(datos['inicio'])
+    segundos = float(datos['ultimo']) - inicio
+    total = enviados if despacho_completo else max(enviados, int(datos['total_estimado']))
+
+    return {
+        'run_id': run_id,
+        'total': total,
+        'enviados': enviados,
+        'hechos': hechos,
+        'fallidos': fallidos,
+        'omitidos': omitidos,
+        'en_curso': enviados - terminados,
+        'lotes_enviados': int(datos['lotes_enviados']),
+        'lotes_terminados': int(datos['lotes_terminados']),
+        'porcentaje': round(terminados / total * 100, 2) if total else 0.0,
+        'tickets_por_segundo': round(terminados / segundos, 1) if segundos > 0 else 0.0,
+        'despacho_completo': despacho_completo,
+        'terminado': despacho_completo and terminados >= enviados,
+        'inicio': inicio,
+        'etapas': resumir_histograma(etapas) if etapas else {}
+    }
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Un análisis viejo que se guarda después de uno nuevo no lo reemplaza
+
+fecha_analisis se toma al empezar el análisis: un worker lento o un
+reintento que termina más tarde no pisa el resultado de un análisis que
+empezó después. Usa SQLite en memoria y el motor NLP lite.
+
+Uso:
+    python -m unittest tests/test_escritura_analisis.py
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models import AgregadoCategoria, Analisis, Ticket
+from models.base import Base
+from services.nlp_processor import NLPProcessor
+from utils.database import db_manager
+
+TEXTO_VIEJO = "Hola, quisiera saber cuándo llega mi pedido, gracias por la información del envío"
+TEXTO_NUEVO = "URGENTE: el sistema de pagos no funciona, error crítico al pagar, necesito ayuda inmediata"
+
+class TestAnalisisObsoleto(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.session = Session(bind=self.engine)
+        self.session.add(Ticket(id=1, ticket_id='T1', titulo='t', descripcion=TEXTO_NUEVO, categoria='Pagos'))
+        self.session.commit()
+
+        nlp = NLPProcessor(modo='lite')
+        # El viejo empieza primero; el nuevo empieza después
+        self.viejo = nlp.procesar_ticket(1, TEXTO_VIEJO, 'Pagos')
+        self.nuevo = nlp.procesar_ticket(1, TEXTO_NUEVO, 'Pagos')
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _guardar(self, *resultados):
+        filas = [Analisis.valores_desde_resultado(r, 'Pagos') for r in resultados]
+        db_manager.guardar_analisis_batch(self.session, filas)
+        self.session.commit()
+
+    def _verificar_nuevo(self):
+        analisis = self.session.query(Analisis).filter_by(ticket_id=1).one()
+        self.assertEqual(analisis.fecha_analisis, self.nuevo['fecha_analisis'])
+        self.assertEqual(analisis.urgencia, self.nuevo['urgencia']['nivel'])
+        self.assertEqual(analisis.palabras_clave, self.nuevo['palabras_clave'])
+
+        agregado = self.session.get(AgregadoCategoria, 'Pagos')
+        if agregado is not None:
+            self.assertEqual(agregado.tickets_procesados, 1)
+            self.assertEqual(getattr(agregado, f"urgencia_{self.nuevo['urgencia']['nivel']}"), 1)
+
+    def test_fecha_es_el_inicio_del_analisis(self):
+        self.assertLess(self.viejo['fecha_analisis'], self.nuevo['fecha_analisis'])
+        self.assertNotEqual(self.viejo['palabras_clave'], self.nuevo['palabras_clave'])
+
+    def test_viejo_guardado_despues_no_reemplaza(self):
+        self._guardar(self.nuevo)
+        self._guardar(self.viejo)
+        self._verificar_nuevo()
+
+    def test_viejo_en_el_mismo_lote(self):
+        self._guardar(self.nuevo, self.viejo)
+        self._verificar_nuevo()
+
+    def test_viejo_antes_se_reemplaza(self):
+        self._guardar(self.viejo)
+        self._guardar(self.nuevo)
+        self._verificar_nuevo()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+El bootstrap del IAR agrupa la complejidad en celdas chicas y usa la ruta
+multinomial exacta
+
+Con el redondeo de complejidad una categoría con miles de complejidades
+distintas queda en unas pocas centenas de celdas, 1000 réplicas no pasan
+a la aproximación normal y los percentiles no se alejan de los que da la
+complejidad sin redondear. Usa SQLite en memoria.
+
+Uso:
+    python -m unittest tests/test_iar_bootstrap.py
+"""
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models import Analisis, Ticket
+from models.base import Base
+from services import iar_bootstrap
+from services.iar_calculator import IARCalculator
+
+URGENCIAS = ['baja', 'media', 'alta', 'critica']
+TIEMPO_POR_URGENCIA = {'baja': 1.0, 'media': 2.0, 'alta': 4.0, 'critica': 8.0}
+MUESTRAS = 1000
+
+class TestIARBootstrap(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine('sqlite://')
+        Base.metadata.create_all(cls.engine)
+        cls.session = Session(bind=cls.engine)
+
+        rng = random.Random(11)
+        for i in range(1, 6001):
+            categoria = 'Pagos' if i % 3 else 'Envíos'
+            cls.session.add(Ticket(id=i, ticket_id=f'T{i}', titulo='t', descripcion='d', categoria=categoria))
+            cls.session.add(Analisis(
+                ticket_id=i,
+                complejidad_score=round(rng.uniform(5, 95), 2),
+                urgencia=rng.choice(URGENCIAS)
+            ))
+        cls.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.engine.dispose()
+
+    def _intervalos(self, celdas):
+        metricas = {
+            categoria: {
+                'total_tickets': sum(n for _, _, n in filas),
+                'repetitividad_score': 60.0,
+                'tasa_resolucion': 0.8
+            }
+            for categoria, filas in celdas.items()
+        }
+        return iar_bootstrap.intervalos_iar(
+            IARCalculator(), metricas, celdas, 6000, TIEMPO_POR_URGENCIA, MUESTRAS, semilla=5
+        )
+
+    def test_celdas_redondeadas_caben_en_la_ruta_exacta(self):
+        celdas = iar_bootstrap.celdas_por_categoria(self.session, paso=2)
+        for categoria, filas in celdas.items():
+            with self.subTest(categoria=categoria):
+                self.assertTrue(all(complejidad % 2 == 0 for complejidad, _, _ in filas))
+                self.assertLessEqual(len(filas), 51 * len(URGENCIAS))
+                self.assertLessEqual(MUESTRAS * len(filas), iar_bootstrap.LIMITE_EXACTO)
+
+        exactas = iar_bootstrap.celdas_por_categoria(self.session, paso=0)
+        self.assertGreater(MUESTRAS * len(exactas['Pagos']), iar_bootstrap.LIMITE_EXACTO)
+
+    def test_redondeo_conserva_los_conteos(self):
+        redondeadas = iar_bootstrap.celdas_por_categoria(self.session, paso=2)
+        exactas = iar_bootstrap.celdas_por_categoria(self.session, paso=0)
+        for categoria in exactas:
+            self.assertEqual(
+                sum(n for _, _, n in redondeadas[categoria]),
+                sum(n for _, _, n in exactas[categoria])
+            )
+
+    def test_percentiles_cercanos_a_la_complejidad_exacta(self):
+        redondeados = self._intervalos(iar_bootstrap.celdas_por_categoria(self.session, paso=2))
+        exactos = self._intervalos(iar_bootstrap.celdas_por_categoria(self.session, paso=0))
+        for categoria, intervalo in redondeados.items():
+            with self.subTest(categoria=categoria):
+                self.assertLessEqual(intervalo['p5'], intervalo['p50'])
+                self.assertLessEqual(intervalo['p50'], intervalo['p95'])
+                for percentil in ('p5', 'p50', 'p95'):
+                    self.assertAlmostEqual(intervalo[percentil], exactos[categoria][percentil], delta=0.2)
+
+if __name__ == '__main__':
+    unittest.main()
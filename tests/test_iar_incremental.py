@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+El IAR incremental (agregados por categoría) da lo mismo que el completo
+
+Con tickets pendientes, total_tickets y el total global incluyen los
+tickets sin análisis en ambos modos. Usa SQLite en memoria y el motor NLP
+lite.
+
+Uso:
+    python -m unittest tests/test_iar_incremental.py
+"""
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models import Analisis, Ticket
+from models.base import Base
+from scripts.calcular_iar import calcular_metricas_categorias, calcular_metricas_incrementales
+from services.iar_calculator import IARCalculator
+from services.nlp_processor import NLPProcessor
+from utils.database import db_manager
+
+CATEGORIAS = ['Pagos', 'Envíos', 'Error técnico', 'Consulta']
+FRASES = [
+    "no puedo pagar con la tarjeta y el sistema muestra un error",
+    "URGENTE el pedido no llegó y necesito el envío hoy mismo",
+    "quisiera información sobre la garantía del producto, gracias",
+    "la aplicación se cierra sola al abrir el carrito, es crítico",
+    "el reembolso de la devolución todavía no aparece en mi cuenta",
+    "consulta sobre horarios de atención y métodos de pago disponibles",
+]
+
+class TestIARIncremental(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine('sqlite://')
+        Base.metadata.create_all(cls.engine)
+        cls.session = Session(bind=cls.engine)
+
+        rng = random.Random(7)
+        tickets = []
+        for i in range(1, 241):
+            descripcion = ' y además '.join(rng.sample(FRASES, rng.randint(1, 3)))
+            # Categorías con proporciones distintas para que la frecuencia importe
+            categoria = rng.choices(CATEGORIAS, weights=[5, 3, 2, 1])[0]
+            tickets.append({'id': i, 'descripcion': descripcion, 'categoria': categoria})
+            cls.session.add(Ticket(id=i, ticket_id=f'T{i}', titulo='t', descripcion=descripcion, categoria=categoria))
+        cls.session.commit()
+
+        # Un tercio queda pendiente, en proporción distinta por categoría
+        procesar = [t for t in tickets if not (t['id'] % 3 == 0 or (t['categoria'] == 'Pagos' and t['id'] % 5 == 0))]
+        nlp = NLPProcessor(modo='lite')
+        resultados = nlp.procesar_batch(procesar)
+        for inicio in range(0, len(resultados), 50):
+            filas = [
+                Analisis.valores_desde_resultado(r, t['categoria'])
+                for r, t in zip(resultados[inicio:inicio + 50], procesar[inicio:inicio + 50])
+            ]
+            db_manager.guardar_analisis_batch(cls.session, filas)
+            cls.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.engine.dispose()
+
+    def test_metricas_identicas_con_pendientes(self):
+        completas = calcular_metricas_categorias(self.session)
+        incrementales = calcular_metricas_incrementales(self.session)
+
+        self.assertEqual(sorted(completas), sorted(incrementales))
+        pendientes = 0
+        for categoria, esperado in completas.items():
+            obtenido = incrementales[categoria]
+            self.assertEqual(sorted(esperado), sorted(obtenido))
+            pendientes += esperado['total_tickets'] - esperado['tickets_procesados']
+            for campo, valor in esperado.items():
+                with self.subTest(categoria=categoria, campo=campo):
+                    if isinstance(valor, float):
+                        self.assertAlmostEqual(valor, obtenido[campo], places=9)
+                    else:
+                        self.assertEqual(valor, obtenido[campo])
+        self.assertGreater(pendientes, 0)
+
+    def test_iar_identico(self):
+        total_global = self.session.query(Ticket).count()
+        calc = IARCalculator()
+        resultados = []
+        for metricas in (calcular_metricas_categorias(self.session), calcular_metricas_incrementales(self.session)):
+            categorias = sorted(metricas)
+            columnas = {
+                campo: [metricas[c][campo] for c in categorias]
+                for campo in ('total_tickets', 'complejidad_promedio', 'tiempo_total_anual_horas',
+                              'repetitividad_score', 'uniformidad_score', 'tasa_resolucion')
+            }
+            lote = calc.calcular_lote(columnas, total_global=total_global)
+            resultados.append((categorias, lote['frecuencia_score'].tolist(), lote['iar'].tolist()))
+        self.assertEqual(resultados[0], resultados[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+IARCalculator.calcular_lote da exactamente lo mismo que los métodos escalares
+
+Uso:
+    python -m unittest tests/test_iar_vectorizado.py
+"""
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import numpy as np
+import pandas as pd
+
+from services.iar_calculator import IARCalculator, _redondear
+
+CAMPOS_ROI = ('ahorro_anual_usd', 'roi_porcentaje', 'meses_recuperacion',
+              'costo_mantenimiento_anual', 'beneficio_neto_anual')
+
+def _escalar(calc, fila, total_global, costo=None):
+    """Todos los campos de una fila con los métodos de a uno"""
+    frecuencia = calc.calcular_frecuencia_score(fila['total_tickets'], total_global)
+    complejidad = calc.calcular_complejidad_score(fila['complejidad_promedio'])
+    impacto = calc.calcular_impacto_score(fila['tiempo_total_anual_horas'])
+    viabilidad = calc.calcular_viabilidad_score(
+        fila['repetitividad_score'], fila['uniformidad_score'], fila['tasa_resolucion']
+    )
+    iar = calc.calcular_iar(frecuencia, complejidad, impacto, viabilidad)
+    nivel = calc.determinar_nivel(iar)
+    resultado = {
+        'frecuencia_score': frecuencia,
+        'complejidad_score': complejidad,
+        'impacto_score': impacto,
+        'viabilidad_score': viabilidad,
+        'iar': iar,
+        'nivel': nivel,
+        'prioridad': calc.calcular_prioridad(iar, nivel),
+    }
+    roi = calc.estimar_roi(fila['tiempo_total_anual_horas'], costo)
+    resultado.update({campo: roi[campo] for campo in CAMPOS_ROI})
+    return resultado
+
+def _metricas_aleatorias(n, semilla):
+    rng = random.Random(semilla)
+    filas = []
+    for _ in range(n):
+        filas.append({
+            'total_tickets': rng.choice([0, 1, rng.randint(1, 500), rng.randint(500, 40000)]),
+            'complejidad_promedio': rng.choice([0.0, 100.0, 120.0, rng.uniform(0, 100)]),
+            # Incluye los bordes de cada tramo del impacto
+            'tiempo_total_anual_horas': rng.choice([
+                -5.0, 0.0, 99.99, 100.0, 499.5, 500.0, 999.0, 1000.0, 3000.0, 10000.0,
+                rng.uniform(0, 5000), float(rng.randint(0, 20000)) / 2
+            ]),
+            'repetitividad_score': rng.choice([0.0, 100.0, rng.uniform(0, 100)]),
+            'uniformidad_score': rng.choice([100.0, rng.uniform(0, 100)]),
+            'tasa_resolucion': rng.choice([0.85, rng.uniform(0, 1)]),
+        })
+    return filas
+
+class TestIARVectorizado(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.calc = IARCalculator()
+
+    def _comparar(self, filas, total_global, lote, costos=None):
+        for i, fila in enumerate(filas):
+            costo = None if costos is None else float(costos[i])
+            esperado = _escalar(self.calc, fila, total_global, costo)
+            for campo, valor in esperado.items():
+                obtenido = lote[campo][i]
+                self.assertEqual(valor, obtenido, f"fila {i}, {campo}: {fila}")
+
+    def test_igual_a_los_metodos_escalares(self):
+        filas = _metricas_aleatorias(5000, semilla=23)
+        total_global = sum(f['total_tickets'] for f in filas)
+        columnas = {campo: [f[campo] for f in filas] for campo in filas[0]}
+        self._comparar(filas, total_global, self.calc.calcular_lote(columnas))
+
+    def test_dataframe_total_global_y_costo_por_fila(self):
+        filas = _metricas_aleatorias(1000, semilla=7)
+        costos = np.array([random.Random(i).choice([0.0, 5000.0, 15000.0, 80000.0]) for i in range(len(filas))])
+        lote = self.calc.calcular_lote(pd.DataFrame(filas), total_global=150000, costo_implementacion=costos)
+        self._comparar(filas, 150000, lote, costos)
+
+    def test_total_global_cero(self):
+        filas = _metricas_aleatorias(50, semilla=1)
+        lote = self.calc.calcular_lote(pd.DataFrame(filas), total_global=0)
+        self.assertTrue((lote['frecuencia_score'] == 0.0).all())
+        self._comparar(filas, 0, lote)
+
+    def test_redondeo_en_empates(self):
+        # Valores cuyo x * 100 cae en .5 o muy cerca
+        valores = [2.675, 0.125, 0.285, 1.005, 1.115, 0.045, -2.675, 1234567.125, 0.5, 99.995]
+        valores += [k / 1000 for k in range(-20000, 20000, 5)]
+        self.assertEqual(list(_redondear(valores)), [round(v, 2) for v in valores])
+
+if __name__ == '__main__':
+    unittest.main()
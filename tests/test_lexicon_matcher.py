@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+El autómata de léxicos encuentra frases, descarta coincidencias cubiertas
+y pliega acentos
+
+Cubre LexiconMatcher con léxicos chicos armados en el test y con el
+archivo versionado (data/lexicones.json) que usa NLPProcessor.
+
+Uso:
+    python -m unittest tests/test_lexicon_matcher.py
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from services.lexicon_matcher import LexiconMatcher, plegar
+
+RUTA_LEXICONES = Path(__file__).resolve().parent.parent / 'backend' / 'data' / 'lexicones.json'
+
+LEXICONES = {
+    'negativo': ['no funciona', 'error', 'dañado'],
+    'positivo': ['funciona', 'bien', 'rápido'],
+    'urgencia': ['critico', 'servidor caido', 'caido'],
+}
+
+class TestLexiconMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = LexiconMatcher(LEXICONES, version='1')
+
+    def test_frase_de_varias_palabras(self):
+        encontradas = self.matcher.buscar("desde ayer la impresora no funciona")
+        self.assertEqual(encontradas['negativo'], ['no funciona'])
+
+    def test_negacion_no_cuenta_la_palabra_cubierta(self):
+        encontradas = self.matcher.buscar("la aplicación no funciona")
+        self.assertEqual(encontradas['negativo'], ['no funciona'])
+        self.assertEqual(encontradas['positivo'], [])
+
+    def test_palabra_sola_sin_negacion(self):
+        encontradas = self.matcher.buscar("ahora funciona bien")
+        self.assertEqual(encontradas['positivo'], ['funciona', 'bien'])
+        self.assertEqual(encontradas['negativo'], [])
+
+    def test_cobertura_entre_lexicones(self):
+        # 'caido' queda dentro de 'servidor caido': solo cuenta la frase
+        encontradas = self.matcher.buscar("el servidor caido otra vez")
+        self.assertEqual(encontradas['urgencia'], ['servidor caido'])
+
+        # Fuera de la frase, 'caido' sí cuenta
+        encontradas = self.matcher.buscar("el portal está caido")
+        self.assertEqual(encontradas['urgencia'], ['caido'])
+
+    def test_negacion_y_afirmacion_en_el_mismo_texto(self):
+        encontradas = self.matcher.buscar("el wifi no funciona pero el cable funciona")
+        self.assertEqual(encontradas['negativo'], ['no funciona'])
+        self.assertEqual(encontradas['positivo'], ['funciona'])
+
+    def test_plegado_de_acentos_y_mayusculas(self):
+        # Texto con acento contra entrada sin acento
+        self.assertEqual(self.matcher.buscar("Es CRÍTICO")['urgencia'], ['critico'])
+        # Entrada con acento contra texto sin acento: se devuelve la entrada original
+        self.assertEqual(self.matcher.buscar("respondieron rapido")['positivo'], ['rápido'])
+        self.assertEqual(self.matcher.buscar("producto DAÑADO")['negativo'], ['dañado'])
+        self.assertEqual(self.matcher.buscar("Servidor Caído")['urgencia'], ['servidor caido'])
+        self.assertEqual(plegar('Ñandú Crítico'), 'nandu critico')
+
+    def test_palabras_completas_no_subcadenas(self):
+        encontradas = self.matcher.buscar("errores en los bienes")
+        self.assertEqual(encontradas['negativo'], [])
+        self.assertEqual(encontradas['positivo'], [])
+
+    def test_entradas_distintas_en_orden_de_aparicion(self):
+        encontradas = self.matcher.buscar("error, bien, error y bien otra vez; error")
+        self.assertEqual(encontradas['negativo'], ['error'])
+        self.assertEqual(encontradas['positivo'], ['bien'])
+
+    def test_texto_vacio(self):
+        vacio = {nombre: [] for nombre in LEXICONES}
+        self.assertEqual(self.matcher.buscar(''), vacio)
+        self.assertEqual(self.matcher.buscar(None), vacio)
+
+    def test_huella_depende_del_contenido(self):
+        misma = LexiconMatcher(LEXICONES, version='2')
+        editado = LexiconMatcher(dict(LEXICONES, positivo=['funciona', 'bien']), version='1')
+        self.assertEqual(self.matcher.huella, misma.huella)
+        self.assertNotEqual(self.matcher.huella, editado.huella)
+
+class TestLexiconesVersionados(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher = LexiconMatcher.desde_archivo(RUTA_LEXICONES)
+
+    def test_no_funciona_es_negativo_y_no_positivo(self):
+        encontradas = self.matcher.buscar("El sistema no funciona desde el lunes")
+        self.assertIn('no funciona', encontradas['negativo'])
+        self.assertIn('no funciona', encontradas['urgencia'])
+        self.assertNotIn('funciona', encontradas['positivo'])
+
+    def test_acentos_en_texto_real(self):
+        encontradas = self.matcher.buscar("Falla CRÍTICA: la conexión con el servidor está caída")
+        self.assertIn('falla', encontradas['urgencia'])
+        self.assertIn('conexion', encontradas['tecnico'])
+        self.assertIn('servidor', encontradas['tecnico'])
+
+if __name__ == '__main__':
+    unittest.main()
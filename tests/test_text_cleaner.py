@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+normalizar_ticket da exactamente la salida de la secuencia anterior
+
+Compara, ticket por ticket, la llamada fusionada contra es_texto_valido +
+extraer_entidades_basicas + limpiar_texto + calcular_estadisticas_texto
+sobre el corpus sintético de scripts/benchmark_text_cleaner.py y casos
+borde. La salida serializada debe ser idéntica byte a byte.
+
+Uso:
+    python -m unittest tests/test_text_cleaner.py
+"""
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from scripts.benchmark_text_cleaner import generar_corpus, ruta_anterior, ruta_fusionada
+from services.text_cleaner import calcular_estadisticas_texto, extraer_entidades_basicas, normalizar_ticket
+from services.tiempos_etapas import Cronometro
+
+CASOS_BORDE = [
+    None,
+    '',
+    '   \n\t ',
+    'ok',
+    'hola que tal',
+    'dos palabras',
+    '12345 67890 ORD-1234',
+    '@soporte #ayuda https://nexogamer.com cliente@correo.com',
+    'URGENTE!!! El pedido #98765 no llegó... ¿¡Qué pasó?!',
+    'Mi número es +502 5555-1234 y mi orden es ORDEN: 445566',
+    'Emoji 🎮🎮 y símbolos €$% dentro del texto del ticket',
+    'Texto\tcon\nsaltos\r\nde   línea   y    espacios',
+    'ÑANDÚ CRÍTICO Über pingüino acción',
+]
+
+def _bytes(salida):
+    return json.dumps(salida, ensure_ascii=False).encode('utf-8')
+
+class TestNormalizarTicket(unittest.TestCase):
+
+    def _comparar(self, textos):
+        for texto in textos:
+            with self.subTest(texto=texto):
+                self.assertEqual(_bytes(ruta_fusionada(texto)), _bytes(ruta_anterior(texto)))
+
+    def test_corpus_sintetico(self):
+        self._comparar(generar_corpus(5000))
+
+    def test_corpus_con_otra_semilla(self):
+        self._comparar(generar_corpus(2000, semilla=7))
+
+    def test_casos_borde(self):
+        self._comparar(CASOS_BORDE)
+
+    def test_cronometro_no_cambia_la_salida(self):
+        for texto in generar_corpus(500) + CASOS_BORDE:
+            with self.subTest(texto=texto):
+                crono = Cronometro()
+                self.assertEqual(_bytes(normalizar_ticket(texto, crono=crono)), _bytes(normalizar_ticket(texto)))
+
+    def test_invalido_sin_entidades_ni_estadisticas(self):
+        resultado = normalizar_ticket('ok gracias')
+        self.assertFalse(resultado['valido'])
+        self.assertEqual(resultado['texto_limpio'], 'ok gracias')
+        self.assertEqual(resultado['entidades'], extraer_entidades_basicas(None))
+        self.assertEqual(resultado['estadisticas'], calcular_estadisticas_texto(None))
+
+if __name__ == '__main__':
+    unittest.main()